@@ -0,0 +1,87 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import IntegrityError
+
+from models.career import Career
+
+from utils.exceptions import ObjectAlreadyExistsException, ObjectNotFoundException
+
+
+class AsyncCareerController:
+    def __init__(self, session: AsyncSession, model: Career = Career):
+        self._session = session
+        self._model = model
+        
+    async def create(self, name: str) -> None:
+        sanitize_name = self._sanitize(name)
+        
+        await self._validate(sanitize_name)
+        
+        career = self._create_career_object(sanitize_name)
+        
+        try:
+            self._session.add(career)
+            await self._session.commit()
+            
+        except IntegrityError:
+            await self._session.rollback()
+            
+            raise ObjectAlreadyExistsException(f'Career "{sanitize_name}" already exists')
+
+    def _sanitize(self, name: str) -> str:
+        return name.strip()
+        
+    async def _validate(self, name: str) -> None:
+        if await self.exists(name):
+            raise ObjectAlreadyExistsException(f'Career "{name}" already exists')
+        
+    def _create_career_object(self, name: str) -> Career:
+        return Career(
+            name=name
+        )
+        
+    async def get_by_id(self, id: int) -> Career:
+        statement = select(self._model).where(self._model.id == id)
+        
+        result = await self._session.scalar(statement)
+        
+        if result is None:
+            raise ObjectNotFoundException(f'Career with id {id} not found')
+
+        return result
+        
+    async def get_by_name(self, name: str) -> Career:
+        statement = select(self._model).where(self._model.name == name)
+        
+        result = await self._session.scalar(statement)
+        
+        if result is None:
+            raise ObjectNotFoundException(f'Career "{name}" not found')
+        
+        return result
+    
+    async def get_all(self) -> list[Career]:
+        return (await self._session.execute(select(self._model))).scalars().all()
+        
+    async def update(self, old_name: str, new_name: str) -> None:
+        new_name = self._sanitize(new_name)
+        
+        if await self.exists(new_name):
+            raise ObjectAlreadyExistsException(f'Career "{new_name}" already exists')
+        
+        career = await self.get_by_name(old_name)
+        
+        career.name = new_name
+        
+        try:
+            await self._session.commit()
+            
+        except IntegrityError:
+            await self._session.rollback()
+            
+            raise ObjectAlreadyExistsException(f'Career "{new_name}" already exists')
+        
+    async def exists(self, name: str) -> bool:
+        statement = select(self._model.id).where(self._model.name == name).exists()
+        
+        return await self._session.scalar(select(statement))
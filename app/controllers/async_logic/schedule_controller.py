@@ -0,0 +1,87 @@
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import IntegrityError
+
+from models.schedule import Schedule
+
+from utils.exceptions import ObjectAlreadyExistsException, ObjectNotFoundException
+from utils.day_of_week import DayOfWeek
+
+
+class AsyncScheduleController:
+    FORMAT = '%H:%M:%S' #* 24 hours format
+    
+    def __init__(self, session: AsyncSession, model: Schedule = Schedule):
+        self._session = session
+        self._model = model
+        
+    async def create(self, data: dict[str, any]) -> None:
+        day = self._sanitize(data)
+        
+        validate_data = await self._validate(data, day)
+        
+        schedule = self._create_schedule_object(validate_data)
+        
+        try:
+            self._session.add(schedule)
+            await self._session.commit()
+            
+        except IntegrityError:
+            await self._session.rollback()
+            
+            raise ObjectAlreadyExistsException(f'Schedule block already exists')
+    
+    def _sanitize(self, data: dict[str, any]) -> str:
+        return data['day'].strip().lower().capitalize()
+    
+    #* validates and converts data
+    async def _validate(self, data: dict[str, any], day: str) -> dict[str, any]:
+        try:
+            start_time = datetime.strptime(data['start_time'], self.FORMAT).time()
+            end_time = datetime.strptime(data['end_time'], self.FORMAT).time()
+            
+            DayOfWeek(day)
+            
+        except ValueError as e:
+            raise ValueError(f'Invalid input data: {e}')
+        
+        if start_time > end_time:
+            raise ValueError('The start time cannot be greater than the end time')
+        
+        validate_data = {'start_time': start_time, 'end_time': end_time, 'day': DayOfWeek(day)}
+
+        if await self.exists(validate_data, day):
+            raise ObjectAlreadyExistsException(f'Schedule block already exists')
+        
+        return validate_data
+        
+    def _create_schedule_object(self, data: dict[str, any]) -> Schedule:
+        return Schedule(
+            start_time = data['start_time'],
+            end_time = data['end_time'],
+            day = data['day']
+        )
+    
+    async def get_by_id(self, id: int) -> Schedule:
+        statement = select(self._model).where(self._model.id == id)
+        
+        result = await self._session.scalar(statement)
+        
+        if result is None:
+            raise ObjectNotFoundException(f'Schedule with id "{id}" not found')
+        
+        return result
+    
+    async def get_all(self) -> list[Schedule]:
+        return (await self._session.execute(select(self._model))).scalars().all()
+        
+    async def exists(self, data: dict[str, any], day: DayOfWeek) -> bool:
+        statement = select(self._model.id).where(
+            self._model.start_time == data['start_time'],
+            self._model.end_time == data['end_time'],
+            self._model.day == day
+        ).exists()
+        
+        return await self._session.scalar(select(statement))
@@ -0,0 +1,151 @@
+import asyncio
+
+from sqlalchemy import select, update, or_, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from sqlalchemy.exc import IntegrityError
+
+from models.student_subject import StudentSubject
+from models.subject_schedule import SubjectSchedule
+from models.schedule import Schedule
+
+from controllers.async_logic.student_controller import AsyncStudentController
+from controllers.async_logic.subject_schedule_controller import AsyncSubjectScheduleController
+
+from utils.exceptions import (ObjectAlreadyExistsException, ObjectNotFoundException, ScheduleConflictException,
+                              SectionFullException)
+from utils.async_lookup import lookup_by_id
+from utils.student_interval_index import StudentIntervalIndex
+from utils.versions import VersionCounter, get_version_counter
+
+
+class AsyncStudentSubjectController:
+    def __init__(self, session: AsyncSession, model: StudentSubject = StudentSubject,
+                 student_controller: type = AsyncStudentController,
+                 subject_schedule_controller: type = AsyncSubjectScheduleController,
+                 versions: VersionCounter = get_version_counter('timetable')
+                 ):
+        self._session = session
+        self._model = model
+        self._student_controller = student_controller
+        self._subject_schedule_controller = subject_schedule_controller
+        self._versions = versions
+        
+    async def create(self, data: dict[str, int]) -> None:
+        await self._validate(data)
+        
+        if not await self._reserve(data['subject_schedule_id']):
+            await self._session.rollback()
+            
+            raise SectionFullException(f'Subject_schedule with id {data['subject_schedule_id']} has no seats left')
+        
+        student_subject = self._create_student_subject_object(data)
+        
+        #* the seat and the row are committed together; the rollback also gives the seat back
+        try:
+            self._session.add(student_subject)
+            await self._session.flush()
+            
+            #* the counters are written with the sync helpers, on the same connection and transaction
+            await self._session.run_sync(self._versions.bump, ('student', data['student_id']))
+            await self._session.commit()
+            
+        except IntegrityError:
+            await self._session.rollback()
+            
+            raise ObjectAlreadyExistsException(f'''Student with id {data['student_id']} is already attending classes from
+                                               id {data['subject_schedule_id']}''')
+        
+    #* takes seats of a section in one conditional UPDATE, like StudentSubjectController._reserve
+    async def _reserve(self, subject_schedule_id: int, seats: int = 1) -> bool:
+        statement = (update(SubjectSchedule)
+                     .where(SubjectSchedule.id == subject_schedule_id,
+                            or_(SubjectSchedule.capacity.is_(None), SubjectSchedule.enrolled + seats <= SubjectSchedule.capacity))
+                     .values(enrolled=SubjectSchedule.enrolled + seats)
+                     .execution_options(synchronize_session=False))
+        
+        return (await self._session.execute(statement)).rowcount == 1
+        
+    async def _validate(self, data: dict[str, any]) -> None:
+        student, subject_schedule, exists = await asyncio.gather(
+            lookup_by_id(self._session, self._student_controller, data['student_id']),
+            lookup_by_id(self._session, self._subject_schedule_controller, data['subject_schedule_id']),
+            self.exists(data),
+            return_exceptions=True
+        )
+        
+        for result in (student, subject_schedule, exists):
+            if isinstance(result, ObjectNotFoundException):
+                raise ObjectNotFoundException(f'''Student with id {data['student_id']} or subject_schedule with id
+                                              {data['subject_schedule_id']} not found''')
+            
+            if isinstance(result, Exception):
+                raise result
+        
+        if exists:
+            raise ObjectAlreadyExistsException(f'''Student {student.name} is already attending classes from
+                                               id {subject_schedule.id}''')
+        
+        await self._check_clash(data)
+        
+    async def _check_clash(self, data: dict[str, any]) -> None:
+        statement = (select(self._model.subject_schedule_id, Schedule.day, Schedule.start_time, Schedule.end_time)
+                     .join(SubjectSchedule, SubjectSchedule.id == self._model.subject_schedule_id)
+                     .join(Schedule, Schedule.id == SubjectSchedule.schedule_id)
+                     .where(self._model.student_id == data['student_id']))
+        
+        block_statement = (select(Schedule.day, Schedule.start_time, Schedule.end_time)
+                           .join(SubjectSchedule, SubjectSchedule.schedule_id == Schedule.id)
+                           .where(SubjectSchedule.id == data['subject_schedule_id']))
+        
+        index = StudentIntervalIndex()
+        
+        for row in await self._session.execute(statement):
+            index.add(data['student_id'], row.day, row.start_time, row.end_time, row.subject_schedule_id)
+        
+        block = (await self._session.execute(block_statement)).one()
+        
+        clash = index.find_clash(data['student_id'], block.day, block.start_time, block.end_time)
+        
+        if clash is not None:
+            raise ScheduleConflictException(f'''Student with id {data['student_id']} already attends subject_schedule {clash}
+                                            on {block.day} at {block.start_time}-{block.end_time}, which overlaps id {data['subject_schedule_id']}''')
+        
+    def _create_student_subject_object(self, data: dict[str, any]) -> StudentSubject:
+        return StudentSubject(
+            student_id=data['student_id'],
+            subject_schedule_id=data['subject_schedule_id']
+        )
+        
+    async def get_by_id(self, id: int) -> StudentSubject:
+        statement = select(self._model).where(self._model.id == id)
+        
+        result = await self._session.scalar(statement)
+        
+        if result is None:
+            raise ObjectNotFoundException(f'Student_subject with id "{id}" not found')
+        
+        return result
+        
+    async def get_by_student(self, student_id: int) -> list[StudentSubject]:
+        try:
+            student = await self._student_controller(self._session).get_by_id(student_id)
+            
+        except ObjectNotFoundException:
+            raise ObjectNotFoundException(f'Student with id "{student_id}" not found')
+        
+        statement = (select(self._model).where(self._model.student_id == student.id)
+                     .options(joinedload(self._model.subject_schedule).joinedload(SubjectSchedule.subject),
+                              joinedload(self._model.subject_schedule).joinedload(SubjectSchedule.schedule),
+                              joinedload(self._model.subject_schedule).joinedload(SubjectSchedule.teacher)))
+        
+        return (await self._session.execute(statement)).unique().scalars().all()
+    
+    async def get_all(self) -> list[StudentSubject]:
+        return (await self._session.execute(select(self._model))).scalars().all()
+        
+    async def exists(self, data: dict[str, any]) -> bool:
+        statement = select(self._model.id).where(and_(self._model.student_id == data['student_id'],
+                                                      self._model.subject_schedule_id == data['subject_schedule_id'])).exists()
+        
+        return await self._session.scalar(select(statement))
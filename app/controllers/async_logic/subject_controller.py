@@ -0,0 +1,108 @@
+import asyncio
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import IntegrityError
+
+from models.subject import Subject
+
+from controllers.async_logic.career_controller import AsyncCareerController
+
+from utils.exceptions import ObjectAlreadyExistsException, ObjectNotFoundException
+from utils.async_lookup import lookup_by_id
+
+
+class AsyncSubjectController:
+    def __init__(self, session: AsyncSession, model: Subject = Subject,
+                 career_controller: type = AsyncCareerController
+                 ):
+        self._session = session
+        self._model = model
+        self._career_controller = career_controller
+        
+    async def create(self, data: dict[str, str]) -> None:
+        sanitize_name = self._sanitize(data)
+        
+        validate_data = await self._validate(data, sanitize_name)
+        
+        subject = self._create_subject_object(validate_data)
+        
+        try:
+            self._session.add(subject)
+            await self._session.commit()
+            
+        except IntegrityError:
+            await self._session.rollback()
+            
+            raise ObjectAlreadyExistsException(f'Subject "{sanitize_name}" already exists')
+
+    def _sanitize(self, data: dict[str, any]) -> str:
+        return data['name'].strip()
+        
+    #* the duplicate check and the career lookup are independent, so they run concurrently
+    async def _validate(self, data: dict[str, any], name: str) -> dict[str, any]:
+        exists, career = await asyncio.gather(
+            self.exists(name),
+            lookup_by_id(self._session, self._career_controller, data['career_id']),
+            return_exceptions=True
+        )
+        
+        if isinstance(exists, Exception):
+            raise exists
+        
+        if exists:
+            raise ObjectAlreadyExistsException(f'Subject "{name}" already exists')
+        
+        if isinstance(career, ObjectNotFoundException):
+            raise ObjectNotFoundException(f'Career with id {data['career_id']} not found')
+        
+        if isinstance(career, Exception):
+            raise career
+        
+        return {'name': name, 'course': data['course'], 'career_id': career.id}
+        
+    def _create_subject_object(self, data: dict[str, any]) -> Subject:
+        return Subject(
+            name=data['name'],
+            course=data['course'],
+            career_id=data['career_id']
+        )
+        
+    async def get_by_id(self, id: int) -> Subject:
+        statement = select(self._model).where(self._model.id == id)
+        
+        result = await self._session.scalar(statement)
+        
+        if result is None:
+            raise ObjectNotFoundException(f'Subject with id "{id}" not found')
+        
+        return result
+        
+    async def get_by_name(self, name: str) -> Subject:
+        statement = select(self._model).where(self._model.name == name)
+        
+        result = await self._session.scalar(statement)
+        
+        if result is None:
+            raise ObjectNotFoundException(f'Subject "{name}" not found')
+        
+        return result
+        
+    async def get_by_career(self, career_id: int) -> list[Subject]:
+        try:
+            career = await self._career_controller(self._session).get_by_id(career_id)
+            
+        except ObjectNotFoundException:
+            raise ObjectNotFoundException(f'Career with id "{career_id}" not found')
+        
+        statement = select(self._model).where(self._model.career_id == career.id)
+        
+        return (await self._session.execute(statement)).scalars().all()
+    
+    async def get_all(self) -> list[Subject]:
+        return (await self._session.execute(select(self._model))).scalars().all()
+        
+    async def exists(self, name: str) -> bool:
+        statement = select(self._model.id).where(self._model.name == name).exists()
+        
+        return await self._session.scalar(select(statement))
@@ -0,0 +1,170 @@
+import asyncio
+
+from sqlalchemy import select, or_, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from sqlalchemy.exc import IntegrityError
+
+from models.subject_schedule import SubjectSchedule
+from models.schedule import Schedule
+
+from controllers.async_logic.subject_controller import AsyncSubjectController
+from controllers.async_logic.schedule_controller import AsyncScheduleController
+from controllers.async_logic.teacher_controller import AsyncTeacherController
+
+from utils.exceptions import ObjectAlreadyExistsException, ObjectNotFoundException, ScheduleConflictException
+from utils.slot_grid import SlotGrid
+from utils.async_lookup import lookup_by_id
+from utils.versions import VersionCounter, get_version_counter
+
+
+SLOTS = SlotGrid() #* decodes the teachers' availability columns; holds no blocks
+
+
+class AsyncSubjectScheduleController:
+    def __init__(self, session: AsyncSession, model: SubjectSchedule = SubjectSchedule,
+                 subject_controller: type = AsyncSubjectController,
+                 schedule_controller: type = AsyncScheduleController,
+                 teacher_controller: type = AsyncTeacherController,
+                 versions: VersionCounter = get_version_counter('timetable')
+                 ):
+        self._session = session
+        self._model = model
+        self._subject_controller = subject_controller
+        self._schedule_controller = schedule_controller
+        self._teacher_controller = teacher_controller
+        self._versions = versions
+        
+    async def create(self, data: dict[str, any]) -> None:
+        await self._validate(data)
+        
+        subject_schedule = self._create_subject_schedule_object(data)
+        
+        try:
+            self._session.add(subject_schedule)
+            await self._session.flush()
+            
+            #* a section shows in the timetables of its teacher, its group and every student in it
+            await self._session.run_sync(self._versions.bump_all)
+            await self._session.commit()
+            
+        except IntegrityError:
+            await self._session.rollback()
+            
+            raise ObjectAlreadyExistsException(f'''Teacher with id {data['teacher_id']} already teaches classes in the
+                                               schedule with id {data['schedule_id']} or section {data['section']} already exists for
+                                               the subject with id {data['subject_id']}''')
+        
+    def _capacity(self, data: dict[str, any]) -> int | None:
+        if data.get('capacity') is None:
+            return None
+        
+        capacity = int(data['capacity'])
+        
+        if capacity < 0:
+            raise ValueError(f'Invalid capacity {data['capacity']} for section {data['section']}')
+        
+        return capacity
+        
+    #* the three lookups and the conflict check are independent, so they run concurrently;
+    #* then the same checks as SubjectScheduleController._validate
+    async def _validate(self, data: dict[str, any]) -> None:
+        subject, schedule, teacher, exists = await asyncio.gather(
+            lookup_by_id(self._session, self._subject_controller, data['subject_id']),
+            lookup_by_id(self._session, self._schedule_controller, data['schedule_id']),
+            lookup_by_id(self._session, self._teacher_controller, data['teacher_id']),
+            self.exists(data),
+            return_exceptions=True
+        )
+        
+        for result in (subject, schedule, teacher, exists):
+            if isinstance(result, ObjectNotFoundException):
+                raise ObjectNotFoundException(f'''Subject with id {data['subject_id']} or schedule with id {data['schedule_id']}
+                                              or teacher with id {data['teacher_id']} not found''')
+            
+            if isinstance(result, Exception):
+                raise result
+        
+        if SLOTS.window(schedule.day, schedule.start_time, schedule.end_time) & SLOTS.unavailable(SLOTS.from_bytes(teacher.availability)):
+            raise ScheduleConflictException(f'Teacher with id {data['teacher_id']} is not available in the schedule with id {data['schedule_id']}')
+        
+        #* the UNIQUE key on (teacher_id, schedule_id) only catches the very same block, not one that overlaps it
+        if exists or await self._teacher_overlaps(data['teacher_id'], schedule):
+            raise ObjectAlreadyExistsException(f'''Teacher {teacher.name} already teaches classes at time
+                                               {schedule.start_time}-{schedule.end_time} or
+                                               section {data['section']} already exists for the subject {subject.name}''')
+        
+    #* same test as ScheduleIndex.overlapping ([start, end) intervals of the same day), done in SQL
+    async def _teacher_overlaps(self, teacher_id: int, schedule: Schedule) -> bool:
+        statement = (select(self._model.id)
+                     .join(Schedule, Schedule.id == self._model.schedule_id)
+                     .where(self._model.teacher_id == teacher_id, Schedule.day == schedule.day,
+                            Schedule.start_time < schedule.end_time, Schedule.end_time > schedule.start_time)).exists()
+        
+        return await self._session.scalar(select(statement))
+        
+    def _create_subject_schedule_object(self, data: dict[str, any]) -> SubjectSchedule:
+        return SubjectSchedule(
+            section=data['section'],
+            subject_id=data['subject_id'],
+            schedule_id=data['schedule_id'],
+            teacher_id=data['teacher_id'],
+            capacity=self._capacity(data)
+        )
+        
+    async def get_by_id(self, id: int) -> SubjectSchedule:
+        statement = select(self._model).where(self._model.id == id)
+        
+        result = await self._session.scalar(statement)
+        
+        if result is None:
+            raise ObjectNotFoundException(f'Subject_schedule with id "{id}" not found')
+        
+        return result
+        
+    async def get_by_subject(self, subject_id: int) -> list[SubjectSchedule]:
+        try:
+            subject = await self._subject_controller(self._session).get_by_id(subject_id)
+            
+        except ObjectNotFoundException:
+            raise ObjectNotFoundException(f'Subject with id "{subject_id}" not found')
+        
+        statement = (select(self._model).where(self._model.subject_id == subject.id)
+                     .options(joinedload(self._model.schedule), joinedload(self._model.teacher)))
+        
+        return (await self._session.execute(statement)).scalars().all()
+    
+    async def get_by_subject_schedule(self, subject_id: int, schedule_id: int) -> SubjectSchedule:
+        subject, schedule = await asyncio.gather(
+            lookup_by_id(self._session, self._subject_controller, subject_id),
+            lookup_by_id(self._session, self._schedule_controller, schedule_id),
+            return_exceptions=True
+        )
+        
+        if isinstance(subject, Exception) or isinstance(schedule, Exception):
+            raise ObjectNotFoundException(f'Subject with id "{subject_id}" or schedule with id {schedule_id} not found')
+        
+        statement = select(self._model).where(and_(self._model.subject_id == subject.id,
+                                                   self._model.schedule_id == schedule.id))
+        
+        result = await self._session.scalar(statement)
+        
+        if result is None:
+            raise ObjectNotFoundException(f'''Subject_schedule for subject "{subject.name}" and
+                                          schedule {schedule.start_time}-{schedule.end_time} not found''')
+        
+        return result
+    
+    async def get_all(self) -> list[SubjectSchedule]:
+        return (await self._session.execute(select(self._model))).scalars().all()
+        
+    async def exists(self, data: dict[str, any]) -> bool:
+        section_exists = and_(self._model.section == data['section'],
+                              self._model.subject_id == data['subject_id'])
+        
+        teacher_ocuppied = and_(self._model.teacher_id == data['teacher_id'],
+                                self._model.schedule_id == data['schedule_id'])
+        
+        statement = select(self._model.id).where(or_(section_exists, teacher_ocuppied)).exists()
+        
+        return await self._session.scalar(select(statement))
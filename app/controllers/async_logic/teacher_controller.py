@@ -0,0 +1,92 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import IntegrityError
+
+from models.teacher import Teacher
+
+from utils.exceptions import ObjectAlreadyExistsException, ObjectNotFoundException
+
+
+class AsyncTeacherController:
+    def __init__(self, session: AsyncSession, model: Teacher = Teacher):
+        self._session = session
+        self._model = model
+        
+    async def create(self, data: dict[str, str]) -> None:
+        sanitize_data = self._sanitize(data)
+        
+        await self._validate(sanitize_data)
+        
+        teacher = self._create_teacher_object(sanitize_data)
+        
+        try:
+            self._session.add(teacher)
+            await self._session.commit()
+            
+        except IntegrityError:
+            await self._session.rollback()
+            
+            raise ObjectAlreadyExistsException(f'Teacher with identification number "{sanitize_data['identification_number']}" already exists')
+
+    def _sanitize(self, data: dict[str, str]) -> dict[str, str]:
+        name = data['name'].strip()
+        identification_numer = data['identification_number'].strip().upper().replace('-', '')
+        
+        return {'name': name, 'identification_number': identification_numer}
+        
+    async def _validate(self, data: dict[str, str]) -> None:
+        if await self.exists(data['identification_number']):
+            raise ObjectAlreadyExistsException(f'Teacher with identification number "{data['identification_number']}" already exists')
+        
+    def _create_teacher_object(self, data: dict[str, str]) -> Teacher:
+        return Teacher(
+            name=data['name'],
+            identification_number=data['identification_number']
+        )
+    
+    async def get_by_id(self, id: int) -> Teacher:
+        statement = select(self._model).where(self._model.id == id)
+        
+        result = await self._session.scalar(statement)
+        
+        if result is None:
+            raise ObjectNotFoundException(f'Teacher with id {id} not found')
+        
+        return result
+    
+    async def get_by_name(self, name: str) -> Teacher:
+        statement = select(self._model).where(self._model.name == name)
+        
+        result = await self._session.scalar(statement)
+        
+        if result is None:
+            raise ObjectNotFoundException(f'Teacher "{name}" not found')
+        
+        return result
+        
+    async def get_by_identification_number(self, identification_number: str) -> Teacher:
+        statement = select(self._model).where(self._model.identification_number == identification_number)
+        
+        result = await self._session.scalar(statement)
+        
+        if result is None:
+            raise ObjectNotFoundException(f'Teacher with identification number "{identification_number}" not found')
+        
+        return result
+    
+    async def get_all(self) -> list[Teacher]:
+        return (await self._session.execute(select(self._model))).scalars().all()
+        
+    async def update(self, old_name: str, new_name: str) -> None:
+        sanitize_new_name = new_name.strip()
+        
+        teacher = await self.get_by_name(old_name)
+        
+        teacher.name = sanitize_new_name
+        
+        await self._session.commit()
+        
+    async def exists(self, identification_number: str) -> bool:
+        statement = select(self._model.id).where(self._model.identification_number == identification_number).exists()
+        
+        return await self._session.scalar(select(statement))
@@ -1,3 +1,5 @@
+from typing import Iterable, Iterator
+
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
@@ -5,46 +7,67 @@ from sqlalchemy.exc import IntegrityError
 from models.career import Career
 
 from utils.exceptions import ObjectAlreadyExistsException, ObjectNotFoundException
+from utils.cache import LRUCache, get_cache, cached_lookup
+from utils.bulk import BulkResult, bulk_insert, existing_keys
+from utils.upsert import insert_ignore
+from utils.pagination import Page, DEFAULT_PAGE_SIZE, STREAM_BATCH_SIZE, get_page, iter_all
 
 
 class CareerController:
-    def __init__(self, session: Session, model: Career = Career):
+    def __init__(self, session: Session, model: Career = Career, cache: LRUCache | None = get_cache('career')):
         self._session = session
         self._model = model
+        self._cache = cache
         
     def create(self, name: str) -> None:
         sanitize_name = self._sanitize(name)
         
-        #! Modify the DB so that the respective fields are UNIQUE (eliminate this method if necessary)
-        self._validate(sanitize_name)
-        
-        career = self._create_career_object(sanitize_name)
-        
-        try:
-            self._session.add(career)
-            self._session.commit()
-            
-        except IntegrityError:
+        #* the UNIQUE key on name rejects duplicates, so there is no exists() round trip
+        if insert_ignore(self._session, self._model, {'name': sanitize_name}) is None:
             self._session.rollback()
             
             raise ObjectAlreadyExistsException(f'Career "{sanitize_name}" already exists')
+        
+        self._session.commit()
+        
+        self._invalidate(('name', sanitize_name))
+
+    def _invalidate(self, *keys: tuple[str, any]) -> None:
+        if self._cache is not None:
+            self._cache.invalidate(*keys)
 
     def _sanitize(self, name: str) -> str:
         return name.strip()
         
-    def _validate(self, name: str) -> None:
-        if self.exists(name):
-            raise ObjectAlreadyExistsException(f'Career "{name}" already exists')
+    def create_many(self, names: Iterable[str]) -> BulkResult:
+        result = BulkResult()
+        rows = {}
+        
+        for position, name in enumerate(names):
+            sanitize_name = self._sanitize(name)
+            
+            if sanitize_name in rows:
+                result.reject(position, name, f'Career "{sanitize_name}" is repeated in the batch')
+                
+                continue
+            
+            rows[sanitize_name] = (position, {'name': sanitize_name})
+        
+        for name in existing_keys(self._session, [self._model.name], set(rows)):
+            position, data = rows.pop(name)
+            
+            result.reject(position, data, f'Career "{name}" already exists')
+        
+        bulk_insert(self._session, self._model, list(rows.values()), result)
+        
+        self._invalidate(*(('name', data['name']) for _, data in result.created))
         
-    def _create_career_object(self, name: str) -> Career:
-        return Career(
-            name=name
-        )
+        return result
         
     def get_by_id(self, id: int) -> Career:
         statement = select(self._model).where(self._model.id == id)
         
-        result = self._session.scalar(statement)
+        result = cached_lookup(self._session, self._cache, ('id', id), lambda: self._session.scalar(statement))
         
         if result is None:
             raise ObjectNotFoundException(f'Career with id {id} not found')
@@ -54,7 +77,7 @@ class CareerController:
     def get_by_name(self, name: str) -> Career:
         statement = select(self._model).where(self._model.name == name)
         
-        result = self._session.scalar(statement)
+        result = cached_lookup(self._session, self._cache, ('name', name), lambda: self._session.scalar(statement))
         
         if result is None:
             raise ObjectNotFoundException(f'Career "{name}" not found')
@@ -63,17 +86,22 @@ class CareerController:
     
     def get_all(self) -> list[Career]:
         return self._session.execute(select(self._model)).scalars().all()
+    
+    def get_page(self, after_id: int | None = None, page_size: int = DEFAULT_PAGE_SIZE, **filters: any) -> Page:
+        return get_page(self._session, self._model, after_id, page_size, **filters)
+    
+    def iter_all(self, batch_size: int = STREAM_BATCH_SIZE, **filters: any) -> Iterator[Career]:
+        return iter_all(self._session, self._model, batch_size, **filters)
         
     def update(self, old_name: str, new_name: str) -> None:
         new_name = self._sanitize(new_name)
         
-        if self.exists(new_name):
-            raise ObjectAlreadyExistsException(f'Career "{new_name}" already exists')
-        
         career = self.get_by_name(old_name)
         
         career.name = new_name
         
+        keys = (('id', career.id), ('name', old_name), ('name', new_name))
+        
         try:
             self._session.commit()
             
@@ -82,7 +110,9 @@ class CareerController:
             
             raise ObjectAlreadyExistsException(f'Career "{new_name}" already exists')
         
+        self._invalidate(*keys)
+        
     def exists(self, name: str) -> bool:
         statement = select(self._model.id).where(self._model.name == name).exists()
         
-        return self._session.scalar(statement)
+        return self._session.scalar(select(statement))
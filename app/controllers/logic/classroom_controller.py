@@ -0,0 +1,123 @@
+from typing import Iterable, Iterator
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+
+from models.classroom import Classroom
+
+from utils.exceptions import ObjectAlreadyExistsException, ObjectNotFoundException
+from utils.classroom_type import ClassroomType
+from utils.bulk import BulkResult, bulk_insert, existing_keys
+from utils.upsert import insert_ignore
+from utils.pagination import Page, DEFAULT_PAGE_SIZE, STREAM_BATCH_SIZE, get_page, iter_all
+
+
+class ClassroomController:
+    def __init__(self, session: Session, model: Classroom = Classroom):
+        self._session = session
+        self._model = model
+    
+    def create(self, data: dict[str, any]) -> None:
+        values = self._validate(data)
+        
+        #* the UNIQUE key on name rejects duplicates, so there is no exists() round trip
+        if insert_ignore(self._session, self._model, values) is None:
+            self._session.rollback()
+            
+            raise ObjectAlreadyExistsException(f'Classroom "{values['name']}" already exists')
+        
+        self._session.commit()
+    
+    def _validate(self, data: dict[str, any]) -> dict[str, any]:
+        name = data['name'].strip()
+        capacity = int(data['capacity'])
+        
+        if capacity <= 0:
+            raise ValueError(f'Invalid capacity {data['capacity']} for classroom "{name}"')
+        
+        try:
+            type = ClassroomType(data.get('type', ClassroomType.classroom))
+        
+        except ValueError:
+            raise ValueError(f'Invalid classroom type "{data['type']}"')
+        
+        return {'name': name, 'capacity': capacity, 'type': type}
+    
+    def create_many(self, items: Iterable[dict[str, any]]) -> BulkResult:
+        result = BulkResult()
+        rows = {}
+        
+        for position, data in enumerate(items):
+            try:
+                values = self._validate(data)
+            
+            except (KeyError, TypeError, AttributeError, ValueError) as e:
+                result.reject(position, data, f'Invalid input data: {e}')
+                
+                continue
+            
+            if values['name'] in rows:
+                result.reject(position, data, f'Classroom "{values['name']}" is repeated in the batch')
+                
+                continue
+            
+            rows[values['name']] = (position, values)
+        
+        for name in existing_keys(self._session, [self._model.name], set(rows)):
+            position, data = rows.pop(name)
+            
+            result.reject(position, data, f'Classroom "{name}" already exists')
+        
+        bulk_insert(self._session, self._model, list(rows.values()), result)
+        
+        return result
+    
+    def get_by_id(self, id: int) -> Classroom:
+        result = self._session.get(self._model, id)
+        
+        if result is None:
+            raise ObjectNotFoundException(f'Classroom with id {id} not found')
+        
+        return result
+    
+    def get_by_name(self, name: str) -> Classroom:
+        statement = select(self._model).where(self._model.name == name)
+        
+        result = self._session.scalar(statement)
+        
+        if result is None:
+            raise ObjectNotFoundException(f'Classroom "{name}" not found')
+        
+        return result
+    
+    def get_all(self) -> list[Classroom]:
+        return self._session.execute(select(self._model)).scalars().all()
+    
+    def get_page(self, after_id: int | None = None, page_size: int = DEFAULT_PAGE_SIZE, **filters: any) -> Page:
+        return get_page(self._session, self._model, after_id, page_size, **filters)
+    
+    def iter_all(self, batch_size: int = STREAM_BATCH_SIZE, **filters: any) -> Iterator[Classroom]:
+        return iter_all(self._session, self._model, batch_size, **filters)
+    
+    def update(self, name: str, data: dict[str, any]) -> None:
+        classroom = self.get_by_name(name)
+        
+        values = self._validate({'name': classroom.name, 'capacity': classroom.capacity, 'type': classroom.type} | data)
+        
+        classroom.name = values['name']
+        classroom.capacity = values['capacity']
+        classroom.type = values['type']
+        
+        try:
+            self._session.commit()
+        
+        except IntegrityError:
+            self._session.rollback()
+            
+            raise ObjectAlreadyExistsException(f'Classroom "{values['name']}" already exists')
+    
+    def exists(self, name: str) -> bool:
+        statement = select(self._model.id).where(self._model.name == name).exists()
+        
+        return self._session.scalar(select(statement))
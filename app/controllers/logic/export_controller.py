@@ -0,0 +1,172 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+from typing import TYPE_CHECKING, TextIO
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from models.career import Career
+from models.student import Student
+from models.teacher import Teacher
+from models.student_subject import StudentSubject
+from models.subject import Subject
+from models.schedule import Schedule
+from models.subject_schedule import SubjectSchedule
+
+from controllers.logic.timetable_controller import TimetableController
+
+from utils.timetable_export import (FORMATS, TimetableEntry, TimetableSnapshot, write, filename, init_worker,
+                                    export_chunk)
+
+if TYPE_CHECKING:
+    from utils.term_snapshot import TermSnapshot
+
+
+class ExportController:
+    TERM_WEEKS = 16
+    CHUNK_SIZE = 250 #* timetables per task sent to a worker
+    
+    def __init__(self, session: Session, timetable_controller: TimetableController | None = None):
+        self._session = session
+        self._timetable_controller = timetable_controller or TimetableController(session)
+        
+    def _term(self, term_start: date | None, term_end: date | None) -> tuple[date, date]:
+        term_start = term_start or date.today()
+        
+        return term_start, term_end or term_start + timedelta(weeks=self.TERM_WEEKS)
+    
+    #* single timetable, rendered straight from the read model (one query)
+    def export_student(self, student_id: int, format: str, stream: TextIO, term_start: date | None = None,
+                       term_end: date | None = None
+                       ) -> None:
+        rows = self._timetable_controller.get_by_student(student_id)
+        
+        write(format, rows, stream, f'Horario del estudiante {student_id}', *self._term(term_start, term_end),
+              f'students-{student_id}')
+        
+    def export_teacher(self, teacher_id: int, format: str, stream: TextIO, term_start: date | None = None,
+                       term_end: date | None = None
+                       ) -> None:
+        rows = self._timetable_controller.get_by_teacher(teacher_id)
+        
+        write(format, rows, stream, f'Horario del docente {teacher_id}', *self._term(term_start, term_end),
+              f'teachers-{teacher_id}')
+        
+    def export_section(self, career_id: int, course: int, section: str, format: str, stream: TextIO,
+                       term_start: date | None = None, term_end: date | None = None
+                       ) -> None:
+        rows = self._timetable_controller.get_by_section(career_id, course, section)
+        
+        write(format, rows, stream, f'Horario {career_id} - {course} {section}', *self._term(term_start, term_end),
+              f'sections-{career_id}-{course}-{section}')
+        
+    #* every timetable of the university in four queries: sections (the read model),
+    #* careers, teachers and students with their enrollments streamed in student order
+    def snapshot(self) -> TimetableSnapshot:
+        sections = {}
+        by_teacher = {}
+        by_group = {}
+        
+        for row in self._timetable_controller.get_all():
+            sections[row.subject_schedule_id] = TimetableEntry(row.subject_schedule_id, row.subject, row.course,
+                                                               row.career_id, row.section, row.day, row.start_time,
+                                                               row.end_time, row.teacher)
+            
+            by_teacher.setdefault(row.teacher_id, []).append(row.subject_schedule_id)
+            by_group.setdefault((row.career_id, row.course, row.section), []).append(row.subject_schedule_id)
+        
+        careers = dict(self._session.execute(select(Career.id, Career.name)).all())
+        
+        owners = {'students': [], 'teachers': [], 'sections': []}
+        
+        for teacher in self._session.execute(select(Teacher.id, Teacher.name, Teacher.identification_number)):
+            if teacher.id in by_teacher:
+                owners['teachers'].append((filename(teacher.identification_number), f'Horario - {teacher.name}',
+                                           by_teacher[teacher.id]))
+        
+        for (career_id, course, section), subject_schedule_ids in sorted(by_group.items()):
+            owners['sections'].append((filename(f'{career_id}-{course}-{section}'),
+                                       f'Horario - {careers.get(career_id, career_id)} {course} {section}',
+                                       subject_schedule_ids))
+        
+        statement = (select(Student.id, Student.name, Student.identification_number, StudentSubject.subject_schedule_id)
+                     .join(StudentSubject, StudentSubject.student_id == Student.id)
+                     .order_by(Student.id)
+                     .execution_options(yield_per=5000))
+        
+        current = None
+        
+        for row in self._session.execute(statement):
+            if current is None or current[0] != row.id:
+                current = (row.id, (filename(row.identification_number), f'Horario - {row.name}', []))
+                
+                owners['students'].append(current[1])
+            
+            current[1][2].append(row.subject_schedule_id)
+        
+        return TimetableSnapshot(sections, owners)
+    
+    #* Writes every timetable (students, teachers and career/course sections) in every format under
+    #* directory/<kind>/. The snapshot is taken once and handed to each worker process through the
+    #* pool initializer; tasks are just (kind, start, end) ranges. workers=0 renders in this process.
+    def export_all(self, directory: str, formats: tuple[str, ...] = FORMATS, workers: int | None = None,
+                   term_start: date | None = None, term_end: date | None = None,
+                   kinds: tuple[str, ...] = ('students', 'teachers', 'sections')
+                   ) -> dict[str, int]:
+        for format in formats:
+            if format not in FORMATS:
+                raise ValueError(f'Unknown export format "{format}", expected one of {", ".join(FORMATS)}')
+        
+        snapshot = self.snapshot()
+        term_start, term_end = self._term(term_start, term_end)
+        
+        tasks = []
+        
+        for kind in kinds:
+            os.makedirs(os.path.join(directory, kind), exist_ok=True)
+            
+            for start in range(0, len(snapshot.owners[kind]), self.CHUNK_SIZE):
+                tasks.append((kind, start, start + self.CHUNK_SIZE))
+        
+        written = {kind: 0 for kind in kinds}
+        
+        if workers == 0:
+            for kind, start, end in tasks:
+                written[kind] += export_chunk(kind, start, end, directory, formats, term_start, term_end, snapshot)
+            
+            return written
+        
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(snapshot,)) as executor:
+            futures = [(kind, executor.submit(export_chunk, kind, start, end, directory, formats, term_start, term_end))
+                       for kind, start, end in tasks]
+            
+            for kind, future in futures:
+                written[kind] += future.result()
+        
+        return written
+    
+    #* Writes the whole term as a memory mappable file (see TermSnapshot) that read-only workers open
+    #* instead of querying; five streamed queries, no ORM objects
+    def write_term_snapshot(self, path: str) -> 'TermSnapshot':
+        #* numpy is only loaded by the processes that write or open a snapshot
+        from utils.term_snapshot import TermSnapshot, write_snapshot
+        
+        enrollments = self._session.execute(
+            select(StudentSubject.student_id, StudentSubject.subject_schedule_id).execution_options(yield_per=5000)
+        )
+        
+        write_snapshot(
+            path,
+            blocks=self._session.execute(select(Schedule.id, Schedule.day, Schedule.start_time, Schedule.end_time)).all(),
+            teachers=self._session.execute(select(Teacher.id, Teacher.name)).all(),
+            students=self._session.execute(select(Student.id, Student.name)).all(),
+            sections=self._session.execute(
+                select(SubjectSchedule.id, Subject.name, SubjectSchedule.section, SubjectSchedule.schedule_id,
+                       SubjectSchedule.teacher_id)
+                .join(Subject, Subject.id == SubjectSchedule.subject_id)
+            ).all(),
+            enrollments=(tuple(row) for row in enrollments)
+        )
+        
+        return TermSnapshot(path)
@@ -1,44 +1,59 @@
-from datetime import datetime
+from datetime import datetime, time
+from typing import Iterable, Iterator
 
-from sqlalchemy import select, Time
+from sqlalchemy import select, tuple_, Time
 from sqlalchemy.orm import Session
-from sqlalchemy.exc import IntegrityError
 
 from models.schedule import Schedule
 
 from utils.exceptions import ObjectAlreadyExistsException, ObjectNotFoundException
 from utils.day_of_week import DayOfWeek
+from utils.cache import LRUCache, get_cache, cached_lookup
+from utils.bulk import BulkResult, bulk_insert, existing_keys, chunked
+from utils.interval_tree import ScheduleIndex
+from utils.slot_grid import SlotGrid
+from utils.upsert import insert_ignore
+from utils.pagination import Page, DEFAULT_PAGE_SIZE, STREAM_BATCH_SIZE, get_page, iter_all
 
 
 class ScheduleController:
     FORMAT = '%H:%M:%S' #* 24 hours format
     
-    def __init__(self, session: Session, model: Schedule = Schedule):
+    def __init__(self, session: Session, model: Schedule = Schedule, schedule_index: ScheduleIndex | None = None,
+                 cache: LRUCache | None = get_cache('schedule'), slot_grid: SlotGrid | None = None
+                 ):
         self._session = session
         self._model = model
+        self._schedule_index = schedule_index
+        self._cache = cache
+        self._slot_grid = slot_grid
         
     def create(self, data: dict[str, any]) -> None:
         day = self._sanitize(data)
         
-        #! Modify the DB so that the respective fields are UNIQUE (eliminate this method if necessary)
-        validate_data = self._validate(data, day)
+        validate_data = self._convert(data, day)
         
-        schedule = self._create_schedule_object(validate_data)
+        #* the UNIQUE key on (day, start_time, end_time) rejects duplicates, so there is no exists() round trip
+        schedule_id = insert_ignore(self._session, self._model, validate_data)
         
-        try:
-            self._session.add(schedule)
-            self._session.commit()
-            
-        except IntegrityError:
+        if schedule_id is None:
             self._session.rollback()
             
             raise ObjectAlreadyExistsException(f'Schedule block already exists')
+        
+        self._session.commit()
+        
+        if self._schedule_index is not None:
+            self._schedule_index.add(validate_data['day'], validate_data['start_time'], validate_data['end_time'], schedule_id)
+        
+        if self._slot_grid is not None:
+            self._slot_grid.add_block(schedule_id, validate_data['day'], validate_data['start_time'], validate_data['end_time'])
     
     def _sanitize(self, data: dict[str, any]) -> str:
         return data['day'].strip().lower().capitalize()
     
     #* validates and converts data
-    def _validate(self, data: dict[str, any], day: str) -> dict[str, any]:       
+    def _convert(self, data: dict[str, any], day: str) -> dict[str, any]:
         try:
             start_time = datetime.strptime(data['start_time'], self.FORMAT).time()
             end_time = datetime.strptime(data['end_time'], self.FORMAT).time()
@@ -50,25 +65,59 @@ class ScheduleController:
         
         if start_time > end_time:
             raise ValueError('The start time cannot be greater than the end time')
-
-        if self.exists(data, day):
-            raise ObjectAlreadyExistsException(f'Schedule block already exists')
         
         return {'start_time': start_time, 'end_time': end_time, 'day': DayOfWeek(day)}
         
-    def _create_schedule_object(self, data: dict[str, any]) -> Schedule:
-        #* can be return self.model(**data)
+    def create_many(self, items: Iterable[dict[str, any]]) -> BulkResult:
+        result = BulkResult()
+        rows = {}
+        
+        for position, data in enumerate(items):
+            try:
+                validate_data = self._convert(data, self._sanitize(data))
+                
+            except (KeyError, AttributeError, ValueError) as e:
+                result.reject(position, data, str(e))
+                
+                continue
+            
+            key = (validate_data['start_time'], validate_data['end_time'], validate_data['day'])
+            
+            if key in rows:
+                result.reject(position, data, 'Schedule block is repeated in the batch')
+                
+                continue
+            
+            rows[key] = (position, validate_data)
+        
+        columns = [self._model.start_time, self._model.end_time, self._model.day]
+        
+        for key in existing_keys(self._session, columns, set(rows)):
+            position, data = rows.pop(key)
+            
+            result.reject(position, data, 'Schedule block already exists')
+        
+        bulk_insert(self._session, self._model, list(rows.values()), result)
         
-        return Schedule(
-            start_time = data['start_time'],
-            end_time = data['end_time'],
-            day = data['day']
-        )
+        if (self._schedule_index is not None or self._slot_grid is not None) and result.created:
+            keys = {(data['start_time'], data['end_time'], data['day']) for _, data in result.created}
+            
+            for chunk in chunked(list(keys)):
+                statement = select(self._model).where(tuple_(*columns).in_(chunk))
+                
+                for schedule in self._session.execute(statement).scalars():
+                    if self._schedule_index is not None:
+                        self._schedule_index.add(schedule.day, schedule.start_time, schedule.end_time, schedule.id)
+                    
+                    if self._slot_grid is not None:
+                        self._slot_grid.add_block(schedule.id, schedule.day, schedule.start_time, schedule.end_time)
+        
+        return result
     
     def get_by_id(self, id: int) -> Schedule:
         statement = select(self._model).where(self._model.id == id)
         
-        result = self._session.scalar(statement)
+        result = cached_lookup(self._session, self._cache, ('id', id), lambda: self._session.scalar(statement))
         
         if result is None:
             raise ObjectNotFoundException(f'Schedule with id "{id}" not found')
@@ -77,6 +126,43 @@ class ScheduleController:
     
     def get_all(self) -> list[Schedule]:
         return self._session.execute(select(self._model)).scalars().all()
+    
+    def get_page(self, after_id: int | None = None, page_size: int = DEFAULT_PAGE_SIZE, **filters: any) -> Page:
+        return get_page(self._session, self._model, after_id, page_size, **filters)
+    
+    def iter_all(self, batch_size: int = STREAM_BATCH_SIZE, **filters: any) -> Iterator[Schedule]:
+        return iter_all(self._session, self._model, batch_size, **filters)
+    
+    def schedule_index(self) -> ScheduleIndex:
+        #* built once from the DB, then kept current by create() and create_many()
+        if self._schedule_index is None:
+            self._schedule_index = ScheduleIndex()
+            
+            statement = select(self._model.id, self._model.day, self._model.start_time, self._model.end_time)
+            
+            for row in self._session.execute(statement):
+                self._schedule_index.add(row.day, row.start_time, row.end_time, row.id)
+        
+        return self._schedule_index
+    
+    def slot_grid(self) -> SlotGrid:
+        #* every existing block mapped onto the slots it touches; built once, then kept current like schedule_index()
+        if self._slot_grid is None:
+            statement = select(self._model.id, self._model.day, self._model.start_time, self._model.end_time)
+            
+            self._slot_grid = SlotGrid(blocks=self._session.execute(statement))
+        
+        return self._slot_grid
+    
+    #* ids of the blocks of that day overlapping [start, end), in O(log n + k)
+    def overlapping(self, day: DayOfWeek | str, start: time | str, end: time | str) -> list[int]:
+        if isinstance(start, str):
+            start = datetime.strptime(start, self.FORMAT).time()
+        
+        if isinstance(end, str):
+            end = datetime.strptime(end, self.FORMAT).time()
+        
+        return self.schedule_index().overlapping(DayOfWeek(day.strip().lower().capitalize()), start, end)
         
     def exists(self, data: dict[str, any], day: DayOfWeek) -> bool:
         statement = select(self._model.id).where(
@@ -85,4 +171,4 @@ class ScheduleController:
             self._model.day == day
         ).exists()
         
-        return self._session.scalar(statement)
+        return self._session.scalar(select(statement))
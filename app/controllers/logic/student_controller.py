@@ -1,50 +1,81 @@
+from typing import Iterable, Iterator
+
 from sqlalchemy import select
 from sqlalchemy.orm import Session
-from sqlalchemy.exc import IntegrityError
 
 from models.student import Student
 
 from utils.exceptions import ObjectAlreadyExistsException, ObjectNotFoundException
+from utils.bulk import BulkResult, bulk_insert, existing_keys, chunked
+from utils.upsert import insert_ignore
+from utils.normalization import normalize_identification_number
+from utils.search_index import SEARCH_LIMIT, SearchIndex, get_search_index
+from utils.pagination import Page, DEFAULT_PAGE_SIZE, STREAM_BATCH_SIZE, get_page, iter_all
 
 
 class StudentController:
-    def __init__(self, session: Session, model: Student = Student):
+    def __init__(self, session: Session, model: Student = Student,
+                 search_index: SearchIndex = get_search_index('student')
+                 ):
         self._session = session
         self._model = model
+        self._search_index = search_index
         
     def create(self, data: dict[str, str]) -> None:
         sanitize_data = self._sanitize(data)
         
-        #! Modify the DB so that the respective fields are UNIQUE (eliminate this method if necessary)
-        self._validate(sanitize_data)
-        
-        student = self._create_student_object(sanitize_data)
+        #* the UNIQUE key on identification_number rejects duplicates, so there is no exists() round trip
+        id = insert_ignore(self._session, self._model, sanitize_data)
         
-        try:
-            self._session.add(student)
-            self._session.commit()
-            
-        except IntegrityError:
+        if id is None:
             self._session.rollback()
             
-            raise ObjectAlreadyExistsException(f'Student with identification number "{data['identification_number']}" already exists')
+            raise ObjectAlreadyExistsException(f'Student with identification number "{sanitize_data['identification_number']}" already exists')
+        
+        self._session.commit()
+        
+        if self._search_index.loaded:
+            self._search_index.add(id, sanitize_data['name'], sanitize_data['identification_number'])
 
     def _sanitize(self, data: dict[str, str]) -> dict[str, str]:
         name = data['name'].strip()
-        identification_numer = data['identification_number'].strip().upper().replace('-', '')
+        identification_numer = normalize_identification_number(data['identification_number'])
         
         return {'name': name, 'identification_number': identification_numer}
+    
+    def create_many(self, items: Iterable[dict[str, str]]) -> BulkResult:
+        result = BulkResult()
+        rows = {}
+        
+        for position, data in enumerate(items):
+            try:
+                sanitize_data = self._sanitize(data)
+                
+            except (KeyError, AttributeError) as e:
+                result.reject(position, data, f'Invalid input data: {e}')
+                
+                continue
+            
+            identification_number = sanitize_data['identification_number']
+            
+            if identification_number in rows:
+                result.reject(position, data, f'Student with identification number "{identification_number}" is repeated in the batch')
+                
+                continue
+            
+            rows[identification_number] = (position, sanitize_data)
         
-    def _validate(self, data: dict[str, str]) -> None:
-        if self.exists(data['identification_number']):
-            raise ObjectAlreadyExistsException(f'Student with identification number "{data['identification_number']}" already exists')
+        for identification_number in existing_keys(self._session, [self._model.identification_number], set(rows)):
+            position, data = rows.pop(identification_number)
+            
+            result.reject(position, data, f'Student with identification number "{identification_number}" already exists')
+        
+        bulk_insert(self._session, self._model, list(rows.values()), result)
+        
+        self._index_created([data['identification_number'] for _, data in result.created])
+        
+        return result
         
-    def _create_student_object(self, data: dict[str, str]) -> Student:
-        return Student(
-            name=data['name'],
-            identification_number=data['identification_number']
-        )
-    
     def get_by_id(self, id: int) -> Student:
         statement = select(self._model).where(self._model.id == id)
         
@@ -66,6 +97,8 @@ class StudentController:
         return result
         
     def get_by_identification_number(self, identification_number: str) -> Student:
+        identification_number = normalize_identification_number(identification_number)
+        
         statement = select(self._model).where(self._model.identification_number == identification_number)
         
         result = self._session.scalar(statement)
@@ -75,8 +108,42 @@ class StudentController:
         
         return result
     
+    def search(self, query: str, limit: int = SEARCH_LIMIT) -> list[Student]:
+        #* accent and case insensitive, prefixes and small typos included; best match first
+        if not self._search_index.loaded:
+            self._search_index.load(self._session.execute(self._search_statement()))
+        
+        ids = [id for id, _ in self._search_index.search(query, limit)]
+        
+        if not ids:
+            return []
+        
+        found = {row.id: row for row in self._session.execute(select(self._model).where(self._model.id.in_(ids))).scalars()}
+        
+        return [found[id] for id in ids if id in found]
+    
+    def _search_statement(self):
+        return select(self._model.id, self._model.name, self._model.identification_number)
+    
+    #* new rows reach a loaded index right away; an index not loaded yet reads them when it loads
+    def _index_created(self, identification_numbers: list[str]) -> None:
+        if not self._search_index.loaded:
+            return
+        
+        for chunk in chunked(identification_numbers):
+            statement = self._search_statement().where(self._model.identification_number.in_(chunk))
+            
+            for row in self._session.execute(statement):
+                self._search_index.add(*row)
+    
     def get_all(self) -> list[Student]:
         return self._session.execute(select(self._model)).scalars().all()
+    
+    def get_page(self, after_id: int | None = None, page_size: int = DEFAULT_PAGE_SIZE, **filters: any) -> Page:
+        return get_page(self._session, self._model, after_id, page_size, **filters)
+    
+    def iter_all(self, batch_size: int = STREAM_BATCH_SIZE, **filters: any) -> Iterator[Student]:
+        return iter_all(self._session, self._model, batch_size, **filters)
         
     def update(self, old_name: str, new_name: str) -> None:
         sanitize_new_name = new_name.strip()
@@ -87,7 +154,12 @@ class StudentController:
         
         self._session.commit()
         
+        if self._search_index.loaded:
+            self._search_index.add(student.id, student.name, student.identification_number)
+        
     def exists(self, identification_number: str) -> bool:
+        identification_number = normalize_identification_number(identification_number)
+        
         statement = select(self._model.id).where(self._model.identification_number == identification_number).exists()
         
-        return self._session.scalar(statement)
+        return self._session.scalar(select(statement))
@@ -1,59 +1,457 @@
-from sqlalchemy import select, or_, and_
-from sqlalchemy.orm import Session
+from heapq import heappush, heappop
+from typing import Iterable, Iterator
+
+from sqlalchemy import select, insert, update, func, literal, or_, and_
+from sqlalchemy.orm import Session, joinedload
 from sqlalchemy.exc import IntegrityError
 
 from models.student_subject import StudentSubject
+from models.student import Student
+from models.subject_schedule import SubjectSchedule
+from models.schedule import Schedule
+from models.classroom import Classroom
 
 from controllers.logic.student_controller import StudentController
 from controllers.logic.subject_schedule_controller import SubjectScheduleController
 
-from utils.exceptions import ObjectAlreadyExistsException, ObjectNotFoundException
+from utils.exceptions import (ObjectAlreadyExistsException, ObjectNotFoundException, ScheduleConflictException,
+                              SectionFullException)
+from utils.bulk import BulkResult, bulk_insert, existing_keys, chunked
+from utils.student_interval_index import StudentIntervalIndex
+from utils.interval_tree import ScheduleIndex
+from utils.upsert import insert_ignore
+from utils.pagination import Page, DEFAULT_PAGE_SIZE, STREAM_BATCH_SIZE, get_page, iter_all
+from utils.versions import VersionCounter, get_version_counter
 
 
-class SubjectScheduleController:
+class StudentSubjectController:
     def __init__(self, session: Session, model: StudentSubject = StudentSubject,
                  student_controller: StudentController = StudentController,
-                 subject_schedule_controller: SubjectScheduleController = SubjectScheduleController
+                 subject_schedule_controller: SubjectScheduleController = SubjectScheduleController,
+                 interval_index: StudentIntervalIndex | None = None,
+                 versions: VersionCounter = get_version_counter('timetable')
                  ):
         self._session = session
         self._model = model
-        self._student_controller = student_controller
-        self._subject_schedule_controller = subject_schedule_controller
+        #* the defaults are the classes; they get this session like any instance a caller passes would
+        self._student_controller = student_controller(session) if isinstance(student_controller, type) else student_controller
+        self._subject_schedule_controller = (subject_schedule_controller(session) if isinstance(subject_schedule_controller, type)
+                                             else subject_schedule_controller)
+        self._interval_index = interval_index if interval_index is not None else StudentIntervalIndex()
+        self._versions = versions
         
     def create(self, data: dict[str, int]) -> None:
-        #! Modify the DB so that the respective fields are UNIQUE (eliminate this method if necessary)
         self._validate(data)
         
-        student_subject = self._create_student_subject_object(data)
+        block = self._blocks([data['subject_schedule_id']])[data['subject_schedule_id']]
         
-        try:
-            self._session.add(student_subject)
-            self._session.commit()
+        self._load_intervals([data['student_id']])
+        self._check_clash(data['student_id'], block)
+        
+        if not self._reserve(data['subject_schedule_id']):
+            self._session.rollback()
             
-        except IntegrityError:
+            raise SectionFullException(f'Subject_schedule with id {data['subject_schedule_id']} has no seats left')
+        
+        values = {'student_id': data['student_id'], 'subject_schedule_id': data['subject_schedule_id']}
+        
+        #* the UNIQUE key on (student_id, subject_schedule_id) rejects duplicates, so there is no exists() round trip;
+        #* the rollback also gives the seat back
+        if insert_ignore(self._session, self._model, values) is None:
             self._session.rollback()
             
             raise ObjectAlreadyExistsException(f'''Student with id {data['student_id']} is already attending classes from
                                                id {data['subject_schedule_id']}''')
         
+        self._versions.bump(self._session, ('student', data['student_id']))
+        self._session.commit()
+        
+        self._interval_index.add(data['student_id'], *block)
+        
     def _validate(self, data: dict[str, any]) -> None:       
         try:
-            student = self._student_controller.get_by_id(data['student_id'])
-            subject_schedule = self._subject_schedule_controller.get_by_id(data['subject_schedule_id'])
+            self._student_controller.get_by_id(data['student_id'])
+            self._subject_schedule_controller.get_by_id(data['subject_schedule_id'])
                     
         except ObjectNotFoundException:
-            raise ObjectNotFoundException(f'''Student {student.name} or subject_schedule with id {subject_schedule.id} not found''')
+            raise ObjectNotFoundException(f'''Student with id {data['student_id']} or subject_schedule with id
+                                          {data['subject_schedule_id']} not found''')
+        
+    #* takes seats of a section in one conditional UPDATE: two writers can't both get the last one
+    def _reserve(self, subject_schedule_id: int, seats: int = 1) -> bool:
+        statement = (update(SubjectSchedule)
+                     .where(SubjectSchedule.id == subject_schedule_id,
+                            or_(SubjectSchedule.capacity.is_(None), SubjectSchedule.enrolled + seats <= SubjectSchedule.capacity))
+                     .values(enrolled=SubjectSchedule.enrolled + seats)
+                     .execution_options(synchronize_session=False))
+        
+        return self._session.execute(statement).rowcount == 1
+    
+    #* subject_schedule_id -> (day, start_time, end_time, subject_schedule_id) in one query
+    def _blocks(self, subject_schedule_ids: Iterable[int]) -> dict[int, tuple[str, any, any, int]]:
+        blocks = {}
+        
+        for chunk in chunked(list(set(subject_schedule_ids))):
+            statement = (select(SubjectSchedule.id, Schedule.day, Schedule.start_time, Schedule.end_time)
+                         .join(Schedule, Schedule.id == SubjectSchedule.schedule_id)
+                         .where(SubjectSchedule.id.in_(chunk)))
+            
+            for row in self._session.execute(statement):
+                blocks[row.id] = (row.day, row.start_time, row.end_time, row.id)
+        
+        return blocks
+    
+    def _intervals_statement(self):
+        return (select(self._model.student_id, self._model.subject_schedule_id,
+                       Schedule.day, Schedule.start_time, Schedule.end_time)
+                .join(SubjectSchedule, SubjectSchedule.id == self._model.subject_schedule_id)
+                .join(Schedule, Schedule.id == SubjectSchedule.schedule_id))
+    
+    #* loads the enrolled blocks of students not yet in the interval index
+    def _load_intervals(self, student_ids: Iterable[int]) -> None:
+        missing = [student_id for student_id in set(student_ids) if not self._interval_index.has_student(student_id)]
+        
+        for chunk in chunked(missing):
+            for student_id in chunk:
+                self._interval_index.load_student(student_id)
+            
+            statement = self._intervals_statement().where(self._model.student_id.in_(chunk))
+            
+            for row in self._session.execute(statement):
+                self._interval_index.add(row.student_id, row.day, row.start_time, row.end_time, row.subject_schedule_id)
+    
+    def _check_clash(self, student_id: int, block: tuple[str, any, any, int]) -> None:
+        day, start_time, end_time, subject_schedule_id = block
+        
+        clash = self._interval_index.find_clash(student_id, day, start_time, end_time)
+        
+        #* enrolled blocks never overlap, so an existing enrollment in this same block is the only match
+        if clash == subject_schedule_id:
+            raise ObjectAlreadyExistsException(f'''Student with id {student_id} is already attending classes from
+                                               id {subject_schedule_id}''')
+        
+        if clash is not None:
+            raise ScheduleConflictException(f'''Student with id {student_id} already attends subject_schedule {clash}
+                                            on {day} at {start_time}-{end_time}, which overlaps id {subject_schedule_id}''')
+    
+    #* scans every enrollment once (sorted by student, day and start time) and reports all overlapping pairs
+    def find_clashes(self) -> list[dict[str, any]]:
+        #* sweep by start time keeping every block of the (student, day) still running in a heap by end time:
+        #* a block clashes with each one left after dropping those that ended at or before its start
+        statement = self._intervals_statement().order_by(self._model.student_id, Schedule.day, Schedule.start_time)
+        
+        clashes = []
+        current = None
+        active = []
+        
+        for row in self._session.execute(statement):
+            if (row.student_id, row.day) != current:
+                current = (row.student_id, row.day)
+                active = []
+            
+            while active and active[0][0] <= row.start_time:
+                heappop(active)
+            
+            for _, subject_schedule_id in sorted(active, key=lambda item: item[1]):
+                clashes.append({
+                    'student_id': row.student_id,
+                    'day': row.day,
+                    'subject_schedule_ids': (subject_schedule_id, row.subject_schedule_id)
+                })
+            
+            heappush(active, (row.end_time, row.subject_schedule_id))
+        
+        return clashes
+    
+    def create_many(self, items: Iterable[dict[str, int]]) -> BulkResult:
+        result = BulkResult()
+        rows = {}
+        
+        for position, data in enumerate(items):
+            try:
+                key = (data['student_id'], data['subject_schedule_id'])
+                
+            except (KeyError, TypeError) as e:
+                result.reject(position, data, f'Invalid input data: {e}')
+                
+                continue
+            
+            if key in rows:
+                result.reject(position, data, f'''Student with id {key[0]} is repeated in the batch for
+                                               id {key[1]}''')
+                
+                continue
+            
+            rows[key] = (position, {'student_id': key[0], 'subject_schedule_id': key[1]})
+        
+        student_ids = existing_keys(self._session, [Student.id], {student_id for student_id, _ in rows})
+        subject_schedule_ids = existing_keys(self._session, [SubjectSchedule.id],
+                                             {subject_schedule_id for _, subject_schedule_id in rows})
+        
+        columns = [self._model.student_id, self._model.subject_schedule_id]
+        existing = existing_keys(self._session, columns, set(rows))
+        
+        blocks = self._blocks(subject_schedule_ids)
+        self._load_intervals(student_ids)
+        
+        for key, (position, data) in list(rows.items()):
+            if key[0] not in student_ids or key[1] not in subject_schedule_ids:
+                result.reject(position, data, f'Student with id {key[0]} or subject_schedule with id {key[1]} not found')
+                
+            elif key in existing:
+                result.reject(position, data, f'''Student with id {key[0]} is already attending classes from
+                                               id {key[1]}''')
+                
+            else:
+                try:
+                    self._check_clash(key[0], blocks[key[1]])
+                    
+                    #* later rows of the same batch must see this block
+                    self._interval_index.add(key[0], *blocks[key[1]])
+                    
+                    continue
+                    
+                except ScheduleConflictException as e:
+                    result.reject(position, data, str(e))
+            
+            del rows[key]
+        
+        checked = len(rows)
+        self._reserve_batch(rows, result)
+        
+        #* rows dropped for lack of seats are already in the interval index
+        if len(rows) < checked:
+            self._interval_index = StudentIntervalIndex()
+        
+        #* the row by row retry of bulk_insert starts a new transaction, without the reservations: every
+        #* row takes its seat again and is rejected if the section filled up in between
+        def reserve(data: dict[str, int]) -> str | None:
+            if self._reserve(data['subject_schedule_id']):
+                return None
+            
+            return f'Subject_schedule with id {data['subject_schedule_id']} has no seats left'
+        
+        def bump(created: list[tuple[int, dict[str, int]]]) -> None:
+            self._versions.bump(self._session, *{('student', data['student_id']) for _, data in created})
+        
+        bulk_insert(self._session, self._model, list(rows.values()), result, reserve, bump)
+        
+        #* rows lost to a concurrent writer must not stay in the interval index
+        if result.rejected and len(result.created) < len(rows):
+            self._interval_index = StudentIntervalIndex()
+        
+        return result
         
-        if self.exists(data):
-            raise ObjectAlreadyExistsException(f'''Student {student.name} is already attending classes from
-                                               id {subject_schedule.id}''')
+    def assign_sections(self, requests: dict[int, Iterable[int]], capacity: int | None = None
+                        ) -> tuple[list[dict[str, int]], list[tuple[int, int]]]:
+        #* Batch enrollment: requests maps student_id -> subject ids; every student gets one clash-free section
+        #* of each subject (see SectioningEngine) and the rows are written in one bulk insert. A section holds
+        #* its own capacity, else its classroom's, else capacity (None: no limit).
+        #* Returns (rows created, (student_id, subject_id) pairs left without a section).
+        from utils.sectioning import Section, SectioningEngine #* min-cost flow, only loaded when sections are assigned
         
-    def _create_student_subject_object(self, data: dict[str, any]) -> StudentSubject:
-        return StudentSubject(
-            student_id=data['student_id'],
-            subject_schedule_id=data['subject_schedule_id']
-        )
+        student_ids = existing_keys(self._session, [Student.id], set(requests))
         
+        if len(student_ids) < len(requests):
+            missing = ', '.join(str(student_id) for student_id in sorted(set(requests) - student_ids))
+            
+            raise ObjectNotFoundException(f'Students with id {missing} not found')
+        
+        subject_ids = {subject_id for subject_ids in requests.values() for subject_id in subject_ids}
+        
+        schedules = self._session.execute(select(Schedule.id, Schedule.day, Schedule.start_time, Schedule.end_time)).all()
+        positions = {row.id: position for position, row in enumerate(schedules)}
+        schedule_index = ScheduleIndex()
+        
+        for row in schedules:
+            schedule_index.add(row.day, row.start_time, row.end_time, row.id)
+        
+        conflicts = {}
+        
+        for row in schedules:
+            conflicts[row.id] = 0
+            
+            for other_id in schedule_index.overlapping(row.day, row.start_time, row.end_time):
+                conflicts[row.id] |= 1 << positions[other_id]
+        
+        sections = {}
+        blocks = {}
+        subjects = {}
+        
+        for chunk in chunked(list(subject_ids)):
+            statement = (select(SubjectSchedule.id, SubjectSchedule.subject_id, SubjectSchedule.schedule_id,
+                                SubjectSchedule.enrolled, func.coalesce(SubjectSchedule.capacity, Classroom.capacity).label('capacity'))
+                         .outerjoin(Classroom, Classroom.id == SubjectSchedule.classroom_id)
+                         .where(SubjectSchedule.subject_id.in_(chunk)))
+            
+            for row in self._session.execute(statement):
+                sections.setdefault(row.subject_id, []).append(
+                    Section(row.id, 1 << positions[row.schedule_id], conflicts[row.schedule_id],
+                            row.capacity if row.capacity is not None else capacity, row.enrolled)
+                )
+                blocks[row.id] = row.schedule_id
+                subjects[row.id] = row.subject_id
+        
+        #* what every student already attends: blocks they are busy in and subjects they already have
+        busy = {}
+        taken = set()
+        
+        for chunk in chunked(list(student_ids)):
+            statement = (select(self._model.student_id, SubjectSchedule.subject_id, SubjectSchedule.schedule_id)
+                         .join(SubjectSchedule, SubjectSchedule.id == self._model.subject_schedule_id)
+                         .where(self._model.student_id.in_(chunk)))
+            
+            for row in self._session.execute(statement):
+                busy[row.student_id] = busy.get(row.student_id, 0) | 1 << positions[row.schedule_id]
+                taken.add((row.student_id, row.subject_id))
+        
+        pending = {student_id: [subject_id for subject_id in set(subject_ids) if (student_id, subject_id) not in taken]
+                   for student_id, subject_ids in requests.items()}
+        
+        assigned, unassigned = SectioningEngine(sections, busy).solve(pending)
+        
+        #* seats are taken in the same transaction as the rows, one conditional UPDATE per section; the students
+        #* of a section a concurrent writer filled since it was read are left without a section
+        by_section = {}
+        
+        for student_id, subject_schedule_id in assigned:
+            by_section.setdefault(subject_schedule_id, []).append(student_id)
+        
+        full = set()
+        
+        for subject_schedule_id, section_students in by_section.items():
+            if not self._reserve(subject_schedule_id, len(section_students)):
+                full.add(subject_schedule_id)
+                unassigned.extend((student_id, subjects[subject_schedule_id]) for student_id in section_students)
+        
+        assigned = [(student_id, subject_schedule_id) for student_id, subject_schedule_id in assigned
+                    if subject_schedule_id not in full]
+        
+        rows = [{'student_id': student_id, 'subject_schedule_id': subject_schedule_id}
+                for student_id, subject_schedule_id in assigned]
+        
+        if rows:
+            try:
+                self._session.execute(insert(self._model), rows)
+                self._versions.bump(self._session, *{('student', student_id) for student_id, _ in assigned})
+                self._session.commit()
+                
+            except IntegrityError:
+                self._session.rollback()
+                
+                raise ObjectAlreadyExistsException('Students were enrolled while the sections were being assigned')
+            
+            #* students already in the interval index must see their new blocks
+            schedule_rows = {row.id: row for row in schedules}
+            
+            for student_id, subject_schedule_id in assigned:
+                if self._interval_index.has_student(student_id):
+                    block = schedule_rows[blocks[subject_schedule_id]]
+                    self._interval_index.add(student_id, block.day, block.start_time, block.end_time, subject_schedule_id)
+        
+        return rows, unassigned
+    
+    #* drops the rows that don't fit in their section and reserves the seats of the rest, one UPDATE per section
+    def _reserve_batch(self, rows: dict[tuple[int, int], tuple[int, dict[str, int]]], result: BulkResult) -> None:
+        by_section = {}
+        
+        for key in rows:
+            by_section.setdefault(key[1], []).append(key)
+        
+        free = {}
+        
+        for chunk in chunked(list(by_section)):
+            statement = select(SubjectSchedule.id, SubjectSchedule.capacity, SubjectSchedule.enrolled).where(SubjectSchedule.id.in_(chunk))
+            
+            for row in self._session.execute(statement):
+                free[row.id] = None if row.capacity is None else max(0, row.capacity - row.enrolled)
+        
+        for subject_schedule_id, keys in by_section.items():
+            seats = len(keys) if free.get(subject_schedule_id) is None else min(len(keys), free[subject_schedule_id])
+            
+            #* a concurrent writer took seats since they were read: nothing of this section goes in
+            if seats and not self._reserve(subject_schedule_id, seats):
+                seats = 0
+            
+            for key in keys[seats:]:
+                position, data = rows.pop(key)
+                
+                result.reject(position, data, f'Subject_schedule with id {subject_schedule_id} has no seats left')
+    
+    #* Registration rush path. Every request runs under its own SAVEPOINT of one transaction, so a batch
+    #* of queued requests (see EnrollmentQueue) costs a single commit. The student's row is locked first
+    #* (SELECT ... FOR UPDATE), so enrollments of one student run one after the other even under READ
+    #* COMMITTED; the row then goes in through an INSERT ... SELECT that only inserts when nothing the student
+    #* attends overlaps the block, and the seat is taken by _reserve. Concurrent batches can neither
+    #* oversubscribe a section nor double book a student.
+    #* Returns one entry per request: None when enrolled, otherwise the exception that rejected it.
+    def enroll_batch(self, requests: list[dict[str, int]]) -> list[Exception | None]:
+        student_ids = existing_keys(self._session, [Student.id], {data['student_id'] for data in requests})
+        blocks = self._blocks({data['subject_schedule_id'] for data in requests})
+        
+        outcomes = []
+        
+        for data in requests:
+            try:
+                if data['student_id'] not in student_ids or data['subject_schedule_id'] not in blocks:
+                    raise ObjectNotFoundException(f'''Student with id {data['student_id']} or subject_schedule with id
+                                                  {data['subject_schedule_id']} not found''')
+                
+                with self._session.begin_nested():
+                    self._enroll(data['student_id'], blocks[data['subject_schedule_id']])
+                
+                outcomes.append(None)
+                
+            except (ObjectNotFoundException, ObjectAlreadyExistsException, ScheduleConflictException,
+                    SectionFullException) as e:
+                outcomes.append(e)
+                
+            except IntegrityError:
+                outcomes.append(ObjectAlreadyExistsException(f'''Student with id {data['student_id']} is already attending
+                                                              classes from id {data['subject_schedule_id']}'''))
+        
+        self._versions.bump(self._session, *{('student', data['student_id']) for data, outcome in zip(requests, outcomes)
+                                             if outcome is None})
+        self._session.commit()
+        
+        for data, outcome in zip(requests, outcomes):
+            if outcome is None and self._interval_index.has_student(data['student_id']):
+                self._interval_index.add(data['student_id'], *blocks[data['subject_schedule_id']])
+        
+        return outcomes
+    
+    def _enroll(self, student_id: int, block: tuple[str, any, any, int]) -> None:
+        day, start_time, end_time, subject_schedule_id = block
+        
+        #* serializes the clash check below with any other enrollment of this student
+        self._session.execute(select(Student.id).where(Student.id == student_id).with_for_update())
+        
+        overlapping = (select(self._model.subject_schedule_id)
+                       .join(SubjectSchedule, SubjectSchedule.id == self._model.subject_schedule_id)
+                       .join(Schedule, Schedule.id == SubjectSchedule.schedule_id)
+                       .where(self._model.student_id == student_id, Schedule.day == day,
+                              Schedule.start_time < end_time, Schedule.end_time > start_time))
+        
+        statement = (insert(self._model)
+                     .from_select(['student_id', 'subject_schedule_id'],
+                                  select(literal(student_id), literal(subject_schedule_id)).where(~overlapping.exists())))
+        
+        #* raising inside begin_nested() rolls the SAVEPOINT back, row included
+        if self._session.execute(statement).rowcount == 1:
+            if not self._reserve(subject_schedule_id):
+                raise SectionFullException(f'Subject_schedule with id {subject_schedule_id} has no seats left')
+            
+            return
+        
+        clash = self._session.scalar(overlapping.limit(1))
+        
+        if clash == subject_schedule_id:
+            raise ObjectAlreadyExistsException(f'''Student with id {student_id} is already attending classes from
+                                               id {subject_schedule_id}''')
+        
+        raise ScheduleConflictException(f'''Student with id {student_id} already attends subject_schedule {clash}
+                                        on {day} at {start_time}-{end_time}, which overlaps id {subject_schedule_id}''')
+    
     def get_by_id(self, id: int) -> StudentSubject:
         statement = select(self._model).where(self._model.id == id)
         
@@ -71,7 +469,11 @@ class SubjectScheduleController:
         except ObjectNotFoundException:
             raise ObjectNotFoundException(f'Student with id "{student_id}" not found')
         
-        statement = select(self._model).where(self._model.student_id == student.id)
+        #* subject, schedule and teacher come in the same statement, no query per row
+        statement = (select(self._model).where(self._model.student_id == student.id)
+                     .options(joinedload(self._model.subject_schedule).joinedload(SubjectSchedule.subject),
+                              joinedload(self._model.subject_schedule).joinedload(SubjectSchedule.schedule),
+                              joinedload(self._model.subject_schedule).joinedload(SubjectSchedule.teacher)))
         
         result = self._session.execute(statement).scalars().all()
         
@@ -82,9 +484,15 @@ class SubjectScheduleController:
     
     def get_all(self) -> list[StudentSubject]:
         return self._session.execute(select(self._model)).scalars().all()
+    
+    def get_page(self, after_id: int | None = None, page_size: int = DEFAULT_PAGE_SIZE, **filters: any) -> Page:
+        return get_page(self._session, self._model, after_id, page_size, **filters)
+    
+    def iter_all(self, batch_size: int = STREAM_BATCH_SIZE, **filters: any) -> Iterator[StudentSubject]:
+        return iter_all(self._session, self._model, batch_size, **filters)
         
     def exists(self, data: dict[str, any]) -> bool:
-        statement =  and_(self._model.student_id == data['student_id'],
-                          self._model.subject_schedule_id == data['subject_schedule_id']).exists()
+        statement = select(self._model.id).where(and_(self._model.student_id == data['student_id'],
+                                                      self._model.subject_schedule_id == data['subject_schedule_id'])).exists()
         
-        return self._session.scalar(statement)
+        return self._session.scalar(select(statement))
@@ -1,65 +1,129 @@
+from typing import Iterable, Iterator
+
 from sqlalchemy import select
 from sqlalchemy.orm import Session
-from sqlalchemy.exc import IntegrityError
 
 from models.subject import Subject
+from models.career import Career
 
 from controllers.logic.career_controller import CareerController
 
 from utils.exceptions import ObjectAlreadyExistsException, ObjectNotFoundException
+from utils.classroom_type import ClassroomType
+from utils.cache import LRUCache, get_cache, cached_lookup
+from utils.bulk import BulkResult, bulk_insert, existing_keys, chunked
+from utils.upsert import insert_ignore
+from utils.search_index import SEARCH_LIMIT, SearchIndex, get_search_index
+from utils.pagination import Page, DEFAULT_PAGE_SIZE, STREAM_BATCH_SIZE, get_page, iter_all
 
 
 class SubjectController:
     def __init__(self, session: Session, model: Subject = Subject,
-                 career_controller: CareerController = CareerController
+                 career_controller: CareerController = CareerController,
+                 cache: LRUCache | None = get_cache('subject'),
+                 search_index: SearchIndex = get_search_index('subject')
                  ):
         self._session = session
         self._model = model
-        self._career_controller = career_controller
+        #* the default is the class; it gets this session like any instance a caller passes would
+        self._career_controller = career_controller(session) if isinstance(career_controller, type) else career_controller
+        self._cache = cache
+        self._search_index = search_index
         
     def create(self, data: dict[str, str]) -> None:
         sanitize_name = self._sanitize(data)
         
-        #! Modify the DB so that the respective fields are UNIQUE (eliminate this method if necessary)
         validate_data = self._validate(data, sanitize_name)
         
-        subject = self._create_subject_object(validate_data)
+        #* the UNIQUE key on name rejects duplicates, so there is no exists() round trip
+        id = insert_ignore(self._session, self._model, validate_data)
         
-        try:
-            self._session.add(subject)
-            self._session.commit()
-            
-        except IntegrityError:
+        if id is None:
             self._session.rollback()
             
             raise ObjectAlreadyExistsException(f'Subject "{sanitize_name}" already exists')
+        
+        self._session.commit()
+        
+        self._invalidate(('name', sanitize_name))
+        
+        if self._search_index.loaded:
+            self._search_index.add(id, sanitize_name)
+
+    def _invalidate(self, *keys: tuple[str, any]) -> None:
+        if self._cache is not None:
+            self._cache.invalidate(*keys)
 
     def _sanitize(self, data: dict[str, any]) -> str:
         return data['name'].strip()
+    
+    def _classroom_type(self, data: dict[str, any]) -> ClassroomType | None:
+        if data.get('classroom_type') is None:
+            return None
         
-    def _validate(self, data: dict[str, any], name: str) -> dict[str, any]:
-        if self.exists(name):
-            raise ObjectAlreadyExistsException(f'Subject "{name}" already exists')
+        try:
+            return ClassroomType(data['classroom_type'])
         
+        except ValueError:
+            raise ValueError(f'Invalid classroom type "{data['classroom_type']}"')
+        
+    def _validate(self, data: dict[str, any], name: str) -> dict[str, any]:
         try:
             career = self._career_controller.get_by_id(data['career_id'])
         
         except ObjectNotFoundException:
             raise ObjectNotFoundException(f'Career with id {data['career_id']} not found')
         
-        return {'name': name, 'course': data['course'], 'career_id': career.id}
+        return {'name': name, 'course': data['course'], 'career_id': career.id,
+                'classroom_type': self._classroom_type(data)}
+        
+    def create_many(self, items: Iterable[dict[str, any]]) -> BulkResult:
+        result = BulkResult()
+        rows = {}
+        
+        for position, data in enumerate(items):
+            try:
+                sanitize_name = self._sanitize(data)
+                validate_data = {'name': sanitize_name, 'course': data['course'], 'career_id': data['career_id'],
+                                 'classroom_type': self._classroom_type(data)}
+                
+            except (KeyError, AttributeError, ValueError) as e:
+                result.reject(position, data, f'Invalid input data: {e}')
+                
+                continue
+            
+            if sanitize_name in rows:
+                result.reject(position, data, f'Subject "{sanitize_name}" is repeated in the batch')
+                
+                continue
+            
+            rows[sanitize_name] = (position, validate_data)
+        
+        for name in existing_keys(self._session, [self._model.name], set(rows)):
+            position, data = rows.pop(name)
+            
+            result.reject(position, data, f'Subject "{name}" already exists')
         
-    def _create_subject_object(self, data: dict[str, any]) -> Subject:
-        return Subject(
-            name=data['name'],
-            course=data['course'],
-            career_id=data['career_id']
-        )
+        career_ids = existing_keys(self._session, [Career.id], {data['career_id'] for _, data in rows.values()})
+        
+        for name, (position, data) in list(rows.items()):
+            if data['career_id'] not in career_ids:
+                del rows[name]
+                
+                result.reject(position, data, f'Career with id {data["career_id"]} not found')
+        
+        bulk_insert(self._session, self._model, list(rows.values()), result)
+        
+        self._invalidate(*(('name', data['name']) for _, data in result.created))
+        
+        self._index_created([data['name'] for _, data in result.created])
+        
+        return result
         
     def get_by_id(self, id: int) -> Subject:
         statement = select(self._model).where(self._model.id == id)
         
-        result = self._session.scalar(statement)
+        result = cached_lookup(self._session, self._cache, ('id', id), lambda: self._session.scalar(statement))
         
         if result is None:
             raise ObjectNotFoundException(f'Subject with id "{id}" not found')
@@ -69,7 +133,7 @@ class SubjectController:
     def get_by_name(self, name: str) -> Subject:
         statement = select(self._model).where(self._model.name == name)
         
-        result = self._session.scalar(statement)
+        result = cached_lookup(self._session, self._cache, ('name', name), lambda: self._session.scalar(statement))
         
         if result is None:
             raise ObjectNotFoundException(f'Subject "{name}" not found')
@@ -92,10 +156,42 @@ class SubjectController:
         
         return result
     
+    def search(self, query: str, limit: int = SEARCH_LIMIT) -> list[Subject]:
+        #* accent and case insensitive, prefixes and small typos included; best match first
+        if not self._search_index.loaded:
+            self._search_index.load(self._session.execute(self._search_statement()))
+        
+        ids = [id for id, _ in self._search_index.search(query, limit)]
+        
+        if not ids:
+            return []
+        
+        found = {row.id: row for row in self._session.execute(select(self._model).where(self._model.id.in_(ids))).scalars()}
+        
+        return [found[id] for id in ids if id in found]
+    
+    def _search_statement(self):
+        return select(self._model.id, self._model.name)
+    
+    #* new rows reach a loaded index right away; an index not loaded yet reads them when it loads
+    def _index_created(self, names: list[str]) -> None:
+        if not self._search_index.loaded:
+            return
+        
+        for chunk in chunked(names):
+            for row in self._session.execute(self._search_statement().where(self._model.name.in_(chunk))):
+                self._search_index.add(*row)
+    
     def get_all(self) -> list[Subject]:
         return self._session.execute(select(self._model)).scalars().all()
+    
+    def get_page(self, after_id: int | None = None, page_size: int = DEFAULT_PAGE_SIZE, **filters: any) -> Page:
+        return get_page(self._session, self._model, after_id, page_size, **filters)
+    
+    def iter_all(self, batch_size: int = STREAM_BATCH_SIZE, **filters: any) -> Iterator[Subject]:
+        return iter_all(self._session, self._model, batch_size, **filters)
         
     def exists(self, name: str) -> bool:
         statement = select(self._model.id).where(self._model.name == name).exists()
         
-        return self._session.scalar(statement)
+        return self._session.scalar(select(statement))
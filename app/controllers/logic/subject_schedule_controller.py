@@ -1,68 +1,598 @@
-from sqlalchemy import select, or_, and_
-from sqlalchemy.orm import Session
+from typing import TYPE_CHECKING, Iterable, Iterator
+
+from sqlalchemy import select, insert, update, func, or_, and_
+from sqlalchemy.orm import Session, joinedload
 from sqlalchemy.exc import IntegrityError
 
 from models.subject_schedule import SubjectSchedule
+from models.subject import Subject
+from models.schedule import Schedule
+from models.teacher import Teacher
+from models.classroom import Classroom
+from models.student_subject import StudentSubject
 
 from controllers.logic.subject_controller import SubjectController
 from controllers.logic.schedule_controller import ScheduleController
 from controllers.logic.teacher_controller import TeacherController
 
-from utils.exceptions import ObjectAlreadyExistsException, ObjectNotFoundException
+from utils.exceptions import ObjectAlreadyExistsException, ObjectNotFoundException, ScheduleConflictException
+from utils.day_of_week import DayOfWeek
+from utils.bulk import BulkResult, bulk_insert, existing_keys, chunked
+from utils.occupancy_index import OccupancyIndex
+from utils.interval_tree import ScheduleIndex
+from utils.slot_grid import SlotGrid
+from utils.change_set import ChangeSet
+from utils.upsert import insert_ignore
+from utils.pagination import Page, DEFAULT_PAGE_SIZE, STREAM_BATCH_SIZE, get_page, iter_all
+from utils.versions import VersionCounter, get_version_counter
+
+if TYPE_CHECKING:
+    from utils.timetable_quality import QualityWeights, TimetableQuality
+
+
+SLOTS = SlotGrid() #* decodes the teachers' availability columns; holds no blocks
+
+#* the solver, the room assignment (min-cost flow) and the quality engine are imported by the methods
+#* that use them, so importing the controller for a create() doesn't load them
 
 
 class SubjectScheduleController:
     def __init__(self, session: Session, model: SubjectSchedule = SubjectSchedule,
                  subject_controller: SubjectController = SubjectController,
                  schedule_controller: ScheduleController = ScheduleController,
-                 teacher_controller: TeacherController = TeacherController
+                 teacher_controller: TeacherController = TeacherController,
+                 occupancy_index: OccupancyIndex | None = None,
+                 versions: VersionCounter = get_version_counter('timetable')
                  ):
         self._session = session
         self._model = model
-        self._subject_controller = subject_controller
-        self._schedule_controller = schedule_controller
-        self._teacher_controller = teacher_controller
+        #* the defaults are the classes; they get this session like any instance a caller passes would
+        self._subject_controller = subject_controller(session) if isinstance(subject_controller, type) else subject_controller
+        self._schedule_controller = schedule_controller(session) if isinstance(schedule_controller, type) else schedule_controller
+        self._teacher_controller = teacher_controller(session) if isinstance(teacher_controller, type) else teacher_controller
+        self._occupancy_index = occupancy_index
+        self._versions = versions
         
     def create(self, data: dict[str, any]) -> None:
-        #! Modify the DB so that the respective fields are UNIQUE (eliminate this method if necessary)
-        self._validate(data)
+        if self._occupancy_index is None:
+            self._validate(data)
+            
+        else:
+            self._validate_with_index(data)
         
-        student_subject = self._create_subject_schedule_object(data)
+        values = {key: data[key] for key in ('section', 'subject_id', 'schedule_id', 'teacher_id')}
+        values['capacity'] = self._capacity(data)
         
-        try:
-            self._session.add(student_subject)
-            self._session.commit()
-            
-        except IntegrityError:
+        #* the UNIQUE keys on (subject_id, section) and (teacher_id, schedule_id) reject duplicates,
+        #* so there is no exists() round trip
+        if insert_ignore(self._session, self._model, values) is None:
             self._session.rollback()
             
             raise ObjectAlreadyExistsException(f'''Teacher with id {data['teacher_id']} already teaches classes in the
                                                schedule with id {data['schedule_id']} or section {data['section']} already exists for
                                                the subject with id {data['subject_id']}''')
         
+        #* a section shows in the timetables of its teacher, its group and every student in it
+        self._versions.bump_all(self._session)
+        self._session.commit()
+        
+        if self._occupancy_index is not None:
+            self._occupancy_index.add(values)
+        
+    def _capacity(self, data: dict[str, any]) -> int | None:
+        if data.get('capacity') is None:
+            return None
+        
+        capacity = int(data['capacity'])
+        
+        if capacity < 0:
+            raise ValueError(f'Invalid capacity {data['capacity']} for section {data['section']}')
+        
+        return capacity
+    
     def _validate(self, data: dict[str, any]) -> None:       
         try:
-            subject = self._subject_controller.get_by_id(data['subject_id'])
+            self._subject_controller.get_by_id(data['subject_id'])
             schedule = self._schedule_controller.get_by_id(data['schedule_id'])
             teacher = self._teacher_controller.get_by_id(data['teacher_id'])
                     
         except ObjectNotFoundException:
-            raise ObjectNotFoundException(f'''Subject {subject.name} or schedule with id {schedule.id}
-                                          or teacher {teacher.name} not found''')
-        
-        if self.exists(data):
-            raise ObjectAlreadyExistsException(f'''Teacher {teacher.name} already teaches classes at time
-                                               {schedule.start_time}-{schedule.end_time} or
-                                               section {data['section']} already exists for the subject {subject.name}''')
-        
-    def _create_subject_schedule_object(self, data: dict[str, any]) -> SubjectSchedule:
-        return SubjectSchedule(
-            section=data['section'],
-            subject_id=data['subject_id'],
-            schedule_id=data['schedule_id'],
-            teacher_id=data['teacher_id']
+            raise ObjectNotFoundException(f'''Subject with id {data['subject_id']} or schedule with id {data['schedule_id']}
+                                          or teacher with id {data['teacher_id']} not found''')
+        
+        if SLOTS.window(schedule.day, schedule.start_time, schedule.end_time) & SLOTS.unavailable(SLOTS.from_bytes(teacher.availability)):
+            raise ScheduleConflictException(f'Teacher with id {data['teacher_id']} is not available in the schedule with id {data['schedule_id']}')
+        
+        #* the UNIQUE key on (teacher_id, schedule_id) only catches the very same block, not one that overlaps it
+        overlapping = self._schedule_controller.overlapping(schedule.day, schedule.start_time, schedule.end_time)
+        statement = select(self._model.id).where(self._model.teacher_id == data['teacher_id'],
+                                                 self._model.schedule_id.in_(overlapping)).exists()
+        
+        if self._session.scalar(select(statement)):
+            raise ObjectAlreadyExistsException(f'''Teacher with id {data['teacher_id']} already teaches classes in the
+                                               schedule with id {data['schedule_id']} or section {data['section']} already exists for
+                                               the subject with id {data['subject_id']}''')
+        
+    #* same checks as _validate, answered by the occupancy index without querying the DB
+    def _validate_with_index(self, data: dict[str, any]) -> None:
+        index = self._occupancy_index
+        
+        if not (index.has_subject(data['subject_id']) and index.has_schedule(data['schedule_id'])
+                and index.has_teacher(data['teacher_id'])):
+            raise ObjectNotFoundException(f'''Subject with id {data['subject_id']} or schedule with id {data['schedule_id']}
+                                          or teacher with id {data['teacher_id']} not found''')
+        
+        if not index.is_teacher_available(data['teacher_id'], data['schedule_id']):
+            raise ScheduleConflictException(f'Teacher with id {data['teacher_id']} is not available in the schedule with id {data['schedule_id']}')
+        
+        if index.conflicts(data):
+            raise ObjectAlreadyExistsException(f'''Teacher with id {data['teacher_id']} already teaches classes in the
+                                               schedule with id {data['schedule_id']} or section {data['section']} already exists for
+                                               the subject with id {data['subject_id']}''')
+        
+    def load_occupancy_index(self) -> OccupancyIndex:
+        #* one query per table; the index is kept current by create() and generate() afterwards
+        schedules = self._session.execute(select(Schedule.id, Schedule.day, Schedule.start_time, Schedule.end_time)).all()
+        days = list(DayOfWeek)
+        schedules.sort(key=lambda row: (days.index(DayOfWeek(row.day)), row.start_time))
+        
+        index = OccupancyIndex(
+            schedule_ids=[row.id for row in schedules],
+            teacher_ids=self._session.execute(select(Teacher.id)).scalars().all(),
+            subject_ids=self._session.execute(select(Subject.id)).scalars().all()
         )
         
+        schedule_index = ScheduleIndex()
+        
+        for row in schedules:
+            schedule_index.add(row.day, row.start_time, row.end_time, row.id)
+        
+        for row in schedules:
+            index.add_schedule(row.id, schedule_index.overlapping(row.day, row.start_time, row.end_time))
+        
+        #* availabilities are slot masks; on the index they become masks over its block positions
+        grid = SlotGrid(blocks=schedules)
+        
+        for teacher_id, (unavailable, preferred) in self._teacher_slots().items():
+            if index.has_teacher(teacher_id):
+                index.set_teacher_slots(teacher_id, grid.blocks_touching(index.schedule_ids, unavailable),
+                                        grid.blocks_within(index.schedule_ids, preferred))
+        
+        statement = select(self._model.section, self._model.subject_id, self._model.schedule_id, self._model.teacher_id)
+        
+        for row in self._session.execute(statement).mappings():
+            index.add(row)
+        
+        self._occupancy_index = index
+        
+        return index
+    
+    def _teacher_slots(self) -> dict[int, tuple[int, int]]:
+        #* teacher_id -> (unavailable slots, preferred slots) of the teachers with either one set
+        statement = (select(Teacher.id, Teacher.availability, Teacher.preference)
+                     .where(or_(Teacher.availability.is_not(None), Teacher.preference.is_not(None))))
+        
+        return {row.id: SLOTS.slot_masks(row.availability, row.preference) for row in self._session.execute(statement)}
+    
+    def _teacher_blocks(self, teacher_ids: Iterable[int]) -> dict[int, ScheduleIndex]:
+        #* teacher_id -> the blocks that teacher already teaches in, to find the ones a new block overlaps
+        teacher_blocks = {}
+        
+        for chunk in chunked(list(teacher_ids)):
+            statement = (select(self._model.teacher_id, Schedule.day, Schedule.start_time, Schedule.end_time, Schedule.id)
+                         .join(Schedule, Schedule.id == self._model.schedule_id)
+                         .where(self._model.teacher_id.in_(chunk)))
+            
+            for teacher_id, *block in self._session.execute(statement):
+                teacher_blocks.setdefault(teacher_id, ScheduleIndex()).add(*block)
+        
+        return teacher_blocks
+    
+    def create_many(self, items: Iterable[dict[str, any]]) -> BulkResult:
+        result = BulkResult()
+        rows = []
+        
+        for position, data in enumerate(items):
+            try:
+                rows.append((position, {key: data[key] for key in ('section', 'subject_id', 'schedule_id', 'teacher_id')}
+                                        | {'capacity': self._capacity(data)}))
+                
+            except (KeyError, TypeError, ValueError) as e:
+                result.reject(position, data, f'Invalid input data: {e}')
+        
+        subject_ids = existing_keys(self._session, [Subject.id], {data['subject_id'] for _, data in rows})
+        schedule_ids = existing_keys(self._session, [Schedule.id], {data['schedule_id'] for _, data in rows})
+        teacher_ids = existing_keys(self._session, [Teacher.id], {data['teacher_id'] for _, data in rows})
+        
+        if self._occupancy_index is None:
+            sections = existing_keys(self._session, [self._model.subject_id, self._model.section],
+                                     {(data['subject_id'], data['section']) for _, data in rows})
+            teacher_blocks = self._teacher_blocks(teacher_ids)
+            blocks = {row.id: row for chunk in chunked(list(schedule_ids)) for row in self._session.execute(
+                select(Schedule.id, Schedule.day, Schedule.start_time, Schedule.end_time).where(Schedule.id.in_(chunk)))}
+            
+            teacher_slots = self._teacher_slots()
+            grid = SlotGrid(blocks=blocks.values()) if teacher_slots else None
+        
+        valid_rows = []
+        
+        for position, data in rows:
+            if (data['subject_id'] not in subject_ids or data['schedule_id'] not in schedule_ids
+                    or data['teacher_id'] not in teacher_ids):
+                result.reject(position, data, f'''Subject with id {data['subject_id']} or schedule with id {data['schedule_id']}
+                                          or teacher with id {data['teacher_id']} not found''')
+                
+                continue
+            
+            if self._occupancy_index is None:
+                available = (data['teacher_id'] not in teacher_slots or not grid.has_block(data['schedule_id'])
+                             or grid.fits(data['schedule_id'], teacher_slots[data['teacher_id']][0]))
+                
+            else:
+                available = self._occupancy_index.is_teacher_available(data['teacher_id'], data['schedule_id'])
+            
+            if not available:
+                result.reject(position, data, f'Teacher with id {data['teacher_id']} is not available in the schedule with id {data['schedule_id']}')
+                
+                continue
+            
+            section = (data['subject_id'], data['section'])
+            
+            if self._occupancy_index is None:
+                #* any block overlapping this one, stored or earlier in the batch, not just the same block
+                block = blocks[data['schedule_id']]
+                taken = teacher_blocks.setdefault(data['teacher_id'], ScheduleIndex())
+                conflict = section in sections or bool(taken.overlapping(block.day, block.start_time, block.end_time))
+                
+                if not conflict:
+                    sections.add(section)
+                    taken.add(block.day, block.start_time, block.end_time, block.id)
+                
+            else:
+                conflict = self._occupancy_index.conflicts(data)
+                
+                if not conflict:
+                    self._occupancy_index.add(data)
+            
+            if conflict:
+                result.reject(position, data, f'''Teacher with id {data['teacher_id']} already teaches classes in the
+                                               schedule with id {data['schedule_id']} or section {data['section']} already exists for
+                                               the subject with id {data['subject_id']}''')
+                
+                continue
+            
+            valid_rows.append((position, data))
+        
+        bulk_insert(self._session, self._model, valid_rows, result,
+                    before_commit=lambda created: self._versions.bump_all(self._session))
+        
+        if self._occupancy_index is not None:
+            valid_positions = {position for position, _ in valid_rows}
+            
+            for position, data, _ in result.rejected:
+                if position in valid_positions:
+                    self._occupancy_index.remove(data)
+        
+        return result
+        
+    def generate(self, career_id: int | None = None, course: int | None = None,
+                 sections: tuple[str, ...] = ('A',), qualified: dict[int, list[int]] | None = None
+                 ) -> list[dict[str, any]]:
+        #* fills subject_schedule for every subject of the career/course (all careers if None)
+        #* qualified maps subject_id -> teacher ids allowed to teach it (any teacher if missing)
+        subjects = self._session.execute(self._subjects_statement(career_id, course)).all()
+        
+        if not subjects:
+            raise ObjectNotFoundException(f'No subjects found for career {career_id} and course {course}')
+        
+        index = self._occupancy_index or self.load_occupancy_index()
+        
+        from utils.timetable_solver import TimetableSolver
+        
+        solver = TimetableSolver(index, self._session.execute(select(Teacher.id)).scalars().all(), qualified)
+        
+        existing = self._session.execute(
+            select(self._model.section, self._model.schedule_id, Subject.career_id, Subject.course)
+            .join(Subject, Subject.id == self._model.subject_id)
+        ).all()
+        
+        for row in existing:
+            solver.occupy((row.career_id, row.course, row.section), row.schedule_id)
+        
+        pending = [(subject.id, section, (subject.career_id, subject.course, section))
+                   for subject in subjects for section in sections if not index.section_exists(subject.id, section)]
+        
+        if not pending:
+            return []
+        
+        rows = solver.solve(pending)
+        
+        try:
+            self._session.execute(insert(self._model), rows)
+            self._versions.bump_all(self._session)
+            self._session.commit()
+            
+        except IntegrityError:
+            self._session.rollback()
+            
+            for row in rows:
+                index.remove(row)
+            
+            raise ObjectAlreadyExistsException('Subject_schedule rows were created while the timetable was being generated')
+        
+        return rows
+    
+    def repair(self, change_set: ChangeSet, qualified: dict[int, list[int]] | None = None) -> list[dict[str, any]]:
+        #* re-places only the sections the change set touches (and, if needed, sections of the same group)
+        #* instead of generating the term again; rows keep their id, so enrollments follow their section.
+        #* Returns the rows that changed, with 'id' for existing sections.
+        index = self._occupancy_index or self.load_occupancy_index()
+        
+        rows = self._session.execute(
+            select(self._model.id, self._model.subject_id, self._model.section, self._model.schedule_id,
+                   self._model.teacher_id, self._model.classroom_id, Subject.career_id, Subject.course)
+            .join(Subject, Subject.id == self._model.subject_id)
+        ).all()
+        
+        affected = {row.id for row in rows if row.teacher_id in change_set.unavailable_teachers
+                    or row.schedule_id in change_set.withdrawn_schedules}
+        
+        displaced = []
+        new_items = []
+        
+        if change_set.new_sections:
+            subjects = {row.id: row for row in self._session.execute(
+                select(Subject.id, Subject.career_id, Subject.course)
+                .where(Subject.id.in_({subject_id for subject_id, _ in change_set.new_sections}))
+            )}
+            
+            for subject_id, section in change_set.new_sections:
+                if subject_id not in subjects:
+                    raise ObjectNotFoundException(f'Subject with id {subject_id} not found')
+                
+                if index.section_exists(subject_id, section):
+                    raise ObjectAlreadyExistsException(f'Section {section} already exists for the subject with id {subject_id}')
+                
+                subject = subjects[subject_id]
+                new_items.append((subject_id, section, (subject.career_id, subject.course, section)))
+                displaced.append((new_items[-1], None, None))
+        
+        teacher_ids = [teacher_id for teacher_id in self._session.execute(select(Teacher.id)).scalars()
+                       if teacher_id not in change_set.unavailable_teachers]
+        
+        from utils.timetable_solver import TimetableSolver
+        
+        solver = TimetableSolver(index, teacher_ids, qualified)
+        
+        for schedule_id in change_set.withdrawn_schedules:
+            solver.withdraw(schedule_id)
+        
+        ids = {}
+        groups = {item[2] for item in new_items} | {(row.career_id, row.course, row.section) for row in rows if row.id in affected}
+        
+        for row in rows:
+            item = (row.subject_id, row.section, (row.career_id, row.course, row.section))
+            ids[item[:2]] = row.id
+            
+            if row.id in affected:
+                displaced.append((item, row.schedule_id, row.teacher_id))
+                
+            elif item[2] in groups:
+                #* direct conflicts: the repair may move them if nothing else is free
+                solver.adopt(item, row.schedule_id, row.teacher_id)
+                
+            else:
+                solver.occupy(item[2], row.schedule_id)
+        
+        if not displaced:
+            return []
+        
+        changed = solver.repair(displaced, self._busy_students(index, {ids[item[:2]]: item for item, schedule_id, _ in displaced
+                                                                        if schedule_id is not None}))
+        
+        #* moved direct conflicts go to blocks nobody holds, so writing them first never trips the unique keys
+        updates = sorted(({'id': ids[(row['subject_id'], row['section'])], **row} for row in changed
+                          if (row['subject_id'], row['section']) in ids), key=lambda row: row['id'] in affected)
+        created = [row for row in changed if (row['subject_id'], row['section']) not in ids]
+        
+        #* a section moved to another block leaves its room behind (run assign_classrooms afterwards)
+        placed = {row.id: (row.schedule_id, row.classroom_id) for row in rows}
+        
+        for row in updates:
+            schedule_id, classroom_id = placed[row['id']]
+            row['classroom_id'] = classroom_id if row['schedule_id'] == schedule_id else None
+        
+        try:
+            if updates:
+                self._session.execute(update(self._model), [{key: row[key] for key in ('id', 'schedule_id', 'teacher_id', 'classroom_id')}
+                                                            for row in updates])
+            
+            if created:
+                self._session.execute(insert(self._model), created)
+            
+            if updates or created:
+                self._versions.bump_all(self._session)
+            
+            self._session.commit()
+            
+        except IntegrityError:
+            self._session.rollback()
+            
+            #* the index (possibly the caller's) already holds the repaired timetable; put the old one back
+            solver.restore()
+            
+            raise ObjectAlreadyExistsException('Subject_schedule rows were changed while the timetable was being repaired')
+        
+        return updates + created
+    
+    def _busy_students(self, index: OccupancyIndex, displaced: dict[int, tuple]) -> dict[tuple, list[int]]:
+        #* for every displaced section, the blocks each of its students can't take because of their other sections
+        if not displaced:
+            return {}
+        
+        students = select(StudentSubject.student_id).where(StudentSubject.subject_schedule_id.in_(displaced))
+        
+        enrolled = self._session.execute(
+            select(StudentSubject.student_id, StudentSubject.subject_schedule_id)
+            .where(StudentSubject.subject_schedule_id.in_(displaced))
+        ).all()
+        
+        blocked = {}
+        
+        for row in self._session.execute(
+            select(StudentSubject.student_id, self._model.schedule_id)
+            .join(self._model, self._model.id == StudentSubject.subject_schedule_id)
+            .where(StudentSubject.student_id.in_(students), StudentSubject.subject_schedule_id.not_in(displaced))
+        ):
+            if index.has_schedule(row.schedule_id):
+                blocked[row.student_id] = blocked.get(row.student_id, 0) | index.conflict_mask(row.schedule_id)
+        
+        busy = {}
+        
+        for row in enrolled:
+            busy.setdefault(displaced[row.subject_schedule_id], []).append(blocked.get(row.student_id, 0))
+        
+        return busy
+    
+    def assign_classrooms(self, reassign: bool = False) -> tuple[int, list[int]]:
+        #* gives a classroom to every section without one (to every section if reassign); rooms already
+        #* given to sections that keep theirs stay taken. Returns (sections assigned, ids left without a room)
+        rooms = self._session.execute(select(Classroom.id, Classroom.capacity, Classroom.type)).all()
+        
+        schedules = self._session.execute(select(Schedule.id, Schedule.day, Schedule.start_time, Schedule.end_time)).all()
+        days = list(DayOfWeek)
+        schedules.sort(key=lambda row: (days.index(DayOfWeek(row.day)), row.start_time))
+        
+        blocks = {row.id: row for row in schedules}
+        
+        enrolled = dict(self._session.execute(
+            select(StudentSubject.subject_schedule_id, func.count())
+            .group_by(StudentSubject.subject_schedule_id)
+        ).all())
+        
+        statement = (select(self._model.id, self._model.schedule_id, self._model.classroom_id, Subject.classroom_type)
+                     .join(Subject, Subject.id == self._model.subject_id))
+        
+        from utils.room_assignment import RoomAssigner
+        
+        assigner = RoomAssigner([tuple(row) for row in rooms])
+        sections = {}
+        
+        for row in self._session.execute(statement):
+            if row.classroom_id is not None and not reassign:
+                block = blocks[row.schedule_id]
+                assigner.occupy(block.day, block.start_time, block.end_time, block.id, row.classroom_id)
+                
+            else:
+                sections.setdefault(row.schedule_id, []).append((row.id, enrolled.get(row.id, 0), row.classroom_type))
+        
+        #* largest sections first, so ties in the flow favour them
+        for block_sections in sections.values():
+            block_sections.sort(key=lambda section: -section[1])
+        
+        assignment, unassigned = assigner.assign([tuple(row) for row in schedules], sections)
+        
+        try:
+            #* rooms move between sections when reassigning; clearing them first keeps the
+            #* (classroom_id, schedule_id) key from seeing a swap half done
+            if reassign:
+                self._session.execute(update(self._model).values(classroom_id=None))
+            
+            #* one executemany by primary key
+            if assignment:
+                self._session.execute(update(self._model), [{'id': id, 'classroom_id': classroom_id}
+                                                             for id, classroom_id in assignment.items()])
+            
+            self._session.commit()
+            
+        except IntegrityError:
+            self._session.rollback()
+            
+            raise ObjectAlreadyExistsException('Classrooms were assigned while the assignment was being computed')
+        
+        return len(assignment), unassigned
+    
+    def _quality(self, weights: 'QualityWeights | None') -> 'TimetableQuality':
+        blocks = {row.id: (row.day, row.start_time, row.end_time) for row in self._session.execute(
+            select(Schedule.id, Schedule.day, Schedule.start_time, Schedule.end_time)
+        )}
+        
+        sections = self._session.execute(
+            select(self._model.id, self._model.schedule_id, self._model.teacher_id, self._model.subject_id,
+                   Subject.career_id, Subject.course, self._model.section)
+            .join(Subject, Subject.id == self._model.subject_id)
+        ).all()
+        
+        enrollments = self._session.execute(select(StudentSubject.student_id, StudentSubject.subject_schedule_id)).all()
+        
+        grid = SlotGrid(blocks=((id, *block) for id, block in blocks.items()))
+        
+        unavailable = {teacher_id: [schedule_id for schedule_id in blocks if not grid.fits(schedule_id, slots)]
+                       for teacher_id, (slots, _) in self._teacher_slots().items() if slots}
+        
+        #* a career/course/section group never overlaps itself, the same as for the solver
+        groups = {}
+        
+        for row in sections:
+            groups.setdefault((row.career_id, row.course, row.section), []).append(row.id)
+        
+        from utils.timetable_quality import TimetableQuality
+        
+        return TimetableQuality(blocks, [tuple(row[:4]) for row in sections], enrollments, groups.values(), weights,
+                                unavailable)
+        
+    def score_timetable(self, weights: 'QualityWeights | None' = None) -> dict[str, float]:
+        #* soft-constraint penalties of the current timetable (lower is better), see TimetableQuality
+        return self._quality(weights).breakdown()
+        
+    def improve_timetable(self, weights: 'QualityWeights | None' = None, max_passes: int = 10
+                          ) -> tuple[dict[str, float], list[tuple[int, int, int]]]:
+        #* local search over the blocks of the existing sections, keeping every hard constraint. Moved
+        #* sections lose their classroom (run assign_classrooms afterwards). Returns the new score
+        #* breakdown and the moves made, (subject_schedule_id, from schedule_id, to schedule_id)
+        quality = self._quality(weights)
+        moves = quality.improve(max_passes)
+        
+        if not moves:
+            return quality.breakdown(), moves
+        
+        try:
+            #* in the order they were made, a move only ever takes a block its teacher had free at the time
+            for id, _, schedule_id in moves:
+                self._session.execute(update(self._model), [{'id': id, 'schedule_id': schedule_id, 'classroom_id': None}])
+            
+            self._versions.bump_all(self._session)
+            self._session.commit()
+        
+        except IntegrityError:
+            self._session.rollback()
+            
+            raise ObjectAlreadyExistsException('Subject_schedule rows were changed while the timetable was being improved')
+        
+        if self._occupancy_index is not None:
+            rows = {row.id: row for row in self._session.execute(
+                select(self._model.id, self._model.section, self._model.subject_id, self._model.teacher_id)
+                .where(self._model.id.in_({id for id, _, _ in moves}))
+            )}
+            
+            for id, old_schedule_id, schedule_id in moves:
+                row = dict(rows[id]._mapping)
+                self._occupancy_index.remove(row | {'schedule_id': old_schedule_id})
+                self._occupancy_index.add(row | {'schedule_id': schedule_id})
+        
+        return quality.breakdown(), moves
+        
+    def _subjects_statement(self, career_id: int | None, course: int | None):
+        statement = select(Subject.id, Subject.career_id, Subject.course)
+        
+        if career_id is not None:
+            statement = statement.where(Subject.career_id == career_id)
+            
+        if course is not None:
+            statement = statement.where(Subject.course == course)
+        
+        return statement
+        
     def get_by_id(self, id: int) -> SubjectSchedule:
         statement = select(self._model).where(self._model.id == id)
         
@@ -80,7 +610,8 @@ class SubjectScheduleController:
         except ObjectNotFoundException:
             raise ObjectNotFoundException(f'Subject with id "{subject_id}" not found')
         
-        statement = select(self._model).where(self._model.subject_id == subject.id)
+        statement = (select(self._model).where(self._model.subject_id == subject.id)
+                     .options(joinedload(self._model.schedule), joinedload(self._model.teacher)))
         
         result = self._session.execute(statement).scalars().all()
         
@@ -110,6 +641,28 @@ class SubjectScheduleController:
     
     def get_all(self) -> list[SubjectSchedule]:
         return self._session.execute(select(self._model)).scalars().all()
+    
+    def get_page(self, after_id: int | None = None, page_size: int = DEFAULT_PAGE_SIZE, **filters: any) -> Page:
+        return get_page(self._session, self._model, after_id, page_size, **filters)
+    
+    def iter_all(self, batch_size: int = STREAM_BATCH_SIZE, **filters: any) -> Iterator[SubjectSchedule]:
+        return iter_all(self._session, self._model, batch_size, **filters)
+        
+    def set_capacity(self, id: int, capacity: int | None) -> None:
+        #* never below the seats already taken; checked in the same statement that changes it
+        statement = update(self._model).where(self._model.id == id).values(capacity=capacity)
+        
+        if capacity is not None:
+            statement = statement.where(self._model.enrolled <= capacity)
+        
+        if self._session.execute(statement.execution_options(synchronize_session='fetch')).rowcount == 0:
+            self._session.rollback()
+            
+            self.get_by_id(id)
+            
+            raise ValueError(f'Subject_schedule with id {id} already has more than {capacity} students enrolled')
+        
+        self._session.commit()
         
     def exists(self, data: dict[str, any]) -> bool:
         section_exists =  and_(self._model.section == data['section'],
@@ -122,4 +675,4 @@ class SubjectScheduleController:
                                                      teacher_ocuppied
                                                      )).exists()
         
-        return self._session.scalar(statement)
+        return self._session.scalar(select(statement))
@@ -1,54 +1,102 @@
-from sqlalchemy import select
+from datetime import time
+from typing import Iterable, Iterator
+
+from sqlalchemy import select, or_
 from sqlalchemy.orm import Session
-from sqlalchemy.exc import IntegrityError
 
 from models.teacher import Teacher
 
 from utils.exceptions import ObjectAlreadyExistsException, ObjectNotFoundException
+from utils.day_of_week import DayOfWeek
+from utils.cache import LRUCache, get_cache, cached_lookup
+from utils.bulk import BulkResult, bulk_insert, existing_keys, chunked
+from utils.upsert import insert_ignore
+from utils.normalization import normalize_identification_number
+from utils.search_index import SEARCH_LIMIT, SearchIndex, get_search_index
+from utils.slot_grid import SlotGrid
+from utils.pagination import Page, DEFAULT_PAGE_SIZE, STREAM_BATCH_SIZE, get_page, iter_all
+from utils.versions import VersionCounter, get_version_counter
 
 
 class TeacherController:
-    def __init__(self, session: Session, model: Teacher = Teacher):
+    def __init__(self, session: Session, model: Teacher = Teacher, cache: LRUCache | None = get_cache('teacher'),
+                 search_index: SearchIndex = get_search_index('teacher'),
+                 versions: VersionCounter = get_version_counter('timetable'), slot_grid: SlotGrid | None = None
+                 ):
         self._session = session
         self._model = model
+        self._cache = cache
+        self._search_index = search_index
+        self._versions = versions
+        self._slot_grid = slot_grid or SlotGrid()
         
     def create(self, data: dict[str, str]) -> None:
         sanitize_data = self._sanitize(data)
         
-        #! Modify the DB so that the respective fields are UNIQUE (eliminate this method if necessary)
-        self._validate(sanitize_data)
-        
-        teacher = self._create_teacher_object(sanitize_data)
+        #* the UNIQUE key on identification_number rejects duplicates, so there is no exists() round trip
+        id = insert_ignore(self._session, self._model, sanitize_data)
         
-        try:
-            self._session.add(teacher)
-            self._session.commit()
-            
-        except IntegrityError:
+        if id is None:
             self._session.rollback()
             
-            raise ObjectAlreadyExistsException(f'Teacher with identification number "{data['identification_number']}" already exists')
+            raise ObjectAlreadyExistsException(f'Teacher with identification number "{sanitize_data['identification_number']}" already exists')
+        
+        self._session.commit()
+        
+        self._invalidate(('name', sanitize_data['name']))
+        
+        if self._search_index.loaded:
+            self._search_index.add(id, sanitize_data['name'], sanitize_data['identification_number'])
+
+    def _invalidate(self, *keys: tuple[str, any]) -> None:
+        if self._cache is not None:
+            self._cache.invalidate(*keys)
 
     def _sanitize(self, data: dict[str, str]) -> dict[str, str]:
         name = data['name'].strip()
-        identification_numer = data['identification_number'].strip().upper().replace('-', '')
+        identification_numer = normalize_identification_number(data['identification_number'])
         
         return {'name': name, 'identification_number': identification_numer}
         
-    def _validate(self, data: dict[str, str]) -> None:
-        if self.exists(data['identification_number']):
-            raise ObjectAlreadyExistsException(f'Teacher with identification number "{data['identification_number']}" already exists')
+    def create_many(self, items: Iterable[dict[str, str]]) -> BulkResult:
+        result = BulkResult()
+        rows = {}
+        
+        for position, data in enumerate(items):
+            try:
+                sanitize_data = self._sanitize(data)
+                
+            except (KeyError, AttributeError) as e:
+                result.reject(position, data, f'Invalid input data: {e}')
+                
+                continue
+            
+            identification_number = sanitize_data['identification_number']
+            
+            if identification_number in rows:
+                result.reject(position, data, f'Teacher with identification number "{identification_number}" is repeated in the batch')
+                
+                continue
+            
+            rows[identification_number] = (position, sanitize_data)
         
-    def _create_teacher_object(self, data: dict[str, str]) -> Teacher:
-        return Teacher(
-            name=data['name'],
-            identification_number=data['identification_number']
-        )
+        for identification_number in existing_keys(self._session, [self._model.identification_number], set(rows)):
+            position, data = rows.pop(identification_number)
+            
+            result.reject(position, data, f'Teacher with identification number "{identification_number}" already exists')
+        
+        bulk_insert(self._session, self._model, list(rows.values()), result)
+        
+        self._index_created([data['identification_number'] for _, data in result.created])
+        
+        self._invalidate(*(('name', data['name']) for _, data in result.created))
+        
+        return result
         
     def get_by_id(self, id: int) -> Teacher:
         statement = select(self._model).where(self._model.id == id)
         
-        result = self._session.scalar(statement)
+        result = cached_lookup(self._session, self._cache, ('id', id), lambda: self._session.scalar(statement))
         
         if result is None:
             raise ObjectNotFoundException(f'Teacher with "{id}" not found')
@@ -58,7 +106,7 @@ class TeacherController:
     def get_by_name(self, name: str) -> Teacher:
         statement = select(self._model).where(self._model.name == name)
         
-        result = self._session.scalar(statement)
+        result = cached_lookup(self._session, self._cache, ('name', name), lambda: self._session.scalar(statement))
         
         if result is None:
             raise ObjectNotFoundException(f'Teacher "{name}" not found')
@@ -66,6 +114,8 @@ class TeacherController:
         return result
         
     def get_by_identification_number(self, identification_number: str) -> Teacher:
+        identification_number = normalize_identification_number(identification_number)
+        
         statement = select(self._model).where(self._model.identification_number == identification_number)
         
         result = self._session.scalar(statement)
@@ -75,8 +125,42 @@ class TeacherController:
         
         return result
     
+    def search(self, query: str, limit: int = SEARCH_LIMIT) -> list[Teacher]:
+        #* accent and case insensitive, prefixes and small typos included; best match first
+        if not self._search_index.loaded:
+            self._search_index.load(self._session.execute(self._search_statement()))
+        
+        ids = [id for id, _ in self._search_index.search(query, limit)]
+        
+        if not ids:
+            return []
+        
+        found = {row.id: row for row in self._session.execute(select(self._model).where(self._model.id.in_(ids))).scalars()}
+        
+        return [found[id] for id in ids if id in found]
+    
+    def _search_statement(self):
+        return select(self._model.id, self._model.name, self._model.identification_number)
+    
+    #* new rows reach a loaded index right away; an index not loaded yet reads them when it loads
+    def _index_created(self, identification_numbers: list[str]) -> None:
+        if not self._search_index.loaded:
+            return
+        
+        for chunk in chunked(identification_numbers):
+            statement = self._search_statement().where(self._model.identification_number.in_(chunk))
+            
+            for row in self._session.execute(statement):
+                self._search_index.add(*row)
+    
     def get_all(self) -> list[Teacher]:
         return self._session.execute(select(self._model)).scalars().all()
+    
+    def get_page(self, after_id: int | None = None, page_size: int = DEFAULT_PAGE_SIZE, **filters: any) -> Page:
+        return get_page(self._session, self._model, after_id, page_size, **filters)
+    
+    def iter_all(self, batch_size: int = STREAM_BATCH_SIZE, **filters: any) -> Iterator[Teacher]:
+        return iter_all(self._session, self._model, batch_size, **filters)
         
     def update(self, old_name: str, new_name: str) -> None:
         sanitize_new_name = new_name.strip()
@@ -85,9 +169,62 @@ class TeacherController:
         
         teacher.name = sanitize_new_name
         
+        keys = (('id', teacher.id), ('name', old_name), ('name', sanitize_new_name))
+        
+        #* the teacher's name is in the timetable of every student they teach
+        self._versions.bump_all(self._session)
         self._session.commit()
         
+        self._invalidate(*keys)
+        
+        if self._search_index.loaded:
+            self._search_index.add(teacher.id, teacher.name, teacher.identification_number)
+        
+    def set_availability(self, id: int, available: Iterable[tuple[str, str, str]] | None,
+                         preferred: Iterable[tuple[str, str, str]] | None = None
+                         ) -> None:
+        #* windows are (day, start, end) like ('Lunes', '08:00', '12:00'); available None: any time,
+        #* preferred is kept inside available. Sections already placed are not moved (see repair)
+        teacher = self.get_by_id(id)
+        
+        try:
+            available_mask = None if available is None else self._slot_grid.mask(available)
+            preferred_mask = None if preferred is None else self._slot_grid.mask(preferred)
+            
+        except (TypeError, ValueError) as e:
+            raise ValueError(f'Invalid availability for teacher with id {id}: {e}')
+        
+        if preferred_mask is not None and available_mask is not None:
+            preferred_mask &= available_mask
+        
+        teacher.availability = self._slot_grid.to_bytes(available_mask)
+        teacher.preference = self._slot_grid.to_bytes(preferred_mask)
+        
+        self._session.commit()
+        
+        self._invalidate(('id', teacher.id), ('name', teacher.name))
+        
+    def get_availability(self, id: int) -> dict[str, list[tuple[DayOfWeek, time, time]] | None]:
+        teacher = self.get_by_id(id)
+        
+        available = self._slot_grid.from_bytes(teacher.availability)
+        preferred = self._slot_grid.from_bytes(teacher.preference)
+        
+        return {
+            'available': None if available is None else self._slot_grid.windows(available),
+            'preferred': None if preferred is None else self._slot_grid.windows(preferred)
+        }
+        
+    def slot_masks(self) -> dict[int, tuple[int, int]]:
+        #* teacher_id -> (unavailable slots, preferred slots) of every teacher with either one set
+        statement = (select(self._model.id, self._model.availability, self._model.preference)
+                     .where(or_(self._model.availability.is_not(None), self._model.preference.is_not(None))))
+        
+        return {row.id: self._slot_grid.slot_masks(row.availability, row.preference) for row in self._session.execute(statement)}
+        
     def exists(self, identification_number: str) -> bool:
+        identification_number = normalize_identification_number(identification_number)
+        
         statement = select(self._model.id).where(self._model.identification_number == identification_number).exists()
         
-        return self._session.scalar(statement)
+        return self._session.scalar(select(statement))
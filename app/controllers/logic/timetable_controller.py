@@ -0,0 +1,79 @@
+from sqlalchemy import select, case, Row
+from sqlalchemy.orm import Session
+
+from models.career import Career
+from models.student import Student
+from models.teacher import Teacher
+from models.subject import Subject
+from models.schedule import Schedule
+from models.subject_schedule import SubjectSchedule
+from models.student_subject import StudentSubject
+
+from utils.exceptions import ObjectNotFoundException
+from utils.day_of_week import DayOfWeek
+
+
+#* Read model for rendering timetables: every method returns fully joined rows
+#* (subject, section, day, start/end, teacher) in a single statement ordered by day and time
+class TimetableController:
+    DAY_ORDER = case({day.value: position for position, day in enumerate(DayOfWeek)}, value=Schedule.day)
+
+    def __init__(self, session: Session):
+        self._session = session
+
+    def _statement(self):
+        return (
+            select(
+                SubjectSchedule.id.label('subject_schedule_id'),
+                Subject.id.label('subject_id'),
+                Subject.name.label('subject'),
+                Subject.course,
+                Subject.career_id,
+                SubjectSchedule.section,
+                Schedule.id.label('schedule_id'),
+                Schedule.day,
+                Schedule.start_time,
+                Schedule.end_time,
+                Teacher.id.label('teacher_id'),
+                Teacher.name.label('teacher')
+            )
+            .join(Subject, Subject.id == SubjectSchedule.subject_id)
+            .join(Schedule, Schedule.id == SubjectSchedule.schedule_id)
+            .join(Teacher, Teacher.id == SubjectSchedule.teacher_id)
+            .order_by(self.DAY_ORDER, Schedule.start_time, Subject.name)
+        )
+
+    def _execute(self, statement, model: any, id: int, message: str) -> list[Row]:
+        result = self._session.execute(statement).all()
+
+        #* an empty timetable is valid, only a missing owner is an error
+        if not result and self._session.get(model, id) is None:
+            raise ObjectNotFoundException(message)
+
+        return result
+
+    def get_all(self) -> list[Row]:
+        return self._session.execute(self._statement()).all()
+
+    def get_by_student(self, student_id: int) -> list[Row]:
+        statement = (self._statement()
+                     .join(StudentSubject, StudentSubject.subject_schedule_id == SubjectSchedule.id)
+                     .where(StudentSubject.student_id == student_id))
+
+        return self._execute(statement, Student, student_id, f'Student with id "{student_id}" not found')
+
+    def get_by_teacher(self, teacher_id: int) -> list[Row]:
+        statement = self._statement().where(SubjectSchedule.teacher_id == teacher_id)
+
+        return self._execute(statement, Teacher, teacher_id, f'Teacher with id "{teacher_id}" not found')
+
+    def get_by_career_course(self, career_id: int, course: int) -> list[Row]:
+        statement = self._statement().where(Subject.career_id == career_id, Subject.course == course)
+
+        return self._execute(statement, Career, career_id, f'Career with id "{career_id}" not found')
+
+    def get_by_section(self, career_id: int, course: int, section: str) -> list[Row]:
+        statement = self._statement().where(Subject.career_id == career_id, Subject.course == course,
+                                            SubjectSchedule.section == section)
+
+        return self._execute(statement, Career, career_id, f'Career with id "{career_id}" not found')
@@ -0,0 +1,220 @@
+import re
+from contextlib import contextmanager
+from urllib.parse import parse_qs, urlsplit
+
+from sqlalchemy.orm import Session
+
+from app.models.database import Session as DefaultSession
+
+from controllers.logic.career_controller import CareerController
+from controllers.logic.classroom_controller import ClassroomController
+from controllers.logic.student_controller import StudentController
+from controllers.logic.subject_controller import SubjectController
+from controllers.logic.subject_schedule_controller import SubjectScheduleController
+from controllers.logic.teacher_controller import TeacherController
+from controllers.logic.timetable_controller import TimetableController
+
+from views import json_view
+
+from utils.cache import MISSING, LRUCache, get_cache
+from utils.exceptions import ObjectNotFoundException
+from utils.pagination import DEFAULT_PAGE_SIZE
+from utils.search_index import SEARCH_LIMIT
+from utils.versions import VersionCounter, get_version_counter
+
+
+RESPONSE_CACHE_SIZE = 2048 #* rendered timetables kept in memory
+
+JSON = 'application/json; charset=utf-8'
+
+
+class Response:
+    def __init__(self, status: int, body: bytes = b'', headers: dict[str, str] | None = None):
+        self.status = status
+        self.body = body
+        self.headers = headers or {}
+        
+    def __repr__(self) -> str:
+        return f'Response (status={self.status!r}, bytes={len(self.body)!r})'
+
+
+class Request:
+    def __init__(self, method: str, target: str, headers: dict[str, str] | None = None):
+        url = urlsplit(target)
+        
+        self.method = method
+        self.path = url.path.rstrip('/') or '/'
+        self.query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        self.headers = headers or {}
+        
+    def integer(self, name: str, default: int | None = None) -> int | None:
+        value = self.query.pop(name, None)
+        
+        if value is None:
+            return default
+        
+        try:
+            return int(value)
+        
+        except ValueError:
+            raise ValueError(f'"{name}" must be an integer, not "{value}"')
+        
+    def etags(self) -> set[str]:
+        #* If-None-Match: "a", W/"b" (weak tags compare like strong ones for a GET)
+        value = self.headers.get('If-None-Match') or ''
+        
+        return {tag.strip().removeprefix('W/') for tag in value.split(',') if tag.strip()}
+
+
+#* HTTP front of the logic controllers, read only. Lists are keyset pages (?after_id=&page_size=, any other
+#* parameter filters a column), searches take ?q=&limit=. Timetables carry an ETag made from the
+#* stored versions (VersionCounter) the logic controllers bump in the transaction of every write that
+#* changes them: a request whose If-None-Match still matches gets a 304 after one primary key read, and
+#* the rendered body of an unchanged timetable is served from an in-process LRU cache keyed by that same tag.
+class ApiController:
+    COLLECTIONS = {
+        'careers': CareerController,
+        'classrooms': ClassroomController,
+        'students': StudentController,
+        'subjects': SubjectController,
+        'teachers': TeacherController,
+        'sections': SubjectScheduleController
+    }
+    
+    SEARCHABLE = ('students', 'subjects', 'teachers')
+    
+    def __init__(self, session_factory: callable = DefaultSession,
+                 responses: LRUCache | None = get_cache('timetable_response', RESPONSE_CACHE_SIZE),
+                 versions: VersionCounter = get_version_counter('timetable')
+                 ):
+        self._session_factory = session_factory
+        self._responses = responses
+        self._versions = versions
+        
+        collections = '|'.join(self.COLLECTIONS)
+        searchable = '|'.join(self.SEARCHABLE)
+        
+        self._routes = [
+            (re.compile(rf'^/(?P<collection>{searchable})/search$'), self._search),
+            (re.compile(rf'^/(?P<collection>{collections})$'), self._page),
+            (re.compile(rf'^/(?P<collection>{collections})/(?P<id>\d+)$'), self._get),
+            (re.compile(r'^/teachers/(?P<id>\d+)/availability$'), self._teacher_availability),
+            (re.compile(r'^/timetables/students/(?P<id>\d+)$'), self._student_timetable),
+            (re.compile(r'^/timetables/teachers/(?P<id>\d+)$'), self._teacher_timetable),
+            (re.compile(r'^/timetables/sections/(?P<career_id>\d+)/(?P<course>\d+)/(?P<section>\w+)$'),
+             self._section_timetable)
+        ]
+        
+    def handle(self, method: str, target: str, headers: dict[str, str] | None = None) -> Response:
+        request = Request(method, target, headers)
+        
+        if method not in ('GET', 'HEAD'):
+            return self._json(405, json_view.error(f'Method {method} not allowed'), {'Allow': 'GET, HEAD'})
+        
+        for pattern, handler in self._routes:
+            match = pattern.match(request.path)
+            
+            if match is None:
+                continue
+            
+            try:
+                return handler(request, **match.groupdict())
+            
+            except ObjectNotFoundException as e:
+                return self._json(404, json_view.error(str(e)))
+            
+            except ValueError as e:
+                return self._json(400, json_view.error(str(e)))
+        
+        return self._json(404, json_view.error(f'No resource at {request.path}'))
+        
+    @contextmanager
+    def _session(self):
+        session = self._session_factory()
+        
+        try:
+            yield session
+        
+        finally:
+            session.close()
+        
+    def _json(self, status: int, payload: dict[str, any], headers: dict[str, str] | None = None) -> Response:
+        return Response(status, json_view.render(payload), {'Content-Type': JSON, **(headers or {})})
+        
+    def _controller(self, session: Session, collection: str) -> any:
+        if collection == 'sections':
+            return SubjectScheduleController(session, subject_controller=SubjectController(session),
+                                             teacher_controller=TeacherController(session))
+        
+        return self.COLLECTIONS[collection](session)
+        
+    def _page(self, request: Request, collection: str) -> Response:
+        after_id = request.integer('after_id')
+        page_size = request.integer('page_size', DEFAULT_PAGE_SIZE)
+        
+        filters = {name: int(value) if value.isdigit() else value for name, value in request.query.items()}
+        
+        with self._session() as session:
+            page = self._controller(session, collection).get_page(after_id, page_size, **filters)
+            
+            return self._json(200, json_view.page(page))
+        
+    def _get(self, request: Request, collection: str, id: str) -> Response:
+        with self._session() as session:
+            item = self._controller(session, collection).get_by_id(int(id))
+            
+            #* some get_by_id return None instead of raising
+            if item is None:
+                raise ObjectNotFoundException(f'{collection.capitalize()[:-1]} with id "{id}" not found')
+            
+            return self._json(200, json_view.instance(item))
+        
+    def _search(self, request: Request, collection: str) -> Response:
+        query = request.query.get('q', '').strip()
+        
+        if not query:
+            raise ValueError('Missing search text "q"')
+        
+        limit = request.integer('limit', SEARCH_LIMIT)
+        
+        with self._session() as session:
+            return self._json(200, json_view.items(self._controller(session, collection).search(query, limit)))
+        
+    def _teacher_availability(self, request: Request, id: str) -> Response:
+        with self._session() as session:
+            return self._json(200, json_view.availability(int(id), TeacherController(session).get_availability(int(id))))
+        
+    def _student_timetable(self, request: Request, id: str) -> Response:
+        return self._timetable(request, ('student', int(id)), 'student_id', int(id),
+                               lambda timetables: timetables.get_by_student(int(id)))
+        
+    def _teacher_timetable(self, request: Request, id: str) -> Response:
+        return self._timetable(request, ('teacher', int(id)), 'teacher_id', int(id),
+                               lambda timetables: timetables.get_by_teacher(int(id)))
+        
+    def _section_timetable(self, request: Request, career_id: str, course: str, section: str) -> Response:
+        key = ('section', int(career_id), int(course), section)
+        
+        return self._timetable(request, key, 'section', {'career_id': int(career_id), 'course': int(course), 'section': section},
+                               lambda timetables: timetables.get_by_section(int(career_id), int(course), section))
+        
+    def _timetable(self, request: Request, key: tuple, kind: str, owner: any, load: callable) -> Response:
+        with self._session() as session:
+            #* the tag is read before the rows (from the same database): a write racing with the read can only
+            #* leave a body newer than its tag
+            etag = self._versions.etag(session, key)
+            headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+            
+            if etag in request.etags():
+                return Response(304, headers=headers)
+            
+            body = self._responses.get((key, etag)) if self._responses is not None else MISSING
+            
+            if body is MISSING:
+                rows = load(TimetableController(session))
+                body = json_view.render(json_view.timetable(kind, owner, rows))
+                
+                if self._responses is not None:
+                    self._responses.set((key, etag), body)
+        
+        return Response(200, body, {'Content-Type': JSON, **headers})
@@ -0,0 +1,59 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from controllers.ui.api_controller import ApiController, Response
+
+
+HOST = '127.0.0.1'
+PORT = 8000
+
+
+#* stdlib HTTP/1.1 server (keep-alive, one thread per connection) in front of an ApiController
+class RequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True #* headers and body go out in two writes; don't hold the second one back
+    
+    def do_GET(self) -> None:
+        self._respond(self.server.api.handle('GET', self.path, self.headers))
+        
+    def do_HEAD(self) -> None:
+        self._respond(self.server.api.handle('HEAD', self.path, self.headers), body=False)
+        
+    def _respond(self, response: Response, body: bool = True) -> None:
+        self.send_response(response.status)
+        
+        for name, value in response.headers.items():
+            self.send_header(name, value)
+        
+        #* a 304 never has a body; everything else needs its length for keep-alive
+        if response.status != 304:
+            self.send_header('Content-Length', str(len(response.body)))
+        
+        self.end_headers()
+        
+        if body and response.body:
+            self.wfile.write(response.body)
+        
+    def log_message(self, format: str, *args: any) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class ApiServer(ThreadingHTTPServer):
+    daemon_threads = True
+    
+    def __init__(self, address: tuple[str, int], api: ApiController | None = None, verbose: bool = False):
+        super().__init__(address, RequestHandler)
+        
+        self.api = api if api is not None else ApiController()
+        self.verbose = verbose
+
+
+def serve(host: str = HOST, port: int = PORT, verbose: bool = True) -> None:
+    with ApiServer((host, port), verbose=verbose) as server:
+        print(f'Serving the API on http://{host}:{server.server_address[1]}')
+        
+        try:
+            server.serve_forever()
+        
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,22 @@
+from sqlalchemy import String, Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.database import Base
+
+from app.utils.classroom_type import ClassroomType
+
+
+class Classroom(Base):
+    __tablename__ = 'classroom'
+    __table_args__ = (
+        Index('classroom_name_uq', 'name', unique=True),
+    )
+    
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(String(75), nullable=False)
+    capacity: Mapped[int] = mapped_column(nullable=False)
+    type: Mapped[ClassroomType] = mapped_column(String(30), nullable=False)
+    
+    def __repr__(self) -> str:
+        return f'''Classroom (id={self.id!r}, name={self.name!r},
+                    capacity={self.capacity!r}, type={self.type!r})'''
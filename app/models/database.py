@@ -1,14 +1,219 @@
-from sqlalchemy import create_engine
+import os
+from contextlib import contextmanager
+from importlib import import_module
+
+from sqlalchemy import create_engine, event, Engine
 from sqlalchemy.orm import DeclarativeBase, sessionmaker
 
-from config import DATABASE_URL
+from app.models.replicas import ReplicaSet, RoutingSession, HEALTH_CHECK_INTERVAL, RETRY_INTERVAL
+
+
+#* The engine is created on first use, not at import: importing models or controllers
+#* doesn't read config nor touch the DB. configure() (or the DATABASE_URL environment
+#* variable) overrides config.py, e.g. to point tests at a local SQLite file.
+_engine: Engine | None = None
+_replicas: ReplicaSet | None = None
+_async_engine = None
+_query_dump = None
+_settings: dict[str, any] = {}
 
 
-engine = create_engine(DATABASE_URL)
-Session = sessionmaker(bind=engine)
+def configure(url: str | None = None, **options: any) -> None:
+    global _engine, _replicas, _async_engine, _query_dump, _settings
+    
+    if _query_dump is not None:
+        _query_dump.stop()
+    
+    if _engine is not None:
+        _engine.dispose()
+    
+    if _replicas is not None:
+        _replicas.dispose()
+    
+    if _async_engine is not None:
+        _async_engine.sync_engine.dispose()
+    
+    _engine = None
+    _replicas = None
+    _async_engine = None
+    _query_dump = None
+    _settings = {name.upper(): value for name, value in options.items()}
+    _settings['DATABASE_URL'] = url
+    
+    Session.kw.pop('bind', None)
+    Session.kw.pop('replicas', None)
+    AsyncSession.configure(bind=None)
 
-def get_db():
-    db = Session()
+def _setting(name: str, default: any = None) -> any:
+    if _settings.get(name) is not None:
+        return _settings[name]
+    
+    if name == 'DATABASE_URL' and os.environ.get('DATABASE_URL'):
+        return os.environ['DATABASE_URL']
+    
+    try:
+        config = import_module('config')
+        
+    except ImportError:
+        return default
+    
+    return getattr(config, name, default)
+
+def _engine_options(url: str) -> dict[str, any]:
+    options = {
+        'pool_pre_ping': _setting('DATABASE_POOL_PRE_PING', True),
+        'pool_recycle': _setting('DATABASE_POOL_RECYCLE', 3600)
+    }
+    
+    #* SQLite uses a single-connection / per-thread pool that takes no size settings
+    if not url.startswith('sqlite'):
+        options['pool_size'] = _setting('DATABASE_POOL_SIZE', 5)
+        options['max_overflow'] = _setting('DATABASE_MAX_OVERFLOW', 10)
+        options['pool_timeout'] = _setting('DATABASE_POOL_TIMEOUT', 30)
+    
+    return options
+
+
+#* pysqlite defers BEGIN on its own, which breaks SAVEPOINTs; let SQLAlchemy emit it instead.
+#* SQLite also ignores foreign keys unless asked, unlike the production database
+def _enable_sqlite_savepoints(engine: Engine) -> None:
+    @event.listens_for(engine, 'connect')
+    def _disable_driver_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+        
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA foreign_keys = ON')
+        cursor.close()
+    
+    @event.listens_for(engine, 'begin')
+    def _begin(connection):
+        connection.exec_driver_sql('BEGIN')
+
+
+def get_engine() -> Engine:
+    global _engine, _replicas, _query_dump
+    
+    if _engine is None:
+        url = _setting('DATABASE_URL')
+        
+        if url is None:
+            raise RuntimeError('DATABASE_URL is not configured (config.py, environment or database.configure())')
+        
+        _engine = create_engine(url, **_engine_options(url))
+        
+        if _engine.dialect.name == 'sqlite':
+            _enable_sqlite_savepoints(_engine)
+        
+        _replicas = _create_replicas()
+        
+        Session.configure(bind=_engine, replicas=_replicas)
+        
+        #* opt-in SQL statistics per controller method, logged every QUERY_INSTRUMENTATION_INTERVAL seconds
+        if _setting('QUERY_INSTRUMENTATION_INTERVAL'):
+            from app.utils.query_instrumentation import start_periodic_dump
+            
+            _query_dump = start_periodic_dump(_engine, _setting('QUERY_INSTRUMENTATION_INTERVAL'))
+    
+    return _engine
+
+
+#* REPLICA_DATABASE_URLS: read replicas of DATABASE_URL; sessions send their reads there (see RoutingSession).
+#* Separate SQLite files work as stand-ins locally: replication is the database's job, not the app's.
+def _create_replicas() -> ReplicaSet | None:
+    urls = _setting('REPLICA_DATABASE_URLS') or []
+    
+    if not urls:
+        return None
+    
+    engines = []
+    
+    for url in urls:
+        engine = create_engine(url, **_engine_options(url))
+        
+        if engine.dialect.name == 'sqlite':
+            _enable_sqlite_savepoints(engine)
+        
+        engines.append(engine)
+    
+    return ReplicaSet(engines, _setting('REPLICA_HEALTH_CHECK_INTERVAL', HEALTH_CHECK_INTERVAL),
+                      _setting('REPLICA_RETRY_INTERVAL', RETRY_INTERVAL))
+
+def get_replicas() -> ReplicaSet | None:
+    get_engine()
+    
+    return _replicas
+
+
+#* sessionmaker that binds itself to the lazily created engine on the first Session()
+class _LazySessionmaker(sessionmaker):
+    def __call__(self, **local_kw: any):
+        if local_kw.get('bind') is None and self.kw.get('bind') is None:
+            get_engine()
+        
+        return super().__call__(**local_kw)
+
+
+Session = _LazySessionmaker(class_=RoutingSession)
+
+#* asyncio counterpart, e.g. ASYNC_DATABASE_URL = 'sqlite+aiosqlite:///local.db' or 'mysql+asyncmy://...'.
+#* sqlalchemy.ext.asyncio is only imported when an async engine is actually requested.
+def get_async_engine():
+    global _async_engine
+    
+    if _async_engine is None:
+        from sqlalchemy.ext.asyncio import create_async_engine
+        
+        url = _setting('ASYNC_DATABASE_URL')
+        
+        if url is None:
+            raise RuntimeError('ASYNC_DATABASE_URL is not configured (config.py or database.configure())')
+        
+        _async_engine = create_async_engine(url, **_engine_options(url))
+        
+        if _async_engine.dialect.name == 'sqlite':
+            _enable_sqlite_savepoints(_async_engine.sync_engine)
+        
+        AsyncSession.configure(bind=_async_engine)
+    
+    return _async_engine
+
+
+class _LazyAsyncSessionmaker:
+    def __init__(self):
+        self.kw = {}
+        self._factory = None
+    
+    def configure(self, **kw: any) -> None:
+        self.kw.update(kw)
+        self._factory = None
+    
+    def __call__(self, **local_kw: any):
+        if self._factory is None:
+            from sqlalchemy.ext.asyncio import async_sessionmaker
+            
+            if self.kw.get('bind') is None:
+                get_async_engine()
+            
+            self._factory = async_sessionmaker(expire_on_commit=False, **self.kw)
+        
+        return self._factory(**local_kw)
+
+
+AsyncSession = _LazyAsyncSessionmaker()
+
+async def get_async_db(**options):
+    async with AsyncSession(**options) as db:
+        yield db
+
+def __getattr__(name: str) -> any:
+    #* keeps `from app.models.database import engine` working
+    if name == 'engine':
+        return get_engine()
+    
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+def get_db(**options):
+    db = Session(**options)
     
     try:
         yield db
@@ -16,5 +221,32 @@ def get_db():
     finally:
         db.close()
 
+#* Shares one DB transaction between every controller call made with the yielded session.
+#* Controllers keep calling commit()/rollback(), but inside the unit of work those only release
+#* or roll back a SAVEPOINT, so a failed row is undone on its own and the whole batch is
+#* committed once when the block exits (or rolled back entirely if it raises).
+@contextmanager
+def unit_of_work():
+    with get_engine().connect() as connection:
+        transaction = connection.begin()
+        #* one connection, one transaction: nothing of the unit of work goes to a replica
+        db = get_db(bind=connection, replicas=None, join_transaction_mode='create_savepoint')
+        
+        try:
+            session = next(db)
+            
+            yield session
+            
+            session.flush()
+            transaction.commit()
+            
+        except BaseException:
+            transaction.rollback()
+            
+            raise
+        
+        finally:
+            db.close()
+
 class Base(DeclarativeBase):
     pass
@@ -0,0 +1,94 @@
+import re
+import sys
+from pathlib import Path
+
+from sqlalchemy import Connection, Engine, text
+
+from app.models.database import get_engine
+
+
+#* Versioned SQL migrations applied on top of schema.sql. Files are named <version>_<name>.sql
+#* and applied in version order; schema_version records which ones already ran.
+MIGRATIONS_DIR = Path(__file__).resolve().parents[2] / 'migrations'
+
+_FILE_PATTERN = re.compile(r'^(\d+)_(\w+)\.sql$')
+
+_VERSION_TABLE = '''CREATE TABLE IF NOT EXISTS schema_version (
+  version INT NOT NULL,
+  name VARCHAR(150) NOT NULL,
+  applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+  CONSTRAINT schema_version_pk PRIMARY KEY (version)
+)'''
+
+
+def available(directory: Path = MIGRATIONS_DIR) -> list[tuple[int, str, Path]]:
+    migrations = []
+
+    for path in directory.glob('*.sql'):
+        match = _FILE_PATTERN.match(path.name)
+
+        if match is not None:
+            migrations.append((int(match.group(1)), match.group(2), path))
+
+    return sorted(migrations)
+
+
+def _statements(sql: str) -> list[str]:
+    lines = [line for line in sql.splitlines() if not line.lstrip().startswith('--')]
+
+    return [statement.strip() for statement in '\n'.join(lines).split(';') if statement.strip()]
+
+
+def applied(connection: Connection) -> set[int]:
+    connection.execute(text(_VERSION_TABLE))
+
+    return set(connection.execute(text('SELECT version FROM schema_version')).scalars())
+
+
+def pending(engine: Engine | None = None, directory: Path = MIGRATIONS_DIR) -> list[tuple[int, str, Path]]:
+    with (engine or get_engine()).begin() as connection:
+        done = applied(connection)
+
+    return [migration for migration in available(directory) if migration[0] not in done]
+
+
+#* applies every pending migration, each one in its own transaction (MySQL commits DDL implicitly,
+#* so a failed file may be left half applied there; it is not recorded and can be fixed and rerun)
+def migrate(engine: Engine | None = None, directory: Path = MIGRATIONS_DIR) -> list[int]:
+    engine = engine or get_engine()
+
+    versions = []
+
+    for version, name, path in pending(engine, directory):
+        with engine.begin() as connection:
+            for statement in _statements(path.read_text()):
+                connection.execute(text(statement))
+
+            connection.execute(text('INSERT INTO schema_version (version, name) VALUES (:version, :name)'),
+                               {'version': version, 'name': name})
+
+        versions.append(version)
+
+    return versions
+
+
+#* records migrations as applied without running them, for databases created with Base.metadata.create_all()
+def stamp(engine: Engine | None = None, directory: Path = MIGRATIONS_DIR) -> list[int]:
+    engine = engine or get_engine()
+
+    migrations = pending(engine, directory)
+
+    with engine.begin() as connection:
+        for version, name, _ in migrations:
+            connection.execute(text('INSERT INTO schema_version (version, name) VALUES (:version, :name)'),
+                               {'version': version, 'name': name})
+
+    return [version for version, _, _ in migrations]
+
+
+if __name__ == '__main__':
+    #* python -m app.models.migrations [--stamp]
+    versions = stamp() if '--stamp' in sys.argv[1:] else migrate()
+
+    print(f'Applied migrations: {', '.join(map(str, versions)) or 'none'}')
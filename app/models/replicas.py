@@ -0,0 +1,112 @@
+from itertools import count
+from threading import Lock
+from time import monotonic
+
+from sqlalchemy import Engine, Select, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+
+HEALTH_CHECK_INTERVAL = 5.0 #* seconds a replica is trusted between two SELECT 1
+RETRY_INTERVAL = 30.0 #* seconds a replica that failed its check is left out
+
+
+#* Read replicas taken in turn. A replica is pinged at most every health_check_interval seconds, when
+#* it is about to be used; one that fails is skipped for retry_interval seconds. choose() returns None
+#* when every replica is down, and the caller falls back to the primary.
+class ReplicaSet:
+    def __init__(self, engines: list[Engine], health_check_interval: float = HEALTH_CHECK_INTERVAL,
+                 retry_interval: float = RETRY_INTERVAL
+                 ):
+        self.engines = engines
+        self._health_check_interval = health_check_interval
+        self._retry_interval = retry_interval
+
+        self._turn = count()
+        self._lock = Lock()
+        self._checked_at = [float('-inf')] * len(engines)
+        self._down_until = [float('-inf')] * len(engines)
+
+    def __len__(self) -> int:
+        return len(self.engines)
+
+    def choose(self) -> Engine | None:
+        for _ in range(len(self.engines)):
+            position = next(self._turn) % len(self.engines)
+
+            if self._healthy(position):
+                return self.engines[position]
+
+        return None
+
+    def _healthy(self, position: int) -> bool:
+        now = monotonic()
+
+        if now < self._down_until[position]:
+            return False
+
+        if now - self._checked_at[position] < self._health_check_interval:
+            return True
+
+        with self._lock:
+            #* another thread may have checked it while this one waited
+            if monotonic() - self._checked_at[position] < self._health_check_interval:
+                return monotonic() >= self._down_until[position]
+
+            try:
+                with self.engines[position].connect() as connection:
+                    connection.execute(text('SELECT 1'))
+
+            except DBAPIError:
+                self.mark_down(position)
+
+                return False
+
+            self._checked_at[position] = monotonic()
+
+            return True
+
+    def mark_down(self, position: int) -> None:
+        self._checked_at[position] = monotonic()
+        self._down_until[position] = monotonic() + self._retry_interval
+
+    def dispose(self) -> None:
+        for engine in self.engines:
+            engine.dispose()
+
+
+#* Session that sends plain SELECTs to a replica and everything else (flushes, INSERT / UPDATE / DELETE,
+#* SELECT ... FOR UPDATE, raw SQL) to the primary it is bound to. The replica is picked once per session,
+#* so a request reads one consistent copy. Once the session has written, every later statement goes to the
+#* primary too until it is closed (one session per request, see get_db), so a request always reads its own
+#* writes whatever the replication lag. Without replicas it is a plain Session.
+class RoutingSession(Session):
+    def __init__(self, *args: any, replicas: ReplicaSet | None = None, **kw: any):
+        super().__init__(*args, **kw)
+
+        self.replicas = replicas
+        self.sticky = False
+        self._replica: Engine | None = None
+
+    def get_bind(self, mapper: any = None, *, clause: any = None, **kw: any) -> any:
+        if self.replicas and not self.sticky:
+            if self._is_read(clause):
+                if self._replica is None:
+                    self._replica = self.replicas.choose()
+
+                if self._replica is not None:
+                    return self._replica
+
+            else:
+                self.sticky = True
+
+        return super().get_bind(mapper, clause=clause, **kw)
+
+    def _is_read(self, clause: any) -> bool:
+        return not self._flushing and isinstance(clause, Select) and clause._for_update_arg is None
+
+    def close(self) -> None:
+        super().close()
+
+        self.sticky = False
+        self._replica = None
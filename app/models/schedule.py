@@ -1,4 +1,6 @@
-from sqlalchemy import String, Time
+from datetime import time
+
+from sqlalchemy import String, Index
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.models.database import Base
@@ -8,10 +10,13 @@ from app.utils.day_of_week import DayOfWeek
 
 class Schedule(Base):
     __tablename__ = 'schedule'
+    __table_args__ = (
+        Index('schedule_block_uq', 'day', 'start_time', 'end_time', unique=True),
+    )
     
     id: Mapped[int] = mapped_column(primary_key=True)
-    start_time: Mapped[Time] = mapped_column(nullable=False)
-    end_time: Mapped[Time] = mapped_column(nullable=False)
+    start_time: Mapped[time] = mapped_column(nullable=False)
+    end_time: Mapped[time] = mapped_column(nullable=False)
     day: Mapped[DayOfWeek] = mapped_column(String(10), nullable=False)
     
     def __repr__(self) -> str:
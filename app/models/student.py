@@ -1,3 +1,4 @@
+from sqlalchemy import Index
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.models.database import Base
@@ -5,6 +6,9 @@ from app.models.database import Base
 
 class Student(Base):
     __tablename__ = 'student'
+    __table_args__ = (
+        Index('student_identification_number_uq', 'identification_number', unique=True),
+    )
     
     id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str] = mapped_column(nullable=False)
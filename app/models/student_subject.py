@@ -1,16 +1,23 @@
-from sqlalchemy import ForeignKey
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import ForeignKey, Index
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.database import Base
 
 
 class StudentSubject(Base):
-    __tablename__ = 'student_schedule'
+    __tablename__ = 'student_subject'
+    __table_args__ = (
+        Index('student_subject_enrollment_uq', 'student_id', 'subject_schedule_id', unique=True),
+        Index('student_subject_subject_schedule_idx', 'subject_schedule_id'),
+    )
     
     id: Mapped[int] = mapped_column(primary_key=True)
     student_id: Mapped[int] = mapped_column(ForeignKey('student.id'), nullable=False)
     subject_schedule_id: Mapped[int] = mapped_column(ForeignKey('subject_schedule.id'), nullable=False)
     
+    student: Mapped['Student'] = relationship()
+    subject_schedule: Mapped['SubjectSchedule'] = relationship()
+    
     def __repr__(self) -> str:
         return f'''StudentSubject (id={self.id!r}, student_id={self.student_id!r},
                     subject_schedule_id={self.subject_schedule_id!r})'''
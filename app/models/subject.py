@@ -1,16 +1,26 @@
-from sqlalchemy import ForeignKey
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import ForeignKey, String, Index
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.database import Base
 
+from app.utils.classroom_type import ClassroomType
+
 
 class Subject(Base):
     __tablename__ = 'subject'
+    __table_args__ = (
+        Index('subject_name_uq', 'name', unique=True),
+        Index('subject_career_course_idx', 'career_id', 'course'),
+    )
     
     id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str] = mapped_column(nullable=False)
     course: Mapped[int] = mapped_column(nullable=False)
     career_id: Mapped[int] = mapped_column(ForeignKey('career.id'), nullable=False)
+    #* kind of room the subject needs (None: any)
+    classroom_type: Mapped[ClassroomType | None] = mapped_column(String(30), nullable=True)
+    
+    career: Mapped['Career'] = relationship()
     
     def __repr__(self) -> str:
         return f'''Subject (id={self.id!r}, name={self.name!r},
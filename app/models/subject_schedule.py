@@ -1,19 +1,33 @@
-from sqlalchemy import ForeignKey
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import ForeignKey, Index
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.database import Base
 
 
 class SubjectSchedule(Base):
     __tablename__ = 'subject_schedule'
+    __table_args__ = (
+        Index('subject_schedule_section_uq', 'subject_id', 'section', unique=True),
+        Index('subject_schedule_teacher_schedule_uq', 'teacher_id', 'schedule_id', unique=True),
+        Index('subject_schedule_schedule_idx', 'schedule_id'),
+        Index('subject_schedule_classroom_uq', 'classroom_id', 'schedule_id', unique=True),
+    )
     
     id: Mapped[int] = mapped_column(primary_key=True)
     section: Mapped[str] = mapped_column(nullable=False)
     subject_id: Mapped[int] = mapped_column(ForeignKey('subject.id'), nullable=False)
     schedule_id: Mapped[int] = mapped_column(ForeignKey('schedule.id'), nullable=False)
     teacher_id: Mapped[int] = mapped_column(ForeignKey('teacher.id'), nullable=False)
+    classroom_id: Mapped[int | None] = mapped_column(ForeignKey('classroom.id'), nullable=True)
+    capacity: Mapped[int | None] = mapped_column(nullable=True) #* seats (None: no limit)
+    enrolled: Mapped[int] = mapped_column(nullable=False, default=0, server_default='0') #* seats taken, kept by StudentSubjectController
+    
+    subject: Mapped['Subject'] = relationship()
+    schedule: Mapped['Schedule'] = relationship()
+    teacher: Mapped['Teacher'] = relationship()
     
     def __repr__(self) -> str:
         return f'''SubjectSchedule (id={self.id!r}, section={self.section!r},
                     subject_id={self.subject_id!r}, schedule_id={self.schedule_id!r},
-                    teacher_id={self.teacher_id!r})'''
+                    teacher_id={self.teacher_id!r}, classroom_id={self.classroom_id!r},
+                    capacity={self.capacity!r}, enrolled={self.enrolled!r})'''
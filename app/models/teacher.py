@@ -1,3 +1,4 @@
+from sqlalchemy import Index, LargeBinary
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.models.database import Base
@@ -5,10 +6,15 @@ from app.models.database import Base
 
 class Teacher(Base):
     __tablename__ = 'teacher'
+    __table_args__ = (
+        Index('teacher_identification_number_uq', 'identification_number', unique=True),
+    )
     
     id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str] = mapped_column(nullable=False)
     identification_number: Mapped[str] = mapped_column(nullable=False)
+    availability: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True) #* SlotGrid mask of the slots they can teach (None: any)
+    preference: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True) #* SlotGrid mask of the slots they'd rather teach
     
     def __repr__(self) -> str:
         return f'''Teacher (id={self.id!r}, name={self.name!r},
@@ -0,0 +1,15 @@
+from sqlalchemy import String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.database import Base
+
+
+#* one row per timetable key (see utils.versions); a missing row is version 0
+class TimetableVersion(Base):
+    __tablename__ = 'timetable_version'
+    
+    name: Mapped[str] = mapped_column(String(150), primary_key=True)
+    version: Mapped[int] = mapped_column(nullable=False, default=0)
+    
+    def __repr__(self) -> str:
+        return f'TimetableVersion (name={self.name!r}, version={self.version!r})'
@@ -0,0 +1,8 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+#* An AsyncSession can't run two statements at the same time, so every lookup that is meant to
+#* run concurrently (asyncio.gather) gets its own short-lived session on the same engine
+async def lookup_by_id(session: AsyncSession, controller: type, id: int) -> any:
+    async with AsyncSession(bind=session.bind, expire_on_commit=False) as lookup_session:
+        return await controller(lookup_session).get_by_id(id)
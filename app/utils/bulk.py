@@ -0,0 +1,115 @@
+from sqlalchemy import select, insert, tuple_
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+
+
+CHUNK_SIZE = 500 #* keeps IN (...) lists below the bound parameter limit of every backend
+
+
+#* Per-row report of a create_many call: positions refer to the order of the input iterable
+class BulkResult:
+    def __init__(self):
+        self.created: list[tuple[int, dict[str, any]]] = []
+        self.rejected: list[tuple[int, any, str]] = []
+
+    def reject(self, position: int, data: any, reason: str) -> None:
+        self.rejected.append((position, data, reason))
+
+    def __repr__(self) -> str:
+        return f'BulkResult (created={len(self.created)!r}, rejected={len(self.rejected)!r})'
+
+
+def chunked(values: list[any], size: int = CHUNK_SIZE):
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+#* returns the subset of keys already stored, using one IN (...) query per chunk
+def existing_keys(session: Session, columns: list[any], keys: set[any]) -> set[any]:
+    found = set()
+
+    for chunk in chunked(list(keys)):
+        if len(columns) == 1:
+            statement = select(columns[0]).where(columns[0].in_(chunk))
+
+            found.update(session.execute(statement).scalars())
+
+        else:
+            statement = select(*columns).where(tuple_(*columns).in_(chunk))
+
+            found.update(tuple(row) for row in session.execute(statement))
+
+    return found
+
+
+#* why the backend refused a row: SQLite words it in the message, MySQL gives an errno, PostgreSQL a SQLSTATE
+def integrity_reason(error: IntegrityError) -> str:
+    code = getattr(error.orig, 'pgcode', None) or (error.orig.args[0] if getattr(error.orig, 'args', None) else None)
+    message = str(error.orig).lower()
+
+    if code in ('23503', 1216, 1452) or 'foreign key' in message:
+        return 'references a row that does not exist'
+
+    if code in ('23505', 1062) or 'unique' in message or 'duplicate' in message:
+        return 'already exists'
+
+    return f'violates a constraint: {error.orig}'
+
+
+#* inserts every row with one executemany in a single transaction; if a concurrent writer makes
+#* the batch fail, rows are retried one by one under savepoints so only the offending ones are rejected.
+#* The retry starts a new transaction: after_insert(data) runs in each row's savepoint to redo whatever the
+#* caller had done for the batch (e.g. reserve a seat) and returns a reason to reject the row, or None.
+#* before_commit(created) runs in the transaction of the rows it gets, right before it is committed.
+def bulk_insert(session: Session, model: any, rows: list[tuple[int, dict[str, any]]], result: BulkResult,
+                after_insert: callable = None, before_commit: callable = None
+                ) -> None:
+    if not rows:
+        return
+
+    try:
+        session.execute(insert(model), [data for _, data in rows])
+
+        if before_commit is not None:
+            before_commit(rows)
+
+        session.commit()
+
+        result.created.extend(rows)
+
+        return
+
+    except IntegrityError:
+        session.rollback()
+
+    created = []
+
+    for position, data in rows:
+        savepoint = session.begin_nested()
+
+        try:
+            session.execute(insert(model), data)
+
+        except IntegrityError as e:
+            savepoint.rollback()
+            result.reject(position, data, integrity_reason(e))
+
+            continue
+
+        reason = after_insert(data) if after_insert is not None else None
+
+        if reason is not None:
+            savepoint.rollback()
+            result.reject(position, data, reason)
+
+            continue
+
+        savepoint.commit()
+        created.append((position, data))
+
+    if before_commit is not None and created:
+        before_commit(created)
+
+    session.commit()
+
+    result.created.extend(created)
@@ -0,0 +1,125 @@
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+
+MISSING = object()
+
+
+#* Bounded LRU cache with optional TTL (seconds) and hit/miss counters
+class LRUCache:
+    def __init__(self, maxsize: int = 1024, ttl: float | None = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: any) -> any:
+        with self._lock:
+            entry = self._entries.get(key, MISSING)
+
+            if entry is not MISSING and entry[0] is not None and entry[0] < monotonic():
+                del self._entries[key]
+
+                entry = MISSING
+
+            if entry is MISSING:
+                self.misses += 1
+
+                return MISSING
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+            return entry[1]
+
+    def set(self, key: any, value: any) -> None:
+        expires_at = monotonic() + self.ttl if self.ttl is not None else None
+
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+                self.evictions += 1
+
+    def invalidate(self, *keys: any) -> None:
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, any]:
+        requests = self.hits + self.misses
+
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'hit_rate': self.hits / requests if requests else 0.0
+        }
+
+
+_caches: dict[str, LRUCache] = {}
+
+
+#* caches are shared by name, so every controller instance of an entity hits the same one
+def get_cache(name: str, maxsize: int = 1024, ttl: float | None = None) -> LRUCache:
+    if name not in _caches:
+        _caches[name] = LRUCache(maxsize, ttl)
+
+    return _caches[name]
+
+
+def cache_stats() -> dict[str, dict[str, any]]:
+    return {name: cache.stats() for name, cache in _caches.items()}
+
+
+def clear_caches() -> None:
+    for cache in _caches.values():
+        cache.clear()
+
+
+#* Read-through lookup of a single ORM row. Only column values are cached (never the instance,
+#* which belongs to the session that loaded it); hits are attached to the caller's session
+#* with merge(load=False), so they don't emit any SQL.
+def cached_lookup(session: Session, cache: LRUCache | None, key: any, loader: callable) -> any:
+    if cache is None:
+        return loader()
+
+    cached = cache.get(key)
+
+    if cached is not MISSING:
+        model, values = cached
+
+        instance = model(**values)
+        make_transient_to_detached(instance)
+
+        return session.merge(instance, load=False)
+
+    result = loader()
+
+    if result is not None:
+        mapper = inspect(result).mapper
+
+        cache.set(key, (mapper.class_, {attribute.key: getattr(result, attribute.key) for attribute in mapper.column_attrs}))
+
+    return result
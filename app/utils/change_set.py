@@ -0,0 +1,18 @@
+#* What changed since the timetable was generated, input of SubjectScheduleController.repair:
+#*   unavailable_teachers: teacher ids that can no longer teach any section
+#*   withdrawn_schedules:  schedule ids no section can meet in anymore
+#*   new_sections:         (subject_id, section) pairs to add to the timetable
+class ChangeSet:
+    def __init__(self, unavailable_teachers: set[int] = (), withdrawn_schedules: set[int] = (),
+                 new_sections: list[tuple[int, str]] = ()
+                 ):
+        self.unavailable_teachers = set(unavailable_teachers)
+        self.withdrawn_schedules = set(withdrawn_schedules)
+        self.new_sections = list(new_sections)
+
+    def __bool__(self) -> bool:
+        return bool(self.unavailable_teachers or self.withdrawn_schedules or self.new_sections)
+
+    def __repr__(self) -> str:
+        return f'''ChangeSet (unavailable_teachers={sorted(self.unavailable_teachers)!r},
+                    withdrawn_schedules={sorted(self.withdrawn_schedules)!r}, new_sections={self.new_sections!r})'''
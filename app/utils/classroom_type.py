@@ -0,0 +1,8 @@
+import enum
+
+
+class ClassroomType(str, enum.Enum):
+    classroom = 'Aula'
+    laboratory = 'Laboratorio'
+    computer_lab = 'Laboratorio de computacion'
+    workshop = 'Taller'
@@ -1,7 +1,7 @@
 import enum
 
 
-class DayOfWeek(enum.Enum):
+class DayOfWeek(str, enum.Enum):
     monday = 'Lunes'
     tuesday = 'Martes'
     wednesday = 'Miercoles'
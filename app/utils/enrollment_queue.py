@@ -0,0 +1,117 @@
+from concurrent.futures import Future
+from queue import Empty, Queue
+from threading import Thread
+from time import monotonic
+
+
+BATCH_SIZE = 64 #* requests per transaction
+MAX_WAIT = 0.005 #* seconds a worker waits for a batch to fill up once it has a first request
+
+_STOP = object()
+
+
+#* Funnels enrollment requests from any number of threads into a few workers. Each worker drains up to
+#* batch_size queued requests and hands them to its own handler (handler_factory() is called once per
+#* worker, so each one can own a session), typically StudentSubjectController.enroll_batch: one
+#* transaction per batch instead of one per request. submit() returns a Future that resolves to None
+#* when the student got the seat and raises the exception that rejected the request otherwise.
+class EnrollmentQueue:
+    def __init__(self, handler_factory: callable, workers: int = 1, batch_size: int = BATCH_SIZE,
+                 max_wait: float = MAX_WAIT
+                 ):
+        self._handler_factory = handler_factory
+        self._workers = workers
+        self._batch_size = batch_size
+        self._max_wait = max_wait
+
+        self._queue: Queue = Queue()
+        self._threads: list[Thread] = []
+
+        self.batches = 0
+        self.requests = 0
+
+    def __enter__(self) -> 'EnrollmentQueue':
+        self.start()
+
+        return self
+
+    def __exit__(self, *exception: any) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        for position in range(self._workers):
+            thread = Thread(target=self._run, name=f'enrollment-{position}', daemon=True)
+            thread.start()
+
+            self._threads.append(thread)
+
+    def stop(self) -> None:
+        #* requests already queued are still handled: the sentinels go behind them
+        for _ in self._threads:
+            self._queue.put(_STOP)
+
+        for thread in self._threads:
+            thread.join()
+
+        self._threads.clear()
+
+    def submit(self, data: dict[str, int]) -> Future:
+        future = Future()
+        self._queue.put((data, future))
+
+        return future
+
+    def _run(self) -> None:
+        handler = self._handler_factory()
+
+        while True:
+            item = self._queue.get()
+
+            if item is _STOP:
+                return
+
+            batch = [item]
+            stopping = self._fill(batch)
+
+            self._handle(handler, batch)
+
+            if stopping:
+                return
+
+    def _fill(self, batch: list[tuple[dict[str, int], Future]]) -> bool:
+        deadline = monotonic() + self._max_wait
+
+        while len(batch) < self._batch_size:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - monotonic()))
+
+            except Empty:
+                return False
+
+            if item is _STOP:
+                return True
+
+            batch.append(item)
+
+        return False
+
+    def _handle(self, handler: callable, batch: list[tuple[dict[str, int], Future]]) -> None:
+        try:
+            outcomes = handler([data for data, _ in batch])
+
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+
+            return
+
+        self.batches += 1
+        self.requests += len(batch)
+
+        for (_, future), outcome in zip(batch, outcomes):
+            if outcome is None:
+                future.set_result(None)
+
+            else:
+                future.set_exception(outcome)
+
@@ -2,4 +2,13 @@ class ObjectAlreadyExistsException(Exception):
     pass
 
 class ObjectNotFoundException(Exception):
-    pass
\ No newline at end of file
+    pass
+
+class UnsolvableScheduleException(Exception):
+    pass
+
+class ScheduleConflictException(Exception):
+    pass
+
+class SectionFullException(Exception):
+    pass
@@ -0,0 +1,85 @@
+from bisect import insort
+
+
+#* Interval tree stored as an implicit balanced BST over the intervals sorted by start.
+#* Each node keeps the max end of its subtree, so "which intervals overlap [start, end)"
+#* prunes whole subtrees and answers in O(log n + k). Inserts mark the tree dirty and the
+#* max ends are rebuilt in O(n) on the next query.
+class IntervalTree:
+    def __init__(self, intervals: list[tuple[any, any, any]] = ()):
+        self._items = sorted(intervals)
+        self._max_end = None
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def add(self, start: any, end: any, value: any) -> None:
+        insort(self._items, (start, end, value))
+
+        self._max_end = None
+
+    def overlapping(self, start: any, end: any) -> list[any]:
+        if self._max_end is None:
+            self._max_end = [None] * len(self._items)
+            self._build(0, len(self._items))
+
+        result = []
+        stack = [(0, len(self._items))]
+
+        while stack:
+            low, high = stack.pop()
+
+            if low >= high:
+                continue
+
+            middle = (low + high) // 2
+
+            #* nothing in this subtree ends after start
+            if self._max_end[middle] <= start:
+                continue
+
+            stack.append((low, middle))
+
+            item_start, item_end, value = self._items[middle]
+
+            #* everything to the right starts at or after item_start
+            if item_start < end:
+                if item_end > start:
+                    result.append(value)
+
+                stack.append((middle + 1, high))
+
+        return result
+
+    def _build(self, low: int, high: int) -> any:
+        if low >= high:
+            return None
+
+        middle = (low + high) // 2
+
+        max_end = self._items[middle][1]
+
+        for child in (self._build(low, middle), self._build(middle + 1, high)):
+            if child is not None and child > max_end:
+                max_end = child
+
+        self._max_end[middle] = max_end
+
+        return max_end
+
+
+#* One interval tree of schedule blocks per DayOfWeek
+class ScheduleIndex:
+    def __init__(self):
+        self._trees: dict[str, IntervalTree] = {}
+
+    def add(self, day: str, start_time: any, end_time: any, schedule_id: int) -> None:
+        self._trees.setdefault(day, IntervalTree()).add(start_time, end_time, schedule_id)
+
+    def overlapping(self, day: str, start_time: any, end_time: any) -> list[int]:
+        tree = self._trees.get(day)
+
+        if tree is None:
+            return []
+
+        return tree.overlapping(start_time, end_time)
@@ -0,0 +1,99 @@
+from heapq import heappush, heappop
+
+
+INFINITY = float('inf')
+
+
+#* Min-cost flow by successive shortest paths with Johnson potentials (Dijkstra on reduced costs).
+#* Costs must be non-negative integers on the edges added by the caller. Every augmentation sends flow
+#* along the cheapest remaining path, so after each one the flow is the cheapest of its size; stopping
+#* when no path is left gives the cheapest maximum flow.
+class MinCostFlow:
+    def __init__(self, nodes: int = 0):
+        self._graph: list[list[int]] = [[] for _ in range(nodes)]
+        #* edge i and its residual twin i ^ 1 live side by side
+        self._to: list[int] = []
+        self._capacity: list[int] = []
+        self._cost: list[int] = []
+
+    def add_node(self) -> int:
+        self._graph.append([])
+
+        return len(self._graph) - 1
+
+    def add_edge(self, source: int, target: int, capacity: int, cost: int = 0) -> int:
+        edge = len(self._to)
+
+        self._graph[source].append(edge)
+        self._to.append(target)
+        self._capacity.append(capacity)
+        self._cost.append(cost)
+
+        self._graph[target].append(edge + 1)
+        self._to.append(source)
+        self._capacity.append(0)
+        self._cost.append(-cost)
+
+        return edge
+
+    def flow_on(self, edge: int) -> int:
+        #* flow sent through an edge returned by add_edge
+        return self._capacity[edge ^ 1]
+
+    def solve(self, source: int, sink: int, limit: int = INFINITY) -> tuple[int, int]:
+        nodes = len(self._graph)
+        potential = [0] * nodes
+
+        flow = cost = 0
+
+        while flow < limit:
+            distance = [INFINITY] * nodes
+            previous = [-1] * nodes
+            distance[source] = 0
+            heap = [(0, source)]
+
+            while heap:
+                current_distance, node = heappop(heap)
+
+                if current_distance > distance[node]:
+                    continue
+
+                for edge in self._graph[node]:
+                    if self._capacity[edge] <= 0:
+                        continue
+
+                    target = self._to[edge]
+                    candidate = current_distance + self._cost[edge] + potential[node] - potential[target]
+
+                    if candidate < distance[target]:
+                        distance[target] = candidate
+                        previous[target] = edge
+                        heappush(heap, (candidate, target))
+
+            if distance[sink] == INFINITY:
+                break
+
+            for node in range(nodes):
+                if distance[node] < INFINITY:
+                    potential[node] += distance[node]
+
+            amount = limit - flow
+            node = sink
+
+            while node != source:
+                edge = previous[node]
+                amount = min(amount, self._capacity[edge])
+                node = self._to[edge ^ 1]
+
+            node = sink
+
+            while node != source:
+                edge = previous[node]
+                self._capacity[edge] -= amount
+                self._capacity[edge ^ 1] += amount
+                node = self._to[edge ^ 1]
+
+            flow += amount
+            cost += amount * (potential[sink] - potential[source])
+
+        return flow, cost
@@ -0,0 +1,17 @@
+import re
+import unicodedata
+
+
+_NOT_ALPHANUMERIC = re.compile(r'[^0-9a-z]+')
+
+
+#* the form identification numbers are stored and looked up in: "v-12345678 " -> "V12345678"
+def normalize_identification_number(identification_number: str) -> str:
+    return identification_number.strip().upper().replace('-', '')
+
+
+#* lower case, accents removed and punctuation turned into spaces: "García-Pérez" -> "garcia perez"
+def fold(text: str) -> str:
+    decomposed = unicodedata.normalize('NFKD', text.casefold())
+
+    return _NOT_ALPHANUMERIC.sub(' ', ''.join(char for char in decomposed if not unicodedata.combining(char))).strip()
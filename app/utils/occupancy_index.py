@@ -0,0 +1,155 @@
+from utils.exceptions import ObjectNotFoundException
+
+
+#* In-memory view of subject_schedule used for conflict checks without DB round trips.
+#* Every schedule block gets a bit position; each teacher has one bitmask over those positions
+#* and every taken (subject_id, section) pair lives in a set, so each check is O(1).
+#* Blocks that overlap in time (see ScheduleIndex) share a conflict mask, so a teacher busy at
+#* 08:00-10:00 is also reported busy for 09:00-11:00.
+#* Blocks outside a teacher's availability (see SlotGrid) are a fixed mask ORed into what the teacher
+#* has blocked, so they are pruned by the same AND; preferred blocks are kept for the solver to favour.
+class OccupancyIndex:
+    def __init__(self, schedule_ids: list[int] = (), teacher_ids: list[int] = (), subject_ids: list[int] = ()):
+        self._schedule_ids = []
+        self._positions = {}
+        self._conflicts = []
+        self._teacher_masks = {}
+        self._teacher_blocked = {}
+        self._teacher_unavailable = {}
+        self._teacher_preferred = {}
+        self._subject_ids = set()
+        self._sections = set()
+
+        for schedule_id in schedule_ids:
+            self.add_schedule(schedule_id)
+
+        for teacher_id in teacher_ids:
+            self.add_teacher(teacher_id)
+
+        for subject_id in subject_ids:
+            self.add_subject(subject_id)
+
+    @property
+    def schedule_ids(self) -> list[int]:
+        #* ordered by bit position
+        return self._schedule_ids
+
+    @property
+    def all_blocks(self) -> int:
+        return (1 << len(self._schedule_ids)) - 1
+
+    def add_schedule(self, schedule_id: int, overlapping_ids: list[int] = ()) -> None:
+        if schedule_id not in self._positions:
+            self._positions[schedule_id] = len(self._schedule_ids)
+            self._schedule_ids.append(schedule_id)
+            self._conflicts.append(1 << self._positions[schedule_id])
+
+        for other_id in overlapping_ids:
+            if other_id in self._positions:
+                self._set_overlap(schedule_id, other_id)
+
+    def _set_overlap(self, schedule_id: int, other_id: int) -> None:
+        position, other_position = self._positions[schedule_id], self._positions[other_id]
+
+        self._conflicts[position] |= 1 << other_position
+        self._conflicts[other_position] |= 1 << position
+
+        for teacher_id, mask in self._teacher_masks.items():
+            if mask & (self._conflicts[position] | self._conflicts[other_position]):
+                self._teacher_blocked[teacher_id] = self.expand(mask)
+
+    def add_teacher(self, teacher_id: int) -> None:
+        self._teacher_masks.setdefault(teacher_id, 0)
+        self._teacher_blocked.setdefault(teacher_id, 0)
+
+    def add_subject(self, subject_id: int) -> None:
+        self._subject_ids.add(subject_id)
+
+    def has_schedule(self, schedule_id: int) -> bool:
+        return schedule_id in self._positions
+
+    def has_teacher(self, teacher_id: int) -> bool:
+        return teacher_id in self._teacher_masks
+
+    def has_subject(self, subject_id: int) -> bool:
+        return subject_id in self._subject_ids
+
+    def position(self, schedule_id: int) -> int:
+        try:
+            return self._positions[schedule_id]
+
+        except KeyError:
+            raise ObjectNotFoundException(f'Schedule with id "{schedule_id}" not found')
+
+    def bit(self, schedule_id: int) -> int:
+        return 1 << self.position(schedule_id)
+
+    def conflict_mask(self, schedule_id: int) -> int:
+        #* the block itself plus every block overlapping it
+        return self._conflicts[self.position(schedule_id)]
+
+    def expand(self, mask: int) -> int:
+        #* union of the conflict masks of every block in mask
+        blocked = 0
+
+        while mask:
+            low = mask & -mask
+
+            blocked |= self._conflicts[low.bit_length() - 1]
+            mask ^= low
+
+        return blocked
+
+    def teacher_mask(self, teacher_id: int) -> int:
+        #* blocks the teacher teaches
+        try:
+            return self._teacher_masks[teacher_id]
+
+        except KeyError:
+            raise ObjectNotFoundException(f'Teacher with id "{teacher_id}" not found')
+
+    def teacher_blocked(self, teacher_id: int) -> int:
+        #* blocks the teacher can no longer take because they overlap a taught one or their availability
+        self.teacher_mask(teacher_id)
+
+        return self._teacher_blocked[teacher_id] | self._teacher_unavailable.get(teacher_id, 0)
+
+    def set_teacher_slots(self, teacher_id: int, unavailable: int = 0, preferred: int = 0) -> None:
+        #* masks over the block positions (SlotGrid.blocks_touching / blocks_within)
+        self.add_teacher(teacher_id)
+
+        self._teacher_unavailable[teacher_id] = unavailable
+        self._teacher_preferred[teacher_id] = preferred
+
+    def teacher_unavailable(self, teacher_id: int) -> int:
+        return self._teacher_unavailable.get(teacher_id, 0)
+
+    def teacher_preferred(self, teacher_id: int) -> int:
+        return self._teacher_preferred.get(teacher_id, 0)
+
+    def is_teacher_available(self, teacher_id: int, schedule_id: int) -> bool:
+        return not self.teacher_unavailable(teacher_id) & self.bit(schedule_id)
+
+    def is_teacher_free(self, teacher_id: int, schedule_id: int) -> bool:
+        return not self.teacher_blocked(teacher_id) & self.bit(schedule_id)
+
+    def section_exists(self, subject_id: int, section: str) -> bool:
+        return (subject_id, section) in self._sections
+
+    #* same question as SubjectScheduleController.exists, but overlapping blocks also count
+    def conflicts(self, data: dict[str, any]) -> bool:
+        return (self.section_exists(data['subject_id'], data['section'])
+                or not self.is_teacher_free(data['teacher_id'], data['schedule_id']))
+
+    def add(self, data: dict[str, any]) -> None:
+        self.add_teacher(data['teacher_id'])
+        self.add_schedule(data['schedule_id'])
+
+        self._teacher_masks[data['teacher_id']] |= self.bit(data['schedule_id'])
+        self._teacher_blocked[data['teacher_id']] |= self.conflict_mask(data['schedule_id'])
+        self._sections.add((data['subject_id'], data['section']))
+
+    def remove(self, data: dict[str, any]) -> None:
+        self._teacher_masks[data['teacher_id']] &= ~self.bit(data['schedule_id'])
+        self._teacher_blocked[data['teacher_id']] = self.expand(self._teacher_masks[data['teacher_id']])
+        self._sections.discard((data['subject_id'], data['section']))
@@ -0,0 +1,84 @@
+from typing import Iterator
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+STREAM_BATCH_SIZE = 1000
+
+
+#* One page of a keyset (seek) listing: pass next_after_id back as after_id to get the next one
+class Page:
+    def __init__(self, items: list[any], next_after_id: int | None):
+        self.items = items
+        self.next_after_id = next_after_id
+
+    @property
+    def has_more(self) -> bool:
+        return self.next_after_id is not None
+
+    def __iter__(self) -> Iterator[any]:
+        return iter(self.items)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __repr__(self) -> str:
+        return f'Page (items={len(self.items)!r}, next_after_id={self.next_after_id!r})'
+
+
+#* filters are column=value pairs; a list, tuple or set value becomes an IN (...)
+def _filtered(model: any, filters: dict[str, any]):
+    statement = select(model)
+
+    for name, value in filters.items():
+        if name not in model.__table__.columns:
+            raise ValueError(f'Invalid filter "{name}" for {model.__tablename__}')
+
+        column = getattr(model, name)
+
+        if isinstance(value, (list, tuple, set, frozenset)):
+            statement = statement.where(column.in_(value))
+
+        else:
+            statement = statement.where(column == value)
+
+    return statement
+
+
+#* WHERE id > after_id ORDER BY id LIMIT page_size + 1: the primary key index serves every page
+#* at the same cost, unlike OFFSET, and the extra row tells whether there is a next page
+def get_page(session: Session, model: any, after_id: int | None = None, page_size: int = DEFAULT_PAGE_SIZE,
+             **filters: any
+             ) -> Page:
+    if not 0 < page_size <= MAX_PAGE_SIZE:
+        raise ValueError(f'The page size must be between 1 and {MAX_PAGE_SIZE}')
+
+    statement = _filtered(model, filters)
+
+    if after_id is not None:
+        statement = statement.where(model.id > after_id)
+
+    items = session.execute(statement.order_by(model.id).limit(page_size + 1)).scalars().all()
+
+    if len(items) > page_size:
+        return Page(items[:page_size], items[page_size - 1].id)
+
+    return Page(items, None)
+
+
+#* Streams every row in id order through a server-side cursor, batch_size rows at a time.
+#* The session only holds weak references to yielded instances, so memory stays flat as long as
+#* the caller doesn't keep them. The connection is busy until the iterator is exhausted or closed.
+def iter_all(session: Session, model: any, batch_size: int = STREAM_BATCH_SIZE, **filters: any) -> Iterator[any]:
+    statement = _filtered(model, filters).order_by(model.id).execution_options(yield_per=batch_size)
+
+    result = session.execute(statement)
+
+    try:
+        yield from result.scalars()
+
+    finally:
+        result.close()
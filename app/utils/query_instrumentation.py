@@ -0,0 +1,269 @@
+import logging
+import re
+import sys
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from time import perf_counter
+
+from sqlalchemy import event, Engine
+
+
+logger = logging.getLogger(__name__)
+
+CONTROLLER_MODULES = ('controllers.', 'app.controllers.')
+UNATTRIBUTED = '<unattributed>'
+
+HISTOGRAM_BOUNDS_MS = (0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000) #* last bucket is everything above
+N_PLUS_ONE_THRESHOLD = 5 #* same-shape statements inside one call before it is reported
+
+_IN_LIST = re.compile(r'\bIN\s*\((?:\s*(?:\?|%s|:\w+)\s*,)+\s*(?:\?|%s|:\w+)\s*\)', re.IGNORECASE)
+_WHITESPACE = re.compile(r'\s+')
+
+
+#* statements only differing in the length of an expanded IN (...) have the same shape
+def statement_shape(statement: str) -> str:
+    return _WHITESPACE.sub(' ', _IN_LIST.sub('IN (?)', statement)).strip()
+
+
+#* the outermost controller method on the stack, so SubjectScheduleController.create is charged for
+#* the lookups it makes through SubjectController.get_by_id; returns (name, frame)
+def _caller(frame: any) -> tuple[str, any]:
+    found = (UNATTRIBUTED, None)
+
+    while frame is not None:
+        if frame.f_globals.get('__name__', '').startswith(CONTROLLER_MODULES):
+            found = (frame.f_code.co_qualname.split('.<locals>')[0], frame)
+
+        frame = frame.f_back
+
+    return found
+
+
+class MethodStats:
+    def __init__(self):
+        self.calls = 0
+        self.statements = 0
+        self.max_statements_per_call = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.slowest_statement = None
+        self.histogram = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+
+    def record(self, statement: str, elapsed_ms: float) -> None:
+        self.statements += 1
+        self.total_ms += elapsed_ms
+        self.histogram[bisect_left(HISTOGRAM_BOUNDS_MS, elapsed_ms)] += 1
+
+        if elapsed_ms > self.max_ms:
+            self.max_ms = elapsed_ms
+            self.slowest_statement = statement
+
+    def as_dict(self) -> dict[str, any]:
+        labels = [f'<={bound}ms' for bound in HISTOGRAM_BOUNDS_MS] + [f'>{HISTOGRAM_BOUNDS_MS[-1]}ms']
+
+        return {
+            'calls': self.calls,
+            'statements': self.statements,
+            'statements_per_call': round(self.statements / self.calls, 2) if self.calls else 0.0,
+            'max_statements_per_call': self.max_statements_per_call,
+            'total_ms': round(self.total_ms, 3),
+            'mean_ms': round(self.total_ms / self.statements, 3) if self.statements else 0.0,
+            'max_ms': round(self.max_ms, 3),
+            'slowest_statement': self.slowest_statement,
+            'histogram': dict(zip(labels, self.histogram))
+        }
+
+
+#* statements of the controller call currently running on a thread
+class _Call:
+    def __init__(self, method: str, frame: any):
+        self.method = method
+        self.frame = frame
+        self.statements = 0
+        self.shapes: dict[str, int] = {}
+
+
+#* Opt-in: listens to before/after_cursor_execute on one engine and charges every statement to the
+#* controller method that caused it. Consecutive statements coming from the same outermost controller
+#* frame belong to one call; a shape repeated n_plus_one_threshold times in a call is reported as N+1.
+#* The stack walk only sees synchronous callers, so the async controllers end up unattributed.
+class QueryInstrumentation:
+    def __init__(self, engine: Engine | None = None, n_plus_one_threshold: int = N_PLUS_ONE_THRESHOLD):
+        self._engine = engine
+        self.n_plus_one_threshold = n_plus_one_threshold
+
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._methods: dict[str, MethodStats] = {}
+        self._n_plus_one: dict[tuple[str, str], int] = {}
+        self._installed = None
+
+    @property
+    def installed(self) -> bool:
+        return self._installed is not None
+
+    def install(self) -> 'QueryInstrumentation':
+        if self._installed is None:
+            if self._engine is None:
+                from app.models.database import get_engine
+
+                self._engine = get_engine()
+
+            event.listen(self._engine, 'before_cursor_execute', self._before)
+            event.listen(self._engine, 'after_cursor_execute', self._after)
+            event.listen(self._engine, 'handle_error', self._error)
+
+            self._installed = self._engine
+
+        return self
+
+    def uninstall(self) -> None:
+        if self._installed is not None:
+            event.remove(self._installed, 'before_cursor_execute', self._before)
+            event.remove(self._installed, 'after_cursor_execute', self._after)
+            event.remove(self._installed, 'handle_error', self._error)
+
+            self._installed = None
+
+        self._finish_call()
+
+    def __enter__(self) -> 'QueryInstrumentation':
+        return self.install()
+
+    def __exit__(self, *exc_info: any) -> None:
+        self.uninstall()
+
+    def _before(self, connection, cursor, statement, parameters, context, executemany) -> None:
+        connection.info.setdefault('query_instrumentation_start', []).append(perf_counter())
+
+    def _error(self, context) -> None:
+        #* a failed statement never reaches after_cursor_execute
+        starts = context.connection.info.get('query_instrumentation_start') if context.connection is not None else None
+
+        if starts:
+            starts.pop()
+
+    def _after(self, connection, cursor, statement, parameters, context, executemany) -> None:
+        elapsed_ms = (perf_counter() - connection.info['query_instrumentation_start'].pop()) * 1000
+
+        method, frame = _caller(sys._getframe(1))
+        shape = statement_shape(statement)
+
+        call = getattr(self._local, 'call', None)
+
+        #* statements outside any controller are calls of their own
+        if call is None or frame is None or call.frame is not frame:
+            self._finish_call()
+
+            call = self._local.call = _Call(method, frame)
+
+        call.statements += 1
+        call.shapes[shape] = call.shapes.get(shape, 0) + 1
+
+        with self._lock:
+            stats = self._methods.get(method)
+
+            if stats is None:
+                stats = self._methods[method] = MethodStats()
+
+            if call.statements == 1:
+                stats.calls += 1
+
+            stats.max_statements_per_call = max(stats.max_statements_per_call, call.statements)
+            stats.record(shape, elapsed_ms)
+
+            if call.shapes[shape] >= self.n_plus_one_threshold:
+                key = (method, shape)
+                self._n_plus_one[key] = max(self._n_plus_one.get(key, 0), call.shapes[shape])
+
+    def _finish_call(self) -> None:
+        #* drops the reference to the previous call frame (and its locals)
+        self._local.call = None
+
+    def reset(self) -> None:
+        with self._lock:
+            self._methods.clear()
+            self._n_plus_one.clear()
+
+        self._finish_call()
+
+    def stats(self) -> dict[str, dict[str, any]]:
+        with self._lock:
+            return {method: stats.as_dict() for method, stats in sorted(self._methods.items())}
+
+    def statement_count(self, method: str | None = None) -> int:
+        with self._lock:
+            if method is not None:
+                return self._methods[method].statements if method in self._methods else 0
+
+            return sum(stats.statements for stats in self._methods.values())
+
+    def n_plus_one(self) -> list[dict[str, any]]:
+        with self._lock:
+            return [{'method': method, 'statement': shape, 'count': count}
+                    for (method, shape), count in sorted(self._n_plus_one.items(), key=lambda item: -item[1])]
+
+    def summary(self) -> str:
+        lines = [f'{"method":<55} {"calls":>7} {"stmts":>7} {"stmt/call":>9} {"total ms":>10} {"max ms":>9}']
+
+        for method, stats in sorted(self.stats().items(), key=lambda item: -item[1]['total_ms']):
+            lines.append(f'{method:<55} {stats["calls"]:>7} {stats["statements"]:>7} {stats["statements_per_call"]:>9} '
+                         f'{stats["total_ms"]:>10.1f} {stats["max_ms"]:>9.2f}')
+
+        for finding in self.n_plus_one():
+            lines.append(f'possible N+1 in {finding["method"]}: {finding["count"]} x {finding["statement"][:120]}')
+
+        return '\n'.join(lines)
+
+
+#* for tests: with instrument() as queries: ...; assert queries.statement_count() <= 3
+@contextmanager
+def instrument(engine: Engine | None = None, n_plus_one_threshold: int = N_PLUS_ONE_THRESHOLD):
+    instrumentation = QueryInstrumentation(engine, n_plus_one_threshold)
+
+    with instrumentation:
+        yield instrumentation
+
+
+#* Periodic summary for long running processes: logs (and resets) the collected stats every
+#* interval seconds from a daemon thread until stop() is called on the returned dumper
+class PeriodicDump:
+    def __init__(self, instrumentation: QueryInstrumentation, interval: float = 300.0, reset: bool = True,
+                 log: logging.Logger = logger
+                 ):
+        self.instrumentation = instrumentation
+        self.interval = interval
+        self.reset = reset
+        self.log = log
+
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='query-instrumentation-dump', daemon=True)
+
+    def start(self) -> 'PeriodicDump':
+        self.instrumentation.install()
+        self._thread.start()
+
+        return self
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            self.dump()
+
+    def dump(self) -> None:
+        if self.instrumentation.statement_count():
+            self.log.info('SQL per controller method:\n%s', self.instrumentation.summary())
+
+        if self.reset:
+            self.instrumentation.reset()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self.dump()
+        self.instrumentation.uninstall()
+
+
+def start_periodic_dump(engine: Engine | None = None, interval: float = 300.0,
+                        n_plus_one_threshold: int = N_PLUS_ONE_THRESHOLD
+                        ) -> PeriodicDump:
+    return PeriodicDump(QueryInstrumentation(engine, n_plus_one_threshold), interval).start()
@@ -0,0 +1,93 @@
+from utils.interval_tree import ScheduleIndex
+from utils.min_cost_flow import MinCostFlow
+
+
+#* Assigns a classroom to every section, one schedule block at a time. The sections meeting in a block
+#* and the rooms still free during it form a bipartite graph (a section fits a room when the room holds
+#* its enrollment and has the type its subject needs); a min-cost max flow over it seats as many sections
+#* as possible and, among those assignments, wastes the fewest seats (cost = capacity - enrolled).
+#* Rooms with the same (capacity, type) are interchangeable, so they collapse into one node whose
+#* capacity is how many of them are free; the graph grows with the room kinds, not the room count.
+class RoomAssigner:
+    def __init__(self, rooms: list[tuple[int, int, str]]):
+        #* rooms: (classroom_id, capacity, type)
+        self._rooms = rooms
+        self._index = ScheduleIndex()
+        self._used: dict[int, set[int]] = {} #* schedule_id -> classroom ids taken in that block
+
+    def occupy(self, day: str, start_time: any, end_time: any, schedule_id: int, classroom_id: int) -> None:
+        if schedule_id not in self._used:
+            self._index.add(day, start_time, end_time, schedule_id)
+
+        self._used.setdefault(schedule_id, set()).add(classroom_id)
+
+    def _taken(self, day: str, start_time: any, end_time: any) -> set[int]:
+        taken = set()
+
+        for schedule_id in self._index.overlapping(day, start_time, end_time):
+            taken |= self._used[schedule_id]
+
+        return taken
+
+    def assign_block(self, day: str, start_time: any, end_time: any, schedule_id: int,
+                     sections: list[tuple[int, int, str | None]]
+                     ) -> dict[int, int]:
+        #* sections: (subject_schedule_id, enrolled, required type or None); returns subject_schedule_id -> classroom_id
+        taken = self._taken(day, start_time, end_time)
+        kinds: dict[tuple[int, str], list[int]] = {}
+
+        for classroom_id, capacity, type in self._rooms:
+            if classroom_id not in taken:
+                kinds.setdefault((capacity, type), []).append(classroom_id)
+
+        if not sections or not kinds:
+            return {}
+
+        flow = MinCostFlow(2)
+        source, sink = 0, 1
+
+        kind_nodes = {}
+
+        for kind, classroom_ids in kinds.items():
+            kind_nodes[kind] = flow.add_node()
+            flow.add_edge(kind_nodes[kind], sink, len(classroom_ids))
+
+        edges = []
+
+        for subject_schedule_id, enrolled, required in sections:
+            node = flow.add_node()
+            flow.add_edge(source, node, 1)
+
+            for (capacity, type), kind_node in kind_nodes.items():
+                if capacity >= enrolled and (required is None or required == type):
+                    edges.append((subject_schedule_id, (capacity, type), flow.add_edge(node, kind_node, 1, capacity - enrolled)))
+
+        flow.solve(source, sink)
+
+        assignment = {}
+
+        for subject_schedule_id, kind, edge in edges:
+            if flow.flow_on(edge):
+                assignment[subject_schedule_id] = kinds[kind].pop()
+
+        for classroom_id in assignment.values():
+            self.occupy(day, start_time, end_time, schedule_id, classroom_id)
+
+        return assignment
+
+    def assign(self, blocks: list[tuple[int, str, any, any]], sections: dict[int, list[tuple[int, int, str | None]]]
+               ) -> tuple[dict[int, int], list[int]]:
+        #* blocks: (schedule_id, day, start_time, end_time) in timetable order; sections: schedule_id -> sections
+        #* returns (subject_schedule_id -> classroom_id, subject_schedule ids left without a room)
+        assignment = {}
+        unassigned = []
+
+        for schedule_id, day, start_time, end_time in blocks:
+            block_sections = sections.get(schedule_id, [])
+            block_assignment = self.assign_block(day, start_time, end_time, schedule_id, block_sections)
+
+            assignment.update(block_assignment)
+            unassigned.extend(subject_schedule_id for subject_schedule_id, _, _ in block_sections
+                              if subject_schedule_id not in block_assignment)
+
+        return assignment, unassigned
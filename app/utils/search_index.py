@@ -0,0 +1,223 @@
+from bisect import bisect_left, insort
+from heapq import nlargest, nsmallest
+from threading import Lock
+from typing import Iterable
+
+from utils.normalization import fold, normalize_identification_number
+
+
+SEARCH_LIMIT = 10
+PREFIX_LIMIT = 200 #* tokens a short prefix may expand to
+FUZZY_THRESHOLD = 0.5 #* minimum trigram similarity (Dice) of a misspelled token
+
+#* score of a query token against a name token; an identification number match beats any name
+EXACT_SCORE = 1.0
+PREFIX_SCORE = 0.6 #* plus up to 0.3 the closer the prefix is to the whole token
+FUZZY_SCORE = 0.8 #* times the trigram similarity
+IDENTIFICATION_NUMBER_SCORE = 10.0
+
+
+def _trigrams(token: str) -> set[str]:
+    padded = f'  {token} '
+
+    return {padded[position:position + 3] for position in range(len(padded) - 2)}
+
+
+#* In-memory name search over one entity. Names are folded (see fold) and split into tokens; each
+#* distinct token is kept in a sorted list (prefix matches by bisect) and under its trigrams (fuzzy
+#* matches), and maps to the ids whose name has it. A query token scores against every name token it
+#* matches exactly, as a prefix or by trigram similarity, and the ids are ranked by the sum of their
+#* best score per query token. Identification numbers are matched exactly, once normalized.
+class SearchIndex:
+    def __init__(self):
+        self._lock = Lock()
+        self._loaded = False
+
+        self._entries: dict[int, tuple[tuple[str, ...], str | None]] = {}
+        self._token_ids: dict[str, set[int]] = {}
+        self._tokens: list[str] = []
+        self._trigram_tokens: dict[str, set[str]] = {}
+        self._numbers: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def load(self, rows: Iterable[tuple]) -> None:
+        #* rows: (id, name) or (id, name, identification_number); replaces whatever was indexed
+        with self._lock:
+            self._clear()
+
+            for row in rows:
+                self._add(*row, keep_sorted=False)
+
+            self._tokens.sort()
+            self._loaded = True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._clear()
+
+    def _clear(self) -> None:
+        self._loaded = False
+        self._entries.clear()
+        self._token_ids.clear()
+        self._tokens.clear()
+        self._trigram_tokens.clear()
+        self._numbers.clear()
+
+    def add(self, id: int, name: str, identification_number: str | None = None) -> None:
+        #* also used on update: the previous name and number of id are dropped first
+        with self._lock:
+            self._remove(id)
+            self._add(id, name, identification_number)
+
+    def remove(self, id: int) -> None:
+        with self._lock:
+            self._remove(id)
+
+    def _add(self, id: int, name: str, identification_number: str | None = None, keep_sorted: bool = True) -> None:
+        tokens = tuple(dict.fromkeys(fold(name).split()))
+
+        for token in tokens:
+            ids = self._token_ids.get(token)
+
+            if ids is None:
+                ids = self._token_ids[token] = set()
+
+                if keep_sorted:
+                    insort(self._tokens, token)
+
+                else:
+                    self._tokens.append(token)
+
+                for trigram in _trigrams(token):
+                    self._trigram_tokens.setdefault(trigram, set()).add(token)
+
+            ids.add(id)
+
+        if identification_number is not None:
+            identification_number = normalize_identification_number(identification_number)
+            self._numbers[identification_number] = id
+
+        self._entries[id] = (tokens, identification_number)
+
+    def _remove(self, id: int) -> None:
+        entry = self._entries.pop(id, None)
+
+        if entry is None:
+            return
+
+        tokens, identification_number = entry
+
+        for token in tokens:
+            ids = self._token_ids[token]
+            ids.discard(id)
+
+            if not ids:
+                del self._token_ids[token]
+                del self._tokens[bisect_left(self._tokens, token)]
+
+                for trigram in _trigrams(token):
+                    self._trigram_tokens[trigram].discard(token)
+
+        if identification_number is not None and self._numbers.get(identification_number) == id:
+            del self._numbers[identification_number]
+
+    def search(self, query: str, limit: int = SEARCH_LIMIT) -> list[tuple[int, float]]:
+        #* (id, score) best first; every query token has to match when some name matches them all
+        with self._lock:
+            number_id = self._numbers.get(normalize_identification_number(query))
+            per_token = [self._matches(query_token) for query_token in dict.fromkeys(fold(query).split())]
+            per_token = [matches for matches in per_token if matches]
+
+            if len(per_token) == 1:
+                results = self._best_of_one(per_token[0], limit)
+
+            else:
+                results = self._best_of_many(per_token, limit)
+
+        if number_id is not None:
+            results = [(number_id, IDENTIFICATION_NUMBER_SCORE)] + [item for item in results if item[0] != number_id][:limit - 1]
+
+        return results
+
+    def _best_of_one(self, matches: dict[str, float], limit: int) -> list[tuple[int, float]]:
+        #* every id of a token has the token's score: walk the tokens best first, no per id scoring
+        results = []
+        seen = set()
+
+        for token, score in sorted(matches.items(), key=lambda item: -item[1]):
+            for id in nsmallest(limit, self._token_ids[token] - seen):
+                results.append((id, score))
+                seen.add(id)
+
+            if len(results) >= limit:
+                break
+
+        return sorted(results, key=lambda item: (-item[1], item[0]))[:limit]
+
+    def _best_of_many(self, per_token: list[dict[str, float]], limit: int) -> list[tuple[int, float]]:
+        matched = [set().union(*(self._token_ids[token] for token in matches)) for matches in per_token]
+
+        #* smallest sets first, so the intersection shrinks as early as possible
+        candidates = None
+
+        for ids in sorted(matched, key=len):
+            candidates = ids if candidates is None else candidates & ids
+
+        if not candidates:
+            candidates = set().union(*matched)
+
+        scores = {id: sum(max((matches.get(token, 0.0) for token in self._entries[id][0]), default=0.0)
+                          for matches in per_token)
+                  for id in candidates}
+
+        return nlargest(limit, scores.items(), key=lambda item: (item[1], -item[0]))
+
+    def _matches(self, query_token: str) -> dict[str, float]:
+        matches = {}
+
+        position = bisect_left(self._tokens, query_token)
+
+        for token in self._tokens[position:position + PREFIX_LIMIT]:
+            if not token.startswith(query_token):
+                break
+
+            matches[token] = EXACT_SCORE if token == query_token else PREFIX_SCORE + 0.3 * len(query_token) / len(token)
+
+        if len(query_token) >= 3:
+            query_trigrams = _trigrams(query_token)
+            common: dict[str, int] = {}
+
+            for trigram in query_trigrams:
+                for token in self._trigram_tokens.get(trigram, ()):
+                    common[token] = common.get(token, 0) + 1
+
+            for token, count in common.items():
+                #* a token of n characters has n + 1 trigrams
+                similarity = 2 * count / (len(query_trigrams) + len(token) + 1)
+
+                if similarity >= FUZZY_THRESHOLD and FUZZY_SCORE * similarity > matches.get(token, 0.0):
+                    matches[token] = FUZZY_SCORE * similarity
+
+        return matches
+
+
+_indexes: dict[str, SearchIndex] = {}
+
+
+#* shared by name like the caches, so every controller instance of an entity searches the same index
+def get_search_index(name: str) -> SearchIndex:
+    if name not in _indexes:
+        _indexes[name] = SearchIndex()
+
+    return _indexes[name]
+
+
+def clear_search_indexes() -> None:
+    for index in _indexes.values():
+        index.clear()
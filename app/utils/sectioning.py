@@ -0,0 +1,144 @@
+from utils.min_cost_flow import MinCostFlow
+
+
+CHUNKS_PER_SECTION = 16 #* convex cost steps per section; more steps, finer balance, bigger graph
+
+
+#* One section of a subject as the engine sees it:
+#*   block:     bit of its schedule block; conflicts: bits of that block and every block overlapping it
+#*   capacity:  seats in total (None: unlimited), enrolled: seats already taken
+class Section:
+    def __init__(self, subject_schedule_id: int, block: int, conflicts: int, capacity: int | None = None,
+                 enrolled: int = 0
+                 ):
+        self.subject_schedule_id = subject_schedule_id
+        self.block = block
+        self.conflicts = conflicts
+        self.capacity = capacity
+        self.enrolled = enrolled
+
+    @property
+    def free(self) -> int | None:
+        return None if self.capacity is None else max(0, self.capacity - self.enrolled)
+
+    def __repr__(self) -> str:
+        return f'''Section (subject_schedule_id={self.subject_schedule_id!r}, capacity={self.capacity!r},
+                    enrolled={self.enrolled!r})'''
+
+
+#* Batch sectioning: gives every student one clash-free section of each subject they request.
+#* Subjects are solved one after the other (fewest free seats per request first), each as a min-cost
+#* max flow: students -> sections -> sink. Students that could take exactly the same sections are
+#* interchangeable, so they collapse into one node per feasible set (at most 2^sections, usually a
+#* handful) and the graph stays tiny whatever the number of students. Section -> sink capacity is cut
+#* into chunks whose cost is the load the section already has, a convex cost that fills the emptiest
+#* sections first, so sizes come out balanced and never above capacity.
+class SectioningEngine:
+    def __init__(self, sections: dict[int, list[Section]], busy: dict[int, int] | None = None,
+                 chunks_per_section: int = CHUNKS_PER_SECTION
+                 ):
+        #* sections: subject_id -> sections; busy: student_id -> bits of the blocks they already attend
+        self._sections = sections
+        self._busy = dict(busy or {})
+        self._chunks_per_section = chunks_per_section
+
+    def solve(self, requests: dict[int, list[int]]) -> tuple[list[tuple[int, int]], list[tuple[int, int]]]:
+        #* requests: student_id -> subject ids. Returns ((student_id, subject_schedule_id) assigned,
+        #* (student_id, subject_id) that got no section)
+        students_by_subject = {}
+
+        for student_id, subject_ids in requests.items():
+            for subject_id in subject_ids:
+                students_by_subject.setdefault(subject_id, []).append(student_id)
+
+        assigned = []
+        unassigned = []
+
+        for subject_id in sorted(students_by_subject, key=lambda subject_id: self._pressure(subject_id, students_by_subject)):
+            students = sorted(set(students_by_subject[subject_id]))
+            placed = self._solve_subject(self._sections.get(subject_id, []), students)
+
+            for student_id in students:
+                if student_id in placed:
+                    assigned.append((student_id, placed[student_id]))
+
+                else:
+                    unassigned.append((student_id, subject_id))
+
+        return assigned, unassigned
+
+    def _pressure(self, subject_id: int, students_by_subject: dict[int, list[int]]) -> float:
+        #* free seats per requesting student; subjects with no slack go first
+        sections = self._sections.get(subject_id, [])
+
+        if any(section.free is None for section in sections):
+            return float('inf')
+
+        return sum(section.free for section in sections) / len(students_by_subject[subject_id])
+
+    def _solve_subject(self, sections: list[Section], students: list[int]) -> dict[int, int]:
+        if not sections:
+            return {}
+
+        #* feasible set of sections (bit i = sections[i]) -> students having exactly that set
+        classes = {}
+
+        for student_id in students:
+            busy = self._busy.get(student_id, 0)
+            feasible = 0
+
+            for position, section in enumerate(sections):
+                if not section.conflicts & busy and section.free != 0:
+                    feasible |= 1 << position
+
+            if feasible:
+                classes.setdefault(feasible, []).append(student_id)
+
+        if not classes:
+            return {}
+
+        flow = MinCostFlow(2)
+        source, sink = 0, 1
+
+        section_nodes = [flow.add_node() for _ in sections]
+        chunk = max(1, -(-len(students) // (len(sections) * self._chunks_per_section)))
+
+        for section, node in zip(sections, section_nodes):
+            seats = section.free if section.free is not None else len(students)
+            load = section.enrolled
+
+            while seats > 0:
+                step = min(chunk, seats)
+                flow.add_edge(node, sink, step, load)
+
+                load += step
+                seats -= step
+
+        edges = []
+
+        for feasible, members in classes.items():
+            node = flow.add_node()
+            flow.add_edge(source, node, len(members))
+
+            for position, section_node in enumerate(section_nodes):
+                if feasible >> position & 1:
+                    edges.append((feasible, position, flow.add_edge(node, section_node, len(members))))
+
+        flow.solve(source, sink)
+
+        placed = {}
+        taken = {feasible: 0 for feasible in classes}
+
+        for feasible, position, edge in edges:
+            amount = flow.flow_on(edge)
+            members = classes[feasible][taken[feasible]:taken[feasible] + amount]
+            taken[feasible] += amount
+
+            section = sections[position]
+            section.enrolled += amount
+
+            for student_id in members:
+                placed[student_id] = section.subject_schedule_id
+                self._busy[student_id] = self._busy.get(student_id, 0) | section.block
+
+        return placed
@@ -0,0 +1,146 @@
+from datetime import time
+from typing import Iterable
+
+from utils.day_of_week import DayOfWeek
+from utils.exceptions import ObjectNotFoundException
+
+
+SLOT_MINUTES = 5 #* resolution of the stored availability masks; changing it invalidates them
+MINUTES_PER_DAY = 24 * 60
+
+_DAYS = list(DayOfWeek)
+
+
+def _minutes(value: time | str) -> int:
+    if isinstance(value, str):
+        value = time.fromisoformat(value.strip())
+
+    return value.hour * 60 + value.minute
+
+
+#* Fixed grid over the week: every day is cut into slots of `resolution` minutes and slot
+#* day * slots_per_day + minute // resolution is one bit of a Python int. A free-form schedule block
+#* becomes the mask of the slots it touches (start rounded down, end rounded up, so blocks that overlap
+#* in time always share a slot) and teacher availabilities and preferences are masks over the same
+#* slots, so "can this teacher take this block" is one AND: not block & unavailable.
+#* Masks are stored as fixed-length little-endian bytes (to_bytes / from_bytes).
+class SlotGrid:
+    def __init__(self, resolution: int = SLOT_MINUTES, blocks: Iterable[tuple[int, str, time, time]] = ()):
+        if resolution <= 0 or MINUTES_PER_DAY % resolution:
+            raise ValueError(f'The slot resolution must divide a day, not {resolution} minutes')
+
+        self.resolution = resolution
+        self.slots_per_day = MINUTES_PER_DAY // resolution
+        self.size = len(_DAYS) * self.slots_per_day
+        self.full = (1 << self.size) - 1
+
+        self._blocks = {}
+
+        for schedule_id, day, start_time, end_time in blocks:
+            self.add_block(schedule_id, day, start_time, end_time)
+
+    def __len__(self) -> int:
+        return len(self._blocks)
+
+    def __repr__(self) -> str:
+        return f'SlotGrid (resolution={self.resolution!r}, blocks={len(self._blocks)!r})'
+
+    def window(self, day: DayOfWeek | str, start: time | str, end: time | str) -> int:
+        #* slots touched by [start, end) on that day; a zero-length block still takes its slot
+        offset = _DAYS.index(DayOfWeek(day)) * self.slots_per_day
+
+        first = _minutes(start) // self.resolution
+        last = min(self.slots_per_day, max(first + 1, -(-_minutes(end) // self.resolution)))
+
+        return ((1 << (last - first)) - 1) << (offset + first)
+
+    def mask(self, windows: Iterable[tuple[DayOfWeek | str, time | str, time | str]]) -> int:
+        result = 0
+
+        for day, start, end in windows:
+            result |= self.window(day, start, end)
+
+        return result
+
+    def windows(self, mask: int) -> list[tuple[DayOfWeek, time, time]]:
+        #* the runs of set slots, day by day; a run up to midnight ends at 23:59
+        result = []
+
+        for position, day in enumerate(_DAYS):
+            slots = mask >> (position * self.slots_per_day) & ((1 << self.slots_per_day) - 1)
+            first = 0
+
+            while slots:
+                skipped = (slots & -slots).bit_length() - 1
+                slots >>= skipped
+                length = (~slots & (slots + 1)).bit_length() - 1
+                slots >>= length
+
+                start, end = (first + skipped) * self.resolution, (first + skipped + length) * self.resolution
+                first += skipped + length
+
+                result.append((day, time(start // 60, start % 60), time(end // 60, end % 60) if end < MINUTES_PER_DAY
+                               else time(23, 59)))
+
+        return result
+
+    def add_block(self, schedule_id: int, day: DayOfWeek | str, start_time: time, end_time: time) -> int:
+        self._blocks[schedule_id] = self.window(day, start_time, end_time)
+
+        return self._blocks[schedule_id]
+
+    def has_block(self, schedule_id: int) -> bool:
+        return schedule_id in self._blocks
+
+    def block(self, schedule_id: int) -> int:
+        try:
+            return self._blocks[schedule_id]
+
+        except KeyError:
+            raise ObjectNotFoundException(f'Schedule with id "{schedule_id}" not found')
+
+    def unavailable(self, availability: int | None) -> int:
+        #* the slots outside an availability mask (None: available all week)
+        return 0 if availability is None else self.full & ~availability
+
+    def slot_masks(self, availability: bytes | None, preference: bytes | None) -> tuple[int, int]:
+        #* the stored columns of a teacher as (unavailable slots, preferred slots)
+        return self.unavailable(self.from_bytes(availability)), self.from_bytes(preference) or 0
+
+    def fits(self, schedule_id: int, unavailable: int) -> bool:
+        return not self.block(schedule_id) & unavailable
+
+    def blocks_touching(self, schedule_ids: list[int], slots: int) -> int:
+        #* bit i set when the i-th block takes any of the slots (blocks not in the grid are skipped)
+        result = 0
+
+        for position, schedule_id in enumerate(schedule_ids):
+            if self._blocks.get(schedule_id, 0) & slots:
+                result |= 1 << position
+
+        return result
+
+    def blocks_within(self, schedule_ids: list[int], slots: int) -> int:
+        #* bit i set when the i-th block lies entirely inside the slots
+        result = 0
+
+        for position, schedule_id in enumerate(schedule_ids):
+            if schedule_id in self._blocks and not self._blocks[schedule_id] & ~slots:
+                result |= 1 << position
+
+        return result
+
+    def to_bytes(self, mask: int | None) -> bytes | None:
+        if mask is None:
+            return None
+
+        return (mask & self.full).to_bytes((self.size + 7) // 8, 'little')
+
+    def from_bytes(self, data: bytes | None) -> int | None:
+        if data is None:
+            return None
+
+        if len(data) != (self.size + 7) // 8:
+            raise ValueError(f'A mask of {len(data)} bytes does not match a grid of {self.resolution} minute slots')
+
+        return int.from_bytes(data, 'little')
@@ -0,0 +1,40 @@
+from bisect import bisect_left
+from datetime import time
+
+
+#* Per-student timetable kept as one list per day sorted by start_time.
+#* Enrolled intervals never overlap, so a new block can only clash with its
+#* neighbours in that list, which makes every check O(log n).
+class StudentIntervalIndex:
+    def __init__(self):
+        self._intervals: dict[int, dict[str, list[tuple[time, time, int]]]] = {}
+
+    def has_student(self, student_id: int) -> bool:
+        return student_id in self._intervals
+
+    def load_student(self, student_id: int) -> None:
+        #* marks a student as loaded even if it has no enrollments yet
+        self._intervals.setdefault(student_id, {})
+
+    def add(self, student_id: int, day: str, start_time: time, end_time: time, subject_schedule_id: int) -> None:
+        intervals = self._intervals.setdefault(student_id, {}).setdefault(day, [])
+
+        intervals.insert(bisect_left(intervals, (start_time, end_time, subject_schedule_id)),
+                         (start_time, end_time, subject_schedule_id))
+
+    #* returns the subject_schedule_id that overlaps [start_time, end_time) or None
+    def find_clash(self, student_id: int, day: str, start_time: time, end_time: time) -> int | None:
+        intervals = self._intervals.get(student_id, {}).get(day)
+
+        if not intervals:
+            return None
+
+        position = bisect_left(intervals, (start_time,))
+
+        if position > 0 and intervals[position - 1][1] > start_time:
+            return intervals[position - 1][2]
+
+        if position < len(intervals) and intervals[position][0] < end_time:
+            return intervals[position][2]
+
+        return None
@@ -0,0 +1,255 @@
+import os
+import struct
+from collections import namedtuple
+from datetime import time
+from typing import Iterable
+
+import numpy as np
+
+from utils.day_of_week import DayOfWeek
+from utils.exceptions import ObjectNotFoundException
+from utils.interval_tree import ScheduleIndex
+
+
+#* File layout (little endian, every array aligned to ALIGNMENT bytes):
+#*   MAGIC, version (u4), array count (u4)
+#*   one directory entry per array: name (16s), dtype (8s), rows (u8), columns (u8), offset (u8)
+#*   the arrays, raw
+#* Entities are integer coded by their row in the sorted id arrays; strings live once in a table
+#* (utf-8 blob plus offsets) and are referred to by their index.
+MAGIC = b'TERMSNAP'
+VERSION = 1
+ALIGNMENT = 64
+
+_HEADER = struct.Struct('<8sII')
+_ENTRY = struct.Struct('<16s8sQQQ')
+
+_DAYS = list(DayOfWeek)
+
+SnapshotEntry = namedtuple('SnapshotEntry', ['subject_schedule_id', 'subject', 'section', 'day', 'start_time',
+                                             'end_time', 'teacher'])
+
+
+def _minutes(value: time) -> int:
+    return value.hour * 60 + value.minute
+
+
+def _time(minutes: int) -> time:
+    return time(int(minutes) // 60, int(minutes) % 60)
+
+
+class _Strings:
+    def __init__(self):
+        self._positions: dict[str, int] = {}
+
+    def __call__(self, value: str) -> int:
+        if value not in self._positions:
+            self._positions[value] = len(self._positions)
+
+        return self._positions[value]
+
+    def arrays(self) -> tuple[np.ndarray, np.ndarray]:
+        encoded = [value.encode() for value in self._positions]
+        offsets = np.zeros(len(encoded) + 1, dtype='<u8')
+        np.cumsum([len(value) for value in encoded], out=offsets[1:])
+
+        return offsets, np.frombuffer(b''.join(encoded), dtype=np.uint8)
+
+
+def _bits(rows: int, columns: int) -> np.ndarray:
+    return np.zeros((rows, (columns + 7) // 8), dtype=np.uint8)
+
+
+def _set_bits(matrix: np.ndarray, rows: Iterable[int], columns: Iterable[int]) -> None:
+    rows = np.asarray(rows, dtype=np.int64)
+    columns = np.asarray(columns, dtype=np.int64)
+
+    np.bitwise_or.at(matrix, (rows, columns >> 3), (0x80 >> (columns & 7)).astype(np.uint8))
+
+
+#* blocks: (schedule_id, day, start_time, end_time); teachers / students: (id, name);
+#* sections: (subject_schedule_id, subject name, section, schedule_id, teacher_id);
+#* enrollments: (student_id, subject_schedule_id) in any order
+def write_snapshot(path: str, blocks: Iterable[tuple], teachers: Iterable[tuple], students: Iterable[tuple],
+                   sections: Iterable[tuple], enrollments: Iterable[tuple[int, int]]
+                   ) -> None:
+    strings = _Strings()
+
+    blocks = sorted(blocks)
+    teachers = sorted(teachers)
+    students = sorted(students)
+    sections = sorted(sections)
+
+    block_ids = np.array([row[0] for row in blocks], dtype='<i8')
+    teacher_ids = np.array([row[0] for row in teachers], dtype='<i8')
+    student_ids = np.array([row[0] for row in students], dtype='<i8')
+    section_ids = np.array([row[0] for row in sections], dtype='<i8')
+
+    block_row = {schedule_id: position for position, schedule_id in enumerate(block_ids.tolist())}
+    teacher_row = {teacher_id: position for position, teacher_id in enumerate(teacher_ids.tolist())}
+    student_row = {student_id: position for position, student_id in enumerate(student_ids.tolist())}
+    section_row = {subject_schedule_id: position for position, subject_schedule_id in enumerate(section_ids.tolist())}
+
+    schedule_index = ScheduleIndex()
+
+    for schedule_id, day, start_time, end_time in blocks:
+        schedule_index.add(day, start_time, end_time, schedule_id)
+
+    overlaps = [(block_row[schedule_id], block_row[other_id]) for schedule_id, day, start_time, end_time in blocks
+                for other_id in schedule_index.overlapping(day, start_time, end_time)]
+
+    conflicts = _bits(len(blocks), len(blocks))
+    _set_bits(conflicts, [block for block, _ in overlaps], [other for _, other in overlaps])
+
+    section_block = np.array([block_row[row[3]] for row in sections], dtype='<i4')
+    section_teacher = np.array([teacher_row.get(row[4], -1) for row in sections], dtype='<i4')
+
+    taught = section_teacher >= 0
+
+    teacher_busy = _bits(len(teachers), len(blocks))
+    _set_bits(teacher_busy, section_teacher[taught], section_block[taught])
+
+    #* CSR: the sections of student row i are student_sections[student_offsets[i]:student_offsets[i + 1]]
+    pairs = np.array(sorted((student_row[student_id], section_row[subject_schedule_id])
+                            for student_id, subject_schedule_id in enrollments
+                            if student_id in student_row and subject_schedule_id in section_row), dtype=np.int64).reshape(-1, 2)
+
+    student_offsets = np.zeros(len(students) + 1, dtype='<i8')
+    np.cumsum(np.bincount(pairs[:, 0], minlength=len(students)), out=student_offsets[1:])
+    student_sections = pairs[:, 1].astype('<i4')
+
+    student_busy = _bits(len(students), len(blocks))
+    _set_bits(student_busy, pairs[:, 0], section_block[pairs[:, 1]])
+
+    arrays = {
+        'block_ids': block_ids,
+        'block_day': np.array([_DAYS.index(DayOfWeek(row[1])) for row in blocks], dtype='<u1'),
+        'block_start': np.array([_minutes(row[2]) for row in blocks], dtype='<u2'),
+        'block_end': np.array([_minutes(row[3]) for row in blocks], dtype='<u2'),
+        'block_conflicts': conflicts,
+        'teacher_ids': teacher_ids,
+        'teacher_name': np.array([strings(row[1]) for row in teachers], dtype='<i4'),
+        'teacher_busy': teacher_busy,
+        'student_ids': student_ids,
+        'student_name': np.array([strings(row[1]) for row in students], dtype='<i4'),
+        'student_busy': student_busy,
+        'student_offsets': student_offsets,
+        'student_sections': student_sections,
+        'section_ids': section_ids,
+        'section_subject': np.array([strings(row[1]) for row in sections], dtype='<i4'),
+        'section_code': np.array([strings(row[2]) for row in sections], dtype='<i4'),
+        'section_block': section_block,
+        'section_teacher': section_teacher,
+    }
+
+    arrays['string_offsets'], arrays['string_data'] = strings.arrays()
+
+    _write(path, arrays)
+
+
+def _write(path: str, arrays: dict[str, np.ndarray]) -> None:
+    offset = _HEADER.size + _ENTRY.size * len(arrays)
+    entries = []
+
+    for name, array in arrays.items():
+        offset = -(-offset // ALIGNMENT) * ALIGNMENT
+        columns = array.shape[1] if array.ndim == 2 else 0
+
+        entries.append((name, array, array.shape[0], columns, offset))
+        offset += array.nbytes
+
+    temporary = f'{path}.tmp'
+
+    with open(temporary, 'wb') as file:
+        file.write(_HEADER.pack(MAGIC, VERSION, len(entries)))
+
+        for name, array, rows, columns, offset in entries:
+            file.write(_ENTRY.pack(name.encode(), array.dtype.str.encode(), rows, columns, offset))
+
+        for name, array, rows, columns, offset in entries:
+            file.write(b'\0' * (offset - file.tell()))
+            file.write(np.ascontiguousarray(array).tobytes())
+
+    #* readers never see a half written file
+    os.replace(temporary, path)
+
+
+#* Read-only view of a snapshot file. The file is memory mapped and every array is a view into the
+#* mapping (nothing is copied or unpickled), so any number of worker processes share the same pages
+#* of the OS page cache. Lookups are binary searches and bit tests on those arrays.
+class TermSnapshot:
+    def __init__(self, path: str):
+        self.path = path
+        self._buffer = np.memmap(path, dtype=np.uint8, mode='r')
+
+        magic, version, count = _HEADER.unpack_from(self._buffer, 0)
+
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f'"{path}" is not a version {VERSION} term snapshot')
+
+        self._arrays = {}
+
+        for position in range(count):
+            name, dtype, rows, columns, offset = _ENTRY.unpack_from(self._buffer, _HEADER.size + position * _ENTRY.size)
+            dtype = np.dtype(dtype.rstrip(b'\0').decode())
+            shape = (rows, columns) if columns else (rows,)
+
+            self._arrays[name.rstrip(b'\0').decode()] = np.frombuffer(self._buffer, dtype, int(np.prod(shape)), offset).reshape(shape)
+
+        for name, array in self._arrays.items():
+            setattr(self, name, array)
+
+    def __repr__(self) -> str:
+        return (f'TermSnapshot (path={self.path!r}, blocks={len(self.block_ids)!r}, teachers={len(self.teacher_ids)!r}, '
+                f'students={len(self.student_ids)!r}, sections={len(self.section_ids)!r})')
+
+    def string(self, position: int) -> str:
+        return bytes(self.string_data[self.string_offsets[position]:self.string_offsets[position + 1]]).decode()
+
+    def _row(self, ids: np.ndarray, id: int, kind: str) -> int:
+        row = int(np.searchsorted(ids, id))
+
+        if row == len(ids) or ids[row] != id:
+            raise ObjectNotFoundException(f'{kind} with id {id} not in the snapshot')
+
+        return row
+
+    def is_teacher_free(self, teacher_id: int, schedule_id: int) -> bool:
+        #* free unless the teacher has a class in the block or in one overlapping it
+        teacher = self._row(self.teacher_ids, teacher_id, 'Teacher')
+        block = self._row(self.block_ids, schedule_id, 'Schedule')
+
+        return not (self.teacher_busy[teacher] & self.block_conflicts[block]).any()
+
+    def is_student_free(self, student_id: int, schedule_id: int) -> bool:
+        student = self._row(self.student_ids, student_id, 'Student')
+        block = self._row(self.block_ids, schedule_id, 'Schedule')
+
+        return not (self.student_busy[student] & self.block_conflicts[block]).any()
+
+    def teacher_schedule_ids(self, teacher_id: int) -> list[int]:
+        busy = np.unpackbits(self.teacher_busy[self._row(self.teacher_ids, teacher_id, 'Teacher')])[:len(self.block_ids)]
+
+        return self.block_ids[busy.astype(bool)].tolist()
+
+    def _entry(self, section: int) -> SnapshotEntry:
+        block = int(self.section_block[section])
+        teacher = int(self.section_teacher[section])
+
+        return SnapshotEntry(int(self.section_ids[section]), self.string(self.section_subject[section]),
+                             self.string(self.section_code[section]), _DAYS[self.block_day[block]].value,
+                             _time(self.block_start[block]), _time(self.block_end[block]),
+                             self.string(self.teacher_name[teacher]) if teacher >= 0 else None)
+
+    def student_timetable(self, student_id: int, day: str | None = None) -> list[SnapshotEntry]:
+        #* what the student has (on day, if given), ordered by day and start time
+        student = self._row(self.student_ids, student_id, 'Student')
+        sections = self.student_sections[self.student_offsets[student]:self.student_offsets[student + 1]]
+
+        if day is not None:
+            sections = sections[self.block_day[self.section_block[sections]] == _DAYS.index(DayOfWeek(day))]
+
+        blocks = self.section_block[sections]
+        order = np.lexsort((self.block_start[blocks], self.block_day[blocks]))
+
+        return [self._entry(int(section)) for section in sections[order]]
@@ -0,0 +1,228 @@
+import csv
+import os
+import re
+from collections import namedtuple
+from datetime import date, datetime, time, timedelta, timezone
+from html import escape
+from typing import Iterable, TextIO
+
+from utils.day_of_week import DayOfWeek
+
+
+FORMATS = ('csv', 'ics', 'html')
+
+#* the fields of TimetableController rows the writers use; snapshot entries have the same shape
+TimetableEntry = namedtuple('TimetableEntry', ['subject_schedule_id', 'subject', 'course', 'career_id', 'section',
+                                               'day', 'start_time', 'end_time', 'teacher'])
+
+CSV_HEADER = ['day', 'start_time', 'end_time', 'subject', 'course', 'section', 'teacher']
+
+_DAYS = list(DayOfWeek)
+_ICAL_DAYS = ['MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU'] #* same order as DayOfWeek
+_UNSAFE_FILENAME = re.compile(r'[^\w.-]+')
+
+
+def day_position(day: str) -> int:
+    return _DAYS.index(DayOfWeek(day))
+
+
+def sort_entries(entries: Iterable[any]) -> list[any]:
+    return sorted(entries, key=lambda entry: (day_position(entry.day), entry.start_time, entry.subject))
+
+
+def filename(value: any) -> str:
+    return _UNSAFE_FILENAME.sub('_', str(value)).strip('_') or 'unnamed'
+
+
+def write_csv(entries: Iterable[any], stream: TextIO) -> None:
+    writer = csv.writer(stream)
+    writer.writerow(CSV_HEADER)
+
+    for entry in entries:
+        writer.writerow([entry.day, entry.start_time.strftime('%H:%M'), entry.end_time.strftime('%H:%M'),
+                         entry.subject, entry.course, entry.section, entry.teacher])
+
+
+def _ical_text(value: any) -> str:
+    return str(value).replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,').replace('\n', '\\n')
+
+
+#* RFC 5545 lines are at most 75 octets; longer ones continue on lines starting with a space
+def _ical_line(line: str) -> str:
+    encoded = line.encode()
+
+    if len(encoded) <= 75:
+        return line + '\r\n'
+
+    parts = []
+    start = 0
+
+    while start < len(encoded):
+        end = min(start + (75 if not parts else 74), len(encoded))
+
+        #* never cut a UTF-8 sequence in half
+        while end < len(encoded) and encoded[end] & 0xC0 == 0x80:
+            end -= 1
+
+        parts.append(encoded[start:end].decode())
+        start = end
+
+    return '\r\n '.join(parts) + '\r\n'
+
+
+def first_occurrence(term_start: date, day: str) -> date:
+    return term_start + timedelta(days=(day_position(day) - term_start.weekday()) % 7)
+
+
+#* One VEVENT per section, repeated weekly on its DayOfWeek from the first occurrence on or after
+#* term_start until term_end. Times are floating (local to whoever reads the calendar).
+def write_ics(entries: Iterable[any], stream: TextIO, term_start: date, term_end: date, calendar_name: str,
+              owner: str = 'timetable'
+              ) -> None:
+    stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+    until = datetime.combine(term_end, time(23, 59, 59)).strftime('%Y%m%dT%H%M%S')
+
+    stream.write(_ical_line('BEGIN:VCALENDAR'))
+    stream.write(_ical_line('VERSION:2.0'))
+    stream.write(_ical_line('PRODID:-//intensive-iut-schedule//timetable export//ES'))
+    stream.write(_ical_line('CALSCALE:GREGORIAN'))
+    stream.write(_ical_line(f'X-WR-CALNAME:{_ical_text(calendar_name)}'))
+
+    for entry in entries:
+        day = first_occurrence(term_start, entry.day)
+
+        if day > term_end:
+            continue
+
+        stream.write(_ical_line('BEGIN:VEVENT'))
+        stream.write(_ical_line(f'UID:{filename(owner)}-{entry.subject_schedule_id}@intensive-iut-schedule'))
+        stream.write(_ical_line(f'DTSTAMP:{stamp}'))
+        stream.write(_ical_line(f'DTSTART:{datetime.combine(day, entry.start_time).strftime("%Y%m%dT%H%M%S")}'))
+        stream.write(_ical_line(f'DTEND:{datetime.combine(day, entry.end_time).strftime("%Y%m%dT%H%M%S")}'))
+        stream.write(_ical_line(f'RRULE:FREQ=WEEKLY;BYDAY={_ICAL_DAYS[day_position(entry.day)]};UNTIL={until}'))
+        stream.write(_ical_line(f'SUMMARY:{_ical_text(f"{entry.subject} ({entry.section})")}'))
+        stream.write(_ical_line(f'DESCRIPTION:{_ical_text(f"Docente: {entry.teacher}")}'))
+        stream.write(_ical_line('END:VEVENT'))
+
+    stream.write(_ical_line('END:VCALENDAR'))
+
+
+_HTML_HEAD = '''<!DOCTYPE html>
+<html lang="es">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+body {{ font-family: sans-serif; margin: 1.5em; }}
+table {{ border-collapse: collapse; width: 100%; table-layout: fixed; }}
+th, td {{ border: 1px solid #444; padding: 4px; vertical-align: top; font-size: 11px; }}
+th {{ background: #eee; }}
+td.time {{ width: 6em; white-space: nowrap; }}
+.teacher {{ color: #555; }}
+@page {{ size: A4 landscape; margin: 1cm; }}
+@media print {{ body {{ margin: 0; }} }}
+</style>
+</head>
+<body>
+<h1>{title}</h1>
+'''
+
+
+#* weekly grid: one row per distinct (start, end) slot, one column per day that has classes
+def write_html(entries: Iterable[any], stream: TextIO, title: str) -> None:
+    entries = list(entries)
+
+    days = sorted({entry.day for entry in entries}, key=day_position)
+    slots = sorted({(entry.start_time, entry.end_time) for entry in entries})
+
+    cells = {}
+
+    for entry in entries:
+        cells.setdefault((entry.start_time, entry.end_time, entry.day), []).append(entry)
+
+    stream.write(_HTML_HEAD.format(title=escape(title)))
+    stream.write('<table>\n<tr><th>Hora</th>')
+    stream.write(''.join(f'<th>{escape(day)}</th>' for day in days))
+    stream.write('</tr>\n')
+
+    for start_time, end_time in slots:
+        stream.write(f'<tr><td class="time">{start_time.strftime("%H:%M")}-{end_time.strftime("%H:%M")}</td>')
+
+        for day in days:
+            stream.write('<td>')
+
+            for entry in cells.get((start_time, end_time, day), ()):
+                stream.write(f'<div>{escape(entry.subject)} ({escape(entry.section)})'
+                             f'<div class="teacher">{escape(entry.teacher)}</div></div>')
+
+            stream.write('</td>')
+
+        stream.write('</tr>\n')
+
+    stream.write('</table>\n</body>\n</html>\n')
+
+
+def write(format: str, entries: Iterable[any], stream: TextIO, title: str, term_start: date, term_end: date,
+          owner: str = 'timetable'
+          ) -> None:
+    entries = sort_entries(entries)
+
+    if format == 'csv':
+        write_csv(entries, stream)
+
+    elif format == 'ics':
+        write_ics(entries, stream, term_start, term_end, title, owner)
+
+    elif format == 'html':
+        write_html(entries, stream, title)
+
+    else:
+        raise ValueError(f'Unknown export format "{format}", expected one of {", ".join(FORMATS)}')
+
+
+#* Everything needed to render every timetable, fetched once and shipped to each worker process:
+#*   sections: subject_schedule_id -> TimetableEntry
+#*   owners:   kind ('students', 'teachers', 'sections') -> [(file name, title, [subject_schedule_id, ...])]
+class TimetableSnapshot:
+    def __init__(self, sections: dict[int, TimetableEntry], owners: dict[str, list[tuple[str, str, list[int]]]]):
+        self.sections = sections
+        self.owners = owners
+
+    def entries(self, subject_schedule_ids: list[int]) -> list[TimetableEntry]:
+        return [self.sections[subject_schedule_id] for subject_schedule_id in subject_schedule_ids]
+
+    def __repr__(self) -> str:
+        counts = ', '.join(f'{kind}={len(owners)!r}' for kind, owners in self.owners.items())
+
+        return f'TimetableSnapshot (sections={len(self.sections)!r}, {counts})'
+
+
+_worker_snapshot: TimetableSnapshot | None = None
+
+
+#* ProcessPoolExecutor initializer: the snapshot is unpickled once per worker, not once per task
+def init_worker(snapshot: TimetableSnapshot) -> None:
+    global _worker_snapshot
+
+    _worker_snapshot = snapshot
+
+
+#* renders owners[kind][start:end] in every format; returns how many files were written
+def export_chunk(kind: str, start: int, end: int, directory: str, formats: tuple[str, ...], term_start: date,
+                 term_end: date, snapshot: TimetableSnapshot | None = None
+                 ) -> int:
+    snapshot = snapshot or _worker_snapshot
+    written = 0
+
+    for name, title, subject_schedule_ids in snapshot.owners[kind][start:end]:
+        entries = snapshot.entries(subject_schedule_ids)
+
+        for format in formats:
+            path = os.path.join(directory, kind, f'{name}.{format}')
+
+            with open(path, 'w', encoding='utf-8', newline='') as stream:
+                write(format, entries, stream, title, term_start, term_end, f'{kind}-{name}')
+
+            written += 1
+
+    return written
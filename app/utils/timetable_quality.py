@@ -0,0 +1,338 @@
+from collections import Counter
+from datetime import time
+from typing import Iterable
+
+from utils.day_of_week import DayOfWeek
+from utils.exceptions import ObjectNotFoundException
+from utils.interval_tree import ScheduleIndex
+
+
+_DAYS = list(DayOfWeek)
+
+IMPROVEMENT = 1e-9 #* smallest score drop a move has to bring to be taken
+
+
+def _minutes(value: time) -> int:
+    return value.hour * 60 + value.minute
+
+
+#* Weights of the soft constraints, all penalties (lower is better):
+#*   idle_hour:      per student and hour between two classes of the same day
+#*   teacher_day:    per teacher and day with classes beyond the first one
+#*   subject_repeat: per student and extra class of a subject on a day that already has one
+#*   late_block:     per person (students and teacher) in a class ending after late_after
+class QualityWeights:
+    def __init__(self, idle_hour: float = 1.0, teacher_day: float = 2.0, subject_repeat: float = 4.0,
+                 late_block: float = 0.5, late_after: time = time(17, 0)
+                 ):
+        self.idle_hour = idle_hour
+        self.teacher_day = teacher_day
+        self.subject_repeat = subject_repeat
+        self.late_block = late_block
+        self.late_after = late_after
+
+    def __repr__(self) -> str:
+        return f'''QualityWeights (idle_hour={self.idle_hour!r}, teacher_day={self.teacher_day!r},
+                    subject_repeat={self.subject_repeat!r}, late_block={self.late_block!r}, late_after={self.late_after!r})'''
+
+
+#* Soft-constraint score of a timetable, with delta evaluation of single moves.
+#* Students with exactly the same sections are scored as one profile weighted by their number (a cohort
+#* is one profile whatever its size), so moving a section touches only the profiles that contain it and
+#* the two days involved: delta() is O(profiles of the section x classes per day), not O(students).
+#* Extra groups (sections that must never overlap, e.g. those of one career/course/section) join the
+#* hard checks of is_free() as weightless profiles; blocks outside a teacher's availability are never
+#* free for their sections.
+class TimetableQuality:
+    def __init__(self, blocks: dict[int, tuple[str, time, time]], sections: Iterable[tuple[int, int, int, int]],
+                 enrollments: Iterable[tuple[int, int]], groups: Iterable[Iterable[int]] = (),
+                 weights: QualityWeights | None = None, unavailable: dict[int, Iterable[int]] | None = None
+                 ):
+        #* blocks: schedule_id -> (day, start_time, end_time); sections: (subject_schedule_id, schedule_id,
+        #* teacher_id, subject_id); enrollments: (student_id, subject_schedule_id); unavailable: teacher_id ->
+        #* schedule ids the teacher can't take
+        self.weights = weights or QualityWeights()
+
+        self._schedule_ids = sorted(blocks)
+        self._block_positions = {schedule_id: position for position, schedule_id in enumerate(self._schedule_ids)}
+
+        self._day = [_DAYS.index(DayOfWeek(blocks[schedule_id][0])) for schedule_id in self._schedule_ids]
+        self._start = [_minutes(blocks[schedule_id][1]) for schedule_id in self._schedule_ids]
+        self._end = [_minutes(blocks[schedule_id][2]) for schedule_id in self._schedule_ids]
+        self._late = [int(end > _minutes(self.weights.late_after)) for end in self._end]
+
+        schedule_index = ScheduleIndex()
+
+        for schedule_id, (day, start_time, end_time) in blocks.items():
+            schedule_index.add(day, start_time, end_time, schedule_id)
+
+        self._conflicts = [sum(1 << self._block_positions[other_id] for other_id in schedule_index.overlapping(*blocks[schedule_id]))
+                           for schedule_id in self._schedule_ids]
+
+        self._unavailable = {teacher_id: sum(1 << self._block_positions[schedule_id] for schedule_id in set(schedule_ids)
+                                             if schedule_id in self._block_positions)
+                             for teacher_id, schedule_ids in (unavailable or {}).items()}
+
+        sections = list(sections)
+
+        self._section_ids = [row[0] for row in sections]
+        self._section_positions = {subject_schedule_id: position for position, subject_schedule_id in enumerate(self._section_ids)}
+        self._block = [self._block_positions[row[1]] for row in sections]
+        self._teacher = [row[2] for row in sections]
+        self._subject = [row[3] for row in sections]
+
+        enrolled = {}
+
+        for student_id, subject_schedule_id in enrollments:
+            if subject_schedule_id in self._section_positions:
+                enrolled.setdefault(student_id, []).append(self._section_positions[subject_schedule_id])
+
+        profiles = Counter(tuple(sorted(members)) for members in enrolled.values())
+        profiles.update({tuple(sorted(self._section_positions[id] for id in group if id in self._section_positions)): 0
+                         for group in groups})
+
+        self._profiles = list(profiles)
+        self._weight = [profiles[members] for members in self._profiles]
+        self._section_profiles = [[] for _ in sections]
+        self._size = [0] * len(sections)
+
+        for profile, members in enumerate(self._profiles):
+            for section in members:
+                self._section_profiles[section].append(profile)
+                self._size[section] += self._weight[profile]
+
+        #* state the deltas read: sections per (profile, day), cached idle minutes, subject counts per (profile,
+        #* day), busy blocks per profile and teacher (with counts, to know when a bit clears), days per teacher
+        self._profile_days = [[[] for _ in _DAYS] for _ in self._profiles]
+        self._profile_idle = [[0] * len(_DAYS) for _ in self._profiles]
+        self._subject_counts: dict[tuple[int, int, int], int] = {}
+        self._busy_counts: dict[tuple[any, int], int] = {}
+        self._busy: dict[any, int] = {}
+        self._teacher_days: dict[tuple[int, int], int] = {}
+
+        for section in range(len(sections)):
+            self._attach(section, self._block[section])
+
+        for profile in range(len(self._profiles)):
+            for day in range(len(_DAYS)):
+                self._profile_idle[profile][day] = self._idle(self._profile_days[profile][day])
+
+    def __repr__(self) -> str:
+        return f'TimetableQuality (sections={len(self._section_ids)!r}, profiles={len(self._profiles)!r}, score={self.score()!r})'
+
+    def _idle(self, sections: list[int], skipped: int = -1, added: int = -1) -> int:
+        #* minutes between the first and the last class of a day that aren't spent in class
+        first = last = None
+        taught = 0
+
+        for section in sections:
+            if section == skipped:
+                continue
+
+            block = self._block[section]
+            first = self._start[block] if first is None or self._start[block] < first else first
+            last = self._end[block] if last is None or self._end[block] > last else last
+            taught += self._end[block] - self._start[block]
+
+        if added >= 0:
+            first = self._start[added] if first is None or self._start[added] < first else first
+            last = self._end[added] if last is None or self._end[added] > last else last
+            taught += self._end[added] - self._start[added]
+
+        return max(0, last - first - taught) if first is not None else 0
+
+    def _occupy(self, owner: any, block: int, step: int) -> None:
+        key = (owner, block)
+        count = self._busy_counts.get(key, 0) + step
+        self._busy_counts[key] = count
+
+        if count == 0:
+            self._busy[owner] &= ~(1 << block)
+
+        elif count == step:
+            self._busy[owner] = self._busy.get(owner, 0) | 1 << block
+
+    def _attach(self, section: int, block: int) -> None:
+        self._block[section] = block
+        day = self._day[block]
+
+        self._occupy(('teacher', self._teacher[section]), block, 1)
+        self._teacher_days[(self._teacher[section], day)] = self._teacher_days.get((self._teacher[section], day), 0) + 1
+
+        for profile in self._section_profiles[section]:
+            self._occupy(profile, block, 1)
+            self._profile_days[profile][day].append(section)
+
+            key = (profile, day, self._subject[section])
+            self._subject_counts[key] = self._subject_counts.get(key, 0) + 1
+
+    def _detach(self, section: int) -> None:
+        block = self._block[section]
+        day = self._day[block]
+
+        self._occupy(('teacher', self._teacher[section]), block, -1)
+        self._teacher_days[(self._teacher[section], day)] -= 1
+
+        for profile in self._section_profiles[section]:
+            self._occupy(profile, block, -1)
+            self._profile_days[profile][day].remove(section)
+            self._subject_counts[(profile, day, self._subject[section])] -= 1
+
+    def _section(self, subject_schedule_id: int) -> int:
+        if subject_schedule_id not in self._section_positions:
+            raise ObjectNotFoundException(f'Subject_schedule with id {subject_schedule_id} not in the timetable')
+
+        return self._section_positions[subject_schedule_id]
+
+    def _block_position(self, schedule_id: int) -> int:
+        if schedule_id not in self._block_positions:
+            raise ObjectNotFoundException(f'Schedule with id {schedule_id} not in the timetable')
+
+        return self._block_positions[schedule_id]
+
+    def breakdown(self) -> dict[str, float]:
+        weights = self.weights
+
+        idle = sum(self._weight[profile] * sum(self._profile_idle[profile]) for profile in range(len(self._profiles)))
+        repeats = sum(self._weight[profile] * (count - 1) for (profile, _, _), count in self._subject_counts.items() if count > 1)
+
+        days = Counter(teacher_id for (teacher_id, _), count in self._teacher_days.items() if count)
+        late = sum(self._size[section] + 1 for section in range(len(self._section_ids)) if self._late[self._block[section]])
+
+        result = {
+            'idle_gaps': weights.idle_hour * idle / 60,
+            'teacher_days': weights.teacher_day * sum(count - 1 for count in days.values()),
+            'subject_repeats': weights.subject_repeat * repeats,
+            'late_blocks': weights.late_block * late
+        }
+
+        result['total'] = sum(result.values())
+
+        return result
+
+    def score(self) -> float:
+        return self.breakdown()['total']
+
+    def schedule_id(self, subject_schedule_id: int) -> int:
+        return self._schedule_ids[self._block[self._section(subject_schedule_id)]]
+
+    def is_free(self, subject_schedule_id: int, schedule_id: int) -> bool:
+        #* hard constraints of the move: the teacher and everyone in the section free in (and around) the block
+        return self._is_free(self._section(subject_schedule_id), self._block_position(schedule_id))
+
+    def _is_free(self, section: int, block: int) -> bool:
+        if self._unavailable.get(self._teacher[section], 0) >> block & 1:
+            return False
+
+        conflicts = self._conflicts[block]
+        current = self._block[section]
+        for owner in [('teacher', self._teacher[section]), *self._section_profiles[section]]:
+            busy = self._busy.get(owner, 0)
+
+            if self._busy_counts.get((owner, current)) == 1:
+                busy &= ~(1 << current)
+
+            if busy & conflicts:
+                return False
+
+        return True
+
+    def delta(self, subject_schedule_id: int, schedule_id: int) -> float:
+        #* change of score() if the section moved to the block, without moving it
+        return self._delta(self._section(subject_schedule_id), self._block_position(schedule_id))
+
+    def _delta(self, section: int, block: int) -> float:
+        current = self._block[section]
+
+        if block == current:
+            return 0.0
+
+        weights = self.weights
+        day, new_day = self._day[current], self._day[block]
+
+        result = weights.late_block * (self._size[section] + 1) * (self._late[block] - self._late[current])
+
+        if day != new_day:
+            teacher_id = self._teacher[section]
+            result += weights.teacher_day * ((self._teacher_days.get((teacher_id, new_day), 0) == 0)
+                                             - (self._teacher_days[(teacher_id, day)] == 1))
+
+        idle = 0
+        repeats = 0
+        subject_id = self._subject[section]
+
+        for profile in self._section_profiles[section]:
+            weight = self._weight[profile]
+
+            if not weight:
+                continue
+
+            days = self._profile_days[profile]
+
+            if day == new_day:
+                idle += weight * (self._idle(days[day], section, block) - self._profile_idle[profile][day])
+
+                continue
+
+            idle += weight * (self._idle(days[day], section) + self._idle(days[new_day], added=block)
+                              - self._profile_idle[profile][day] - self._profile_idle[profile][new_day])
+
+            repeats += weight * ((self._subject_counts.get((profile, new_day, subject_id), 0) >= 1)
+                                 - (self._subject_counts[(profile, day, subject_id)] >= 2))
+
+        return result + weights.idle_hour * idle / 60 + weights.subject_repeat * repeats
+
+    def move(self, subject_schedule_id: int, schedule_id: int) -> float:
+        #* applies the move (hard constraints are the caller's business, see is_free) and returns its delta
+        section, block = self._section(subject_schedule_id), self._block_position(schedule_id)
+        result = self._delta(section, block)
+
+        self._move(section, block)
+
+        return result
+
+    def _move(self, section: int, block: int) -> None:
+        days = {self._day[self._block[section]], self._day[block]}
+
+        self._detach(section)
+        self._attach(section, block)
+
+        for profile in self._section_profiles[section]:
+            for day in days:
+                self._profile_idle[profile][day] = self._idle(self._profile_days[profile][day])
+
+    def improve(self, max_passes: int = 10, schedule_ids: Iterable[int] | None = None) -> list[tuple[int, int, int]]:
+        #* Hill climbing: every pass moves each section to the free block that lowers the score the most,
+        #* until a pass finds nothing. schedule_ids limits the blocks sections may move to (all by default).
+        #* Returns the moves in the order they were made, (subject_schedule_id, from, to) schedule ids.
+        blocks = [self._block_position(schedule_id) for schedule_id in schedule_ids] if schedule_ids is not None \
+            else list(range(len(self._schedule_ids)))
+
+        moves = []
+
+        for _ in range(max_passes):
+            moved = False
+
+            for section in range(len(self._section_ids)):
+                best, best_block = -IMPROVEMENT, None
+
+                for block in blocks:
+                    if block == self._block[section]:
+                        continue
+
+                    change = self._delta(section, block)
+
+                    if change < best and self._is_free(section, block):
+                        best, best_block = change, block
+
+                if best_block is not None:
+                    moves.append((self._section_ids[section], self._schedule_ids[self._block[section]],
+                                  self._schedule_ids[best_block]))
+
+                    self._move(section, best_block)
+                    moved = True
+
+            if not moved:
+                break
+
+        return moves
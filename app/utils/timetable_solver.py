@@ -0,0 +1,263 @@
+from utils.exceptions import UnsolvableScheduleException
+from utils.occupancy_index import OccupancyIndex
+
+
+#* Assigns a schedule block and a teacher to every (subject, section).
+#* Blocks are bit positions of the occupancy index, so "is this teacher / group free" is a single AND
+#* against the blocks already taken or overlapping a taken one.
+#* Teacher availability lives in the same masks (OccupancyIndex.set_teacher_slots): blocks a teacher
+#* can't take are never tried, teachers with no block left aren't candidates at all, and among the
+#* free blocks a teacher's preferred ones go first.
+#* Sections are placed most constrained first and, when nothing is free, one placed section is moved
+#* out of the way. Placements are written to the index, so it stays current for later checks.
+class TimetableSolver:
+    def __init__(self, occupancy_index: OccupancyIndex, teacher_ids: list[int],
+                 qualified: dict[int, list[int]] | None = None
+                 ):
+        self._index = occupancy_index
+        self._teacher_ids = [teacher_id for teacher_id in teacher_ids if occupancy_index.has_teacher(teacher_id)]
+        self._qualified = qualified or {}
+
+        self._teacher_load = {teacher_id: occupancy_index.teacher_mask(teacher_id).bit_count()
+                              for teacher_id in self._teacher_ids}
+        self._available_ids = [teacher_id for teacher_id in self._teacher_ids
+                               if occupancy_index.all_blocks & ~occupancy_index.teacher_unavailable(teacher_id)]
+        self._available = set(self._available_ids)
+        self._group_masks = {}
+        self._group_blocked = {}
+
+        self._placed = {}
+        self._origin = {} #* item -> (position, teacher_id) it had before a repair, None for new sections
+        self._withdrawn = 0
+
+    def occupy(self, group: any, schedule_id: int) -> None:
+        #* marks the block of a pre-existing assignment (already stored in the DB) as busy for its group
+        if self._index.has_schedule(schedule_id):
+            self._group_masks[group] = self._group_masks.get(group, 0) | self._index.bit(schedule_id)
+            self._group_blocked[group] = self._group_blocked.get(group, 0) | self._index.conflict_mask(schedule_id)
+
+    def withdraw(self, schedule_id: int) -> None:
+        #* the block can't take any section from now on
+        if self._index.has_schedule(schedule_id):
+            self._withdrawn |= self._index.bit(schedule_id)
+
+    def adopt(self, item: tuple[int, str, any], schedule_id: int, teacher_id: int) -> None:
+        #* a pre-existing assignment (already in the index) that may be moved out of the way while repairing
+        position = self._index.position(schedule_id)
+
+        self._group_masks[item[2]] = self._group_masks.get(item[2], 0) | (1 << position)
+        self._group_blocked[item[2]] = self._group_blocked.get(item[2], 0) | self._index.expand(1 << position)
+
+        self._placed[item] = (position, teacher_id)
+        self._origin[item] = (position, teacher_id)
+
+    #* Re-places the displaced sections (already removed from the index) touching as little as possible:
+    #*   1. same block, another teacher: the students' timetables don't change at all
+    #*   2. another block, the one clashing with the fewest enrolled students (busy: item -> the blocked
+    #*      mask of every student enrolled in it), then the least loaded teacher
+    #*   3. move one adopted section of the same group or teacher out of the way
+    #* displaced: (item, schedule_id, teacher_id) it has in the index, or (item, None, None) for a new section.
+    #* Returns the rows whose block or teacher changed; if any section can't be placed the index is left as it was.
+    def repair(self, displaced: list[tuple[tuple[int, str, any], int | None, int | None]],
+               busy: dict[tuple[int, str, any], list[int]] | None = None
+               ) -> list[dict[str, any]]:
+        busy = busy or {}
+
+        for item, schedule_id, teacher_id in displaced:
+            if schedule_id is None:
+                self._origin[item] = None
+
+                continue
+
+            self._origin[item] = (self._index.position(schedule_id), teacher_id)
+            self._index.remove(self._row(item, *self._origin[item]))
+
+            if teacher_id in self._teacher_load:
+                self._teacher_load[teacher_id] -= 1
+
+        pending = sorted((item for item, _, _ in displaced), key=lambda item: len(self._candidates(item[0])))
+
+        unplaced = [item for item in pending
+                    if not (self._keep_block(item) or self._move(item, busy.get(item, ())) or self._place_with_ejection(item))]
+
+        if unplaced:
+            self.restore()
+
+            names = ', '.join(f'subject {subject_id} section {section}' for subject_id, section, _ in unplaced)
+
+            raise UnsolvableScheduleException(f'Could not find a free block and teacher for: {names}')
+
+        return [self._row(item, position, teacher_id) for item, (position, teacher_id) in self._placed.items()
+                if self._origin[item] != (position, teacher_id)]
+
+    def _keep_block(self, item: tuple[int, str, any]) -> bool:
+        if self._origin[item] is None:
+            return False
+
+        bit = 1 << self._origin[item][0]
+
+        if bit & self._withdrawn:
+            return False
+
+        teachers = [teacher_id for teacher_id in self._candidates(item[0]) if self._free_blocks(item[2], teacher_id) & bit]
+
+        if not teachers:
+            return False
+
+        self._assign(item, self._origin[item][0], min(teachers, key=self._teacher_load.get))
+
+        return True
+
+    def _move(self, item: tuple[int, str, any], busy: list[int]) -> bool:
+        free = {teacher_id: self._free_blocks(item[2], teacher_id) for teacher_id in self._candidates(item[0])}
+        clashes = {}
+        union = 0
+
+        for mask in free.values():
+            union |= mask
+
+        #* once per block, not once per (teacher, block)
+        while union:
+            bit = union & -union
+            union ^= bit
+
+            clashes[bit] = sum(1 for mask in busy if mask & bit)
+
+        best = None
+
+        for teacher_id, mask in free.items():
+            preferred = self._index.teacher_preferred(teacher_id)
+
+            while mask:
+                bit = mask & -mask
+                mask ^= bit
+
+                key = (clashes[bit], not bit & preferred, self._teacher_load[teacher_id], bit.bit_length() - 1)
+
+                if best is None or key < best[0]:
+                    best = (key, teacher_id)
+
+        if best is None:
+            return False
+
+        self._assign(item, best[0][3], best[1])
+
+        return True
+
+    def restore(self) -> None:
+        #* puts the index back as it was before repair(), also after a successful one whose rows couldn't be written
+        for item in list(self._placed):
+            self._unassign(item)
+
+        for item, origin in self._origin.items():
+            if origin is not None:
+                self._index.add(self._row(item, *origin))
+
+    def solve(self, sections: list[tuple[int, str, any]]) -> list[dict[str, any]]:
+        #* sections: (subject_id, section, group) where group identifies a career+course+section cohort
+        group_sizes = {}
+
+        for _, _, group in sections:
+            group_sizes[group] = group_sizes.get(group, 0) + 1
+
+        pending = sorted(sections, key=lambda item: (len(self._candidates(item[0])), -group_sizes[item[2]]))
+
+        unplaced = []
+
+        for item in pending:
+            if not self._place(item) and not self._place_with_ejection(item):
+                unplaced.append(item)
+
+        if unplaced:
+            for item in list(self._placed):
+                self._unassign(item)
+
+            names = ', '.join(f'subject {subject_id} section {section}' for subject_id, section, _ in unplaced)
+
+            raise UnsolvableScheduleException(f'Could not find a free block and teacher for: {names}')
+
+        return [self._row(item, position, teacher_id) for item, (position, teacher_id) in self._placed.items()]
+
+    def _row(self, item: tuple[int, str, any], position: int, teacher_id: int) -> dict[str, any]:
+        subject_id, section, _ = item
+
+        return {
+            'subject_id': subject_id,
+            'section': section,
+            'schedule_id': self._index.schedule_ids[position],
+            'teacher_id': teacher_id
+        }
+
+    def _candidates(self, subject_id: int) -> list[int]:
+        teachers = self._qualified.get(subject_id)
+
+        if teachers is None:
+            return self._available_ids
+
+        return [teacher_id for teacher_id in teachers if teacher_id in self._available]
+
+    def _free_blocks(self, group: any, teacher_id: int) -> int:
+        return self._index.all_blocks & ~(self._group_blocked.get(group, 0) | self._index.teacher_blocked(teacher_id)
+                                          | self._withdrawn)
+
+    def _place(self, item: tuple[int, str, any], excluded: int = 0) -> bool:
+        subject_id, _, group = item
+
+        best = None
+
+        for teacher_id in self._candidates(subject_id):
+            free = self._free_blocks(group, teacher_id) & ~excluded
+
+            if not free:
+                continue
+
+            #* the earliest preferred block, or the earliest free one if none is preferred
+            free = free & self._index.teacher_preferred(teacher_id) or free
+
+            if best is None or self._teacher_load[teacher_id] < self._teacher_load[best[1]]:
+                best = ((free & -free).bit_length() - 1, teacher_id)
+
+        if best is None:
+            return False
+
+        self._assign(item, *best)
+
+        return True
+
+    def _place_with_ejection(self, item: tuple[int, str, any]) -> bool:
+        subject_id, _, group = item
+
+        for teacher_id in self._candidates(subject_id):
+            #* only sections sharing the group or the teacher can be blocking this one
+            blocking = [(other, placement) for other, placement in self._placed.items()
+                        if other[2] == group or placement[1] == teacher_id]
+
+            for other, (position, other_teacher) in blocking:
+                bit = 1 << position
+
+                self._unassign(other)
+
+                if self._free_blocks(group, teacher_id) & bit and self._place(other, excluded=self._index.expand(bit)):
+                    self._assign(item, position, teacher_id)
+
+                    return True
+
+                self._assign(other, position, other_teacher)
+
+        return False
+
+    def _assign(self, item: tuple[int, str, any], position: int, teacher_id: int) -> None:
+        self._index.add(self._row(item, position, teacher_id))
+        self._teacher_load[teacher_id] += 1
+        self._group_masks[item[2]] = self._group_masks.get(item[2], 0) | (1 << position)
+        self._group_blocked[item[2]] = self._group_blocked.get(item[2], 0) | self._index.expand(1 << position)
+
+        self._placed[item] = (position, teacher_id)
+
+    def _unassign(self, item: tuple[int, str, any]) -> None:
+        position, teacher_id = self._placed.pop(item)
+
+        self._index.remove(self._row(item, position, teacher_id))
+        self._teacher_load[teacher_id] -= 1
+        self._group_masks[item[2]] &= ~(1 << position)
+        self._group_blocked[item[2]] = self._index.expand(self._group_masks[item[2]])
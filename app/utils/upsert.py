@@ -0,0 +1,60 @@
+from importlib import import_module
+
+from sqlalchemy import CursorResult
+from sqlalchemy.orm import Session
+
+
+#* INSERT of the dialect's own package (sqlalchemy.dialects.X). The packages are imported on first use,
+#* once the engine already loaded the one it needs: importing all three up front costs ~70 ms
+def _insert(dialect: str) -> callable:
+    return import_module(f'sqlalchemy.dialects.{'mysql' if dialect == 'mariadb' else dialect}').insert
+
+
+#* INSERT that leaves the stored row alone when it hits a UNIQUE key instead of raising, so
+#* create() relies on the constraint and needs no exists() round trip beforehand.
+#* Foreign key and NOT NULL violations still raise IntegrityError.
+def insert_ignore_statement(dialect: str, model: any, values: dict[str, any]):
+    if dialect in ('sqlite', 'postgresql'):
+        return _insert(dialect)(model).values(values).on_conflict_do_nothing().returning(model.id)
+
+    if dialect in ('mysql', 'mariadb'):
+        #* no-op update: the duplicate generates no AUTO_INCREMENT id, so lastrowid is 0
+        return _insert(dialect)(model).values(values).on_duplicate_key_update(id=model.id)
+
+    raise NotImplementedError(f'insert_ignore is not supported for the "{dialect}" dialect')
+
+
+#* id of the inserted row, or None when the row already existed
+def inserted_id(dialect: str, result: CursorResult) -> int | None:
+    if dialect in ('mysql', 'mariadb'):
+        return result.lastrowid or None
+
+    return result.scalar()
+
+
+def insert_ignore(session: Session, model: any, values: dict[str, any]) -> int | None:
+    dialect = session.get_bind().dialect.name
+
+    return inserted_id(dialect, session.execute(insert_ignore_statement(dialect, model, values)))
+
+
+#* INSERT of a row with `amount` in column that adds `amount` to the stored row instead when the key exists
+def insert_or_increment_statement(dialect: str, model: any, column: str, values: dict[str, any], amount: int = 1):
+    values = {**values, column: amount}
+
+    if dialect in ('sqlite', 'postgresql'):
+        return _insert(dialect)(model).values(values).on_conflict_do_update(
+            index_elements=[name for name in values if name != column], set_={column: getattr(model, column) + amount})
+
+    if dialect in ('mysql', 'mariadb'):
+        return _insert(dialect)(model).values(values).on_duplicate_key_update({column: getattr(model, column) + amount})
+
+    raise NotImplementedError(f'insert_or_increment is not supported for the "{dialect}" dialect')
+
+
+#* adds `amount` to the column of each row, inserting the missing ones with `amount` (one statement per row)
+def insert_or_increment(session: Session, model: any, column: str, keys: list[dict[str, any]], amount: int = 1) -> None:
+    dialect = session.get_bind().dialect.name
+
+    for values in keys:
+        session.execute(insert_or_increment_statement(dialect, model, column, values, amount))
@@ -0,0 +1,61 @@
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from models.timetable_version import TimetableVersion
+
+from utils.upsert import insert_or_increment
+
+
+ALL = '*' #* key of the epoch that bump_all() moves
+
+
+#* Version numbers of what a cached representation was built from, kept in the timetable_version table.
+#* Writers bump the keys they changed, or everything at once (bump_all) when the change reaches too many
+#* keys to list, with the session of the write and before its commit, so the new version becomes visible
+#* together with the rows; readers turn the stored versions of a key into an ETag. Every process reads
+#* the same rows, so a tag handed out by one process is valid in all of them.
+#* Keys are tuples like ('student', 3) stored as "<name>:student:3".
+class VersionCounter:
+    def __init__(self, name: str):
+        self.name = name
+
+    def __repr__(self) -> str:
+        return f'VersionCounter (name={self.name!r})'
+
+    def _row(self, key: any) -> str:
+        parts = key if isinstance(key, tuple) else (key,)
+
+        return ':'.join(map(str, (self.name, *parts)))
+
+    def bump(self, session: Session, *keys: any) -> None:
+        #* sorted, so two writers bumping overlapping keys lock the rows in the same order
+        rows = sorted({self._row(key) for key in keys})
+
+        insert_or_increment(session, TimetableVersion, 'version', [{'name': row} for row in rows])
+
+    def bump_all(self, session: Session) -> None:
+        self.bump(session, ALL)
+
+    def version(self, session: Session, key: any) -> tuple[int, int]:
+        epoch, row = self._row(ALL), self._row(key)
+
+        statement = select(TimetableVersion.name, TimetableVersion.version).where(TimetableVersion.name.in_((epoch, row)))
+        versions = dict(session.execute(statement).all())
+
+        return versions.get(epoch, 0), versions.get(row, 0)
+
+    def etag(self, session: Session, key: any) -> str:
+        epoch, version = self.version(session, key)
+
+        return f'"{epoch}-{version}"'
+
+
+_counters: dict[str, VersionCounter] = {}
+
+
+#* shared by name like the caches, so every controller instance bumps the counters the views read
+def get_version_counter(name: str) -> VersionCounter:
+    if name not in _counters:
+        _counters[name] = VersionCounter(name)
+
+    return _counters[name]
@@ -0,0 +1,60 @@
+import json
+from datetime import date, time
+from enum import Enum
+
+from sqlalchemy import Row, inspect
+
+from utils.pagination import Page
+
+
+#* JSON bodies of the HTTP API. Rows and ORM instances become plain objects of their columns;
+#* times are "HH:MM", dates ISO 8601 and enums their value; binary columns (slot masks) are left out.
+def _default(value: any) -> any:
+    if isinstance(value, time):
+        return value.strftime('%H:%M')
+
+    if isinstance(value, date):
+        return value.isoformat()
+
+    if isinstance(value, Enum):
+        return value.value
+
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+
+def instance(item: any) -> dict[str, any]:
+    values = {attribute.key: getattr(item, attribute.key) for attribute in inspect(item).mapper.column_attrs}
+
+    return {key: value for key, value in values.items() if not isinstance(value, bytes)}
+
+
+def row(item: Row) -> dict[str, any]:
+    return dict(item._mapping)
+
+
+def page(result: Page) -> dict[str, any]:
+    return {'items': [instance(item) for item in result], 'next_after_id': result.next_after_id}
+
+
+def items(result: list[any]) -> dict[str, any]:
+    return {'items': [instance(item) for item in result]}
+
+
+def timetable(kind: str, key: any, rows: list[Row]) -> dict[str, any]:
+    return {kind: key, 'entries': [row(item) for item in rows]}
+
+
+def availability(teacher_id: int, windows: dict[str, list[tuple] | None]) -> dict[str, any]:
+    #* None: no restriction (available all week / no preference)
+    return {'teacher_id': teacher_id, **{kind: None if spans is None else [{'day': day, 'start_time': start, 'end_time': end}
+                                                                           for day, start, end in spans]
+                                         for kind, spans in windows.items()}}
+
+
+def error(message: str) -> dict[str, any]:
+    #* the controllers' messages span lines in their source; one line on the wire
+    return {'error': ' '.join(message.split())}
+
+
+def render(payload: dict[str, any]) -> bytes:
+    return json.dumps(payload, default=_default, ensure_ascii=False, separators=(',', ':')).encode()
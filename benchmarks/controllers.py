@@ -0,0 +1,314 @@
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+from time import perf_counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+#* same import roots as the application (models.X / controllers.X and app.models.database)
+for path in (ROOT, os.path.join(ROOT, 'app')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+import sqlalchemy
+
+from app.models import database
+
+from models.career import Career
+from models.teacher import Teacher
+from models.schedule import Schedule
+from models.subject import Subject
+from models.student import Student
+from models.subject_schedule import SubjectSchedule
+from models.student_subject import StudentSubject
+from models.classroom import Classroom
+from models.timetable_version import TimetableVersion
+
+from controllers.logic.career_controller import CareerController
+from controllers.logic.teacher_controller import TeacherController
+from controllers.logic.schedule_controller import ScheduleController
+from controllers.logic.subject_controller import SubjectController
+from controllers.logic.student_controller import StudentController
+from controllers.logic.subject_schedule_controller import SubjectScheduleController
+from controllers.logic.student_subject_controller import StudentSubjectController
+from controllers.logic.timetable_controller import TimetableController
+
+from utils.cache import cache_stats, clear_caches
+from utils.search_index import clear_search_indexes
+from utils.bulk import chunked
+
+from benchmarks.generator import PROFILES, UniversityData, generate
+
+
+SINGLE_ROWS = 500 #* rows created one by one before switching to create_many
+BATCH_SIZE = 1_000
+SAMPLES = 1_000 #* lookups per read scenario
+TOLERANCE = 0.20 #* allowed p95 slowdown when comparing against a baseline
+
+
+def _percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+#* times every call on its own; rows is how many rows each call handles (for throughput)
+def measure(operations: list[callable], rows: int | list[int] = 1) -> dict[str, float]:
+    latencies = []
+
+    for operation in operations:
+        start = perf_counter()
+        operation()
+        latencies.append(perf_counter() - start)
+
+    total_rows = sum(rows) if isinstance(rows, list) else rows * len(operations)
+    total = sum(latencies)
+
+    return {
+        'operations': len(operations),
+        'rows': total_rows,
+        'seconds': round(total, 6),
+        'rows_per_second': round(total_rows / total, 1) if total else None,
+        'p50_ms': round(_percentile(latencies, 0.50) * 1000, 4),
+        'p95_ms': round(_percentile(latencies, 0.95) * 1000, 4),
+        'max_ms': round(max(latencies) * 1000, 4)
+    }
+
+
+class Benchmark:
+    def __init__(self, data: UniversityData, url: str, samples: int = SAMPLES):
+        self.data = data
+        self.samples = samples
+        self.results: dict[str, dict[str, float]] = {}
+
+        self._rng = random.Random(data.seed)
+
+        database.configure(url)
+        database.Base.metadata.drop_all(database.get_engine())
+        database.Base.metadata.create_all(database.get_engine())
+
+        clear_caches()
+        clear_search_indexes()
+
+        self.session = database.Session()
+
+        self.careers = CareerController(self.session)
+        self.teachers = TeacherController(self.session)
+        self.schedules = ScheduleController(self.session)
+        self.subjects = SubjectController(self.session, career_controller=self.careers)
+        self.students = StudentController(self.session)
+        self.subject_schedules = SubjectScheduleController(self.session, subject_controller=self.subjects,
+                                                           schedule_controller=self.schedules,
+                                                           teacher_controller=self.teachers)
+        self.student_subjects = StudentSubjectController(self.session, student_controller=self.students,
+                                                         subject_schedule_controller=self.subject_schedules)
+        self.timetables = TimetableController(self.session)
+
+    def scenario(self, name: str, operations: list[callable], rows: int | list[int] = 1) -> None:
+        if operations:
+            self.results[name] = measure(operations, rows)
+
+        #* every scenario starts with an empty identity map
+        self.session.expunge_all()
+
+    def _sample(self, population: list[any]) -> list[any]:
+        return [self._rng.choice(population) for _ in range(self.samples)]
+
+    def _bulk(self, name: str, create_many: callable, items: list[any]) -> None:
+        batches = list(chunked(items, BATCH_SIZE))
+
+        self.scenario(name, [lambda batch=batch: create_many(batch) for batch in batches], [len(batch) for batch in batches])
+
+    def run(self) -> dict[str, dict[str, float]]:
+        self._create()
+        self._enroll()
+        self._read()
+
+        return self.results
+
+    def _create(self) -> None:
+        data = self.data
+        half = len(data.teachers) // 2
+
+        self.scenario('career.create', [lambda name=name: self.careers.create(name) for name in data.careers])
+        self.scenario('teacher.create', [lambda item=item: self.teachers.create(item) for item in data.teachers[:half]])
+        self._bulk('teacher.create_many', self.teachers.create_many, data.teachers[half:])
+        self.scenario('schedule.create', [lambda item=item: self.schedules.create(item) for item in data.schedules])
+        self.scenario('subject.create', [lambda item=item: self.subjects.create(item) for item in data.subjects])
+        self.scenario('student.create', [lambda item=item: self.students.create(item)
+                                         for item in data.students[:SINGLE_ROWS]])
+        self._bulk('student.create_many', self.students.create_many, data.students[SINGLE_ROWS:])
+
+        self.scenario('subject_schedule.generate', [lambda: self.subject_schedules.generate(sections=data.sections)],
+                      len(data.subjects) * len(data.sections))
+
+    def _enroll(self) -> None:
+        #* every student takes all the sections of its (career, course, section) group
+        sections = {}
+
+        for row in self.session.execute(sqlalchemy.select(SubjectSchedule.id, SubjectSchedule.section,
+                                                          Subject.career_id, Subject.course)
+                                        .join(Subject, Subject.id == SubjectSchedule.subject_id)):
+            sections.setdefault((row.career_id, row.course, row.section), []).append(row.id)
+
+        enrollments = [{'student_id': student_id, 'subject_schedule_id': subject_schedule_id}
+                       for student_id, group in enumerate(self.data.groups, start=1)
+                       for subject_schedule_id in sections.get(group, ())]
+
+        single = [item for item in enrollments if item['student_id'] <= SINGLE_ROWS // 5]
+
+        self.scenario('student_subject.create', [lambda item=item: self.student_subjects.create(item) for item in single])
+        self._bulk('student_subject.create_many', self.student_subjects.create_many, enrollments[len(single):])
+
+    def _read(self) -> None:
+        data = self.data
+
+        clear_caches()
+
+        ids = {model: self.session.execute(sqlalchemy.select(model.id)).scalars().all()
+               for model in (Career, Teacher, Schedule, Subject, Student, SubjectSchedule, StudentSubject)}
+
+        for name, controller, model in (('career', self.careers, Career), ('teacher', self.teachers, Teacher),
+                                        ('schedule', self.schedules, Schedule), ('subject', self.subjects, Subject),
+                                        ('student', self.students, Student),
+                                        ('subject_schedule', self.subject_schedules, SubjectSchedule),
+                                        ('student_subject', self.student_subjects, StudentSubject)):
+            self.scenario(f'{name}.get_by_id', [lambda id=id, controller=controller: controller.get_by_id(id)
+                                                for id in self._sample(ids[model])])
+
+            self.scenario(f'{name}.get_all', [controller.get_all for _ in range(3)], len(ids[model]))
+
+            self.scenario(f'{name}.iter_all', [lambda controller=controller: sum(1 for _ in controller.iter_all())],
+                          len(ids[model]))
+
+        self.scenario('career.get_by_name', [lambda name=name: self.careers.get_by_name(name)
+                                             for name in self._sample(data.careers)])
+        self.scenario('subject.get_by_name', [lambda name=item['name']: self.subjects.get_by_name(name)
+                                              for item in self._sample(data.subjects)])
+        self.scenario('student.get_by_name', [lambda name=item['name']: self.students.get_by_name(name)
+                                              for item in self._sample(data.students)])
+
+        self.scenario('career.exists', [lambda name=name: self.careers.exists(name) for name in self._sample(data.careers)])
+        self.scenario('teacher.exists', [lambda number=item['identification_number'].replace('-', ''): self.teachers.exists(number)
+                                         for item in self._sample(data.teachers)])
+        self.scenario('student.exists', [lambda number=item['identification_number'].replace('-', ''): self.students.exists(number)
+                                         for item in self._sample(data.students)])
+        self.scenario('subject.exists', [lambda name=item['name']: self.subjects.exists(name)
+                                         for item in self._sample(data.subjects)])
+
+        def walk_pages() -> None:
+            page = self.students.get_page(page_size=BATCH_SIZE)
+
+            while page.has_more:
+                page = self.students.get_page(page.next_after_id, BATCH_SIZE)
+
+        self.scenario('student.get_page', [walk_pages], len(ids[Student]))
+
+        #* names as the front desk types them: no accents, lower case, sometimes only the surname
+        self.scenario('student.search', [lambda name=item['name']: self.students.search(name.lower().split()[-1])
+                                         for item in self._sample(data.students)])
+        self.scenario('teacher.search', [lambda name=item['name']: self.teachers.search(name[:-1])
+                                         for item in self._sample(data.teachers)])
+
+        self.scenario('timetable.get_by_student', [lambda id=id: self.timetables.get_by_student(id)
+                                                   for id in self._sample(ids[Student])])
+        self.scenario('student_subject.get_by_student', [lambda id=id: self.student_subjects.get_by_student(id)
+                                                         for id in self._sample(ids[Student])])
+
+
+def _commit() -> str | None:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+#* scenarios whose p95 got slower than the baseline by more than tolerance
+def compare(results: dict[str, dict[str, float]], baseline: dict[str, dict[str, float]],
+            tolerance: float = TOLERANCE
+            ) -> list[dict[str, any]]:
+    regressions = []
+
+    for name, result in results.items():
+        previous = baseline.get(name)
+
+        if previous and previous['p95_ms'] and result['p95_ms'] > previous['p95_ms'] * (1 + tolerance):
+            regressions.append({'scenario': name, 'baseline_p95_ms': previous['p95_ms'], 'p95_ms': result['p95_ms']})
+
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Time the logic controllers on a synthetic university (SQLite)')
+    parser.add_argument('--profile', choices=sorted(PROFILES), default='small')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--samples', type=int, default=SAMPLES, help='lookups per read scenario')
+    parser.add_argument('--database', help='SQLite file to use (a temporary one by default)')
+    parser.add_argument('--output', help='write the JSON report here instead of stdout')
+    parser.add_argument('--compare', help='previous JSON report; exit with 1 if a p95 regressed')
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE)
+    arguments = parser.parse_args()
+
+    data = generate(arguments.profile, arguments.seed)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = arguments.database or os.path.join(directory, 'benchmark.db')
+
+        if os.path.exists(path):
+            os.remove(path)
+
+        benchmark = Benchmark(data, f'sqlite:///{path}', arguments.samples)
+
+        try:
+            results = benchmark.run()
+
+        finally:
+            benchmark.session.close()
+            database.configure()
+
+    report = {
+        'meta': {
+            'commit': _commit(),
+            'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'sqlalchemy': sqlalchemy.__version__,
+            'sqlite': sqlite3.sqlite_version,
+            'profile': arguments.profile,
+            'seed': arguments.seed,
+            'counts': data.counts()
+        },
+        'scenarios': results,
+        'caches': cache_stats()
+    }
+
+    status = 0
+
+    if arguments.compare:
+        with open(arguments.compare) as file:
+            report['regressions'] = compare(results, json.load(file)['scenarios'], arguments.tolerance)
+
+        status = 1 if report['regressions'] else 0
+
+    output = json.dumps(report, indent=2)
+
+    if arguments.output:
+        with open(arguments.output, 'w') as file:
+            file.write(output + '\n')
+
+    else:
+        print(output)
+
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,211 @@
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, wait
+from time import perf_counter, sleep
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+#* same import roots as the application (models.X / controllers.X and app.models.database)
+for path in (ROOT, os.path.join(ROOT, 'app')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+import sqlalchemy
+from sqlalchemy.exc import OperationalError
+
+from app.models import database
+
+from models.subject import Subject
+from models.subject_schedule import SubjectSchedule
+from models.student_subject import StudentSubject
+
+from controllers.logic.student_subject_controller import StudentSubjectController
+
+from utils.enrollment_queue import EnrollmentQueue, BATCH_SIZE, MAX_WAIT
+
+from benchmarks.controllers import Benchmark, _percentile
+from benchmarks.generator import PROFILES, generate
+
+
+THREADS = 64 #* clients submitting at the same time
+CAPACITY = 30 #* seats per section; below the size of a cohort so sections do fill up
+DUPLICATES = 0.05 #* share of requests sent twice, as impatient clients do
+RETRIES = 50 #* attempts of a batch that found the SQLite file locked by another worker
+
+
+#* Registration opening: every student of the synthetic university asks for all the sections of its
+#* cohort at the same time, from many threads, through an EnrollmentQueue. Reports the sustained
+#* enrollments per second and checks afterwards that no section holds more students than its capacity
+#* and that every enrolled counter matches its rows.
+def _requests(benchmark: Benchmark, rng: random.Random) -> list[dict[str, int]]:
+    sections = {}
+
+    for row in benchmark.session.execute(sqlalchemy.select(SubjectSchedule.id, SubjectSchedule.section,
+                                                           Subject.career_id, Subject.course)
+                                         .join(Subject, Subject.id == SubjectSchedule.subject_id)):
+        sections.setdefault((row.career_id, row.course, row.section), []).append(row.id)
+
+    requests = [{'student_id': student_id, 'subject_schedule_id': subject_schedule_id}
+                for student_id, group in enumerate(benchmark.data.groups, start=1)
+                for subject_schedule_id in sections.get(group, ())]
+
+    requests += rng.sample(requests, int(len(requests) * DUPLICATES))
+    rng.shuffle(requests)
+
+    return requests
+
+
+def _handler_factory(sessions: list[any]) -> callable:
+    def factory() -> callable:
+        session = database.Session()
+        sessions.append(session)
+        controller = StudentSubjectController(session)
+
+        def handle(batch: list[dict[str, int]]) -> list[Exception | None]:
+            #* SQLite has a single writer; a batch that lost the race for the file is retried whole
+            for attempt in range(RETRIES):
+                try:
+                    return controller.enroll_batch(batch)
+
+                except OperationalError:
+                    session.rollback()
+                    sleep(min(0.05, 0.001 * 2 ** attempt))
+
+            return controller.enroll_batch(batch)
+
+        return handle
+
+    return factory
+
+
+def _check(session: any) -> dict[str, int]:
+    counts = (sqlalchemy.select(StudentSubject.subject_schedule_id, sqlalchemy.func.count().label('students'))
+              .group_by(StudentSubject.subject_schedule_id).subquery())
+
+    rows = session.execute(sqlalchemy.select(SubjectSchedule.capacity, SubjectSchedule.enrolled,
+                                             sqlalchemy.func.coalesce(counts.c.students, 0).label('students'))
+                           .outerjoin(counts, counts.c.subject_schedule_id == SubjectSchedule.id)).all()
+
+    return {
+        'sections': len(rows),
+        'full': sum(1 for row in rows if row.capacity is not None and row.students == row.capacity),
+        'oversubscribed': sum(1 for row in rows if row.capacity is not None and row.students > row.capacity),
+        'miscounted': sum(1 for row in rows if row.enrolled != row.students)
+    }
+
+
+def run(benchmark: Benchmark, threads: int, capacity: int, workers: int, batch_size: int, max_wait: float
+        ) -> dict[str, any]:
+    benchmark._create()
+
+    benchmark.session.execute(sqlalchemy.update(SubjectSchedule).values(capacity=capacity))
+    benchmark.session.commit()
+
+    requests = _requests(benchmark, random.Random(benchmark.data.seed))
+
+    #* an open read transaction would keep the workers from ever committing on SQLite
+    benchmark.session.commit()
+    latencies = []
+    rejections = []
+    sessions = []
+
+    def client(data: dict[str, int]) -> None:
+        start = perf_counter()
+        future = queue.submit(data)
+
+        try:
+            future.result()
+
+        except Exception as e:
+            rejections.append(type(e).__name__)
+
+        latencies.append(perf_counter() - start)
+
+    queue = EnrollmentQueue(_handler_factory(sessions), workers, batch_size, max_wait)
+
+    try:
+        with queue, ThreadPoolExecutor(threads) as clients:
+            start = perf_counter()
+            wait([clients.submit(client, data) for data in requests])
+            seconds = perf_counter() - start
+
+    finally:
+        for session in sessions:
+            session.close()
+
+    enrolled = len(requests) - len(rejections)
+
+    return {
+        'requests': len(requests),
+        'enrolled': enrolled,
+        'rejected': dict(Counter(rejections)),
+        'seconds': round(seconds, 4),
+        'enrollments_per_second': round(enrolled / seconds, 1),
+        'requests_per_second': round(len(requests) / seconds, 1),
+        'p50_ms': round(_percentile(latencies, 0.50) * 1000, 3),
+        'p95_ms': round(_percentile(latencies, 0.95) * 1000, 3),
+        'batches': queue.batches,
+        'mean_batch': round(queue.requests / queue.batches, 1) if queue.batches else None,
+        'check': _check(benchmark.session)
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Enrollment under a registration rush (SQLite, many client threads)')
+    parser.add_argument('--profile', choices=sorted(PROFILES), default='small')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--threads', type=int, default=THREADS, help='client threads')
+    parser.add_argument('--capacity', type=int, default=CAPACITY, help='seats per section')
+    parser.add_argument('--workers', type=int, default=1, help='queue workers, one session each')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='requests per transaction')
+    parser.add_argument('--max-wait', type=float, default=MAX_WAIT, help='seconds a batch waits to fill up')
+    parser.add_argument('--database', help='SQLite file to use (a temporary one by default)')
+    parser.add_argument('--output', help='write the JSON report here instead of stdout')
+    arguments = parser.parse_args()
+
+    data = generate(arguments.profile, arguments.seed)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = arguments.database or os.path.join(directory, 'rush.db')
+
+        if os.path.exists(path):
+            os.remove(path)
+
+        benchmark = Benchmark(data, f'sqlite:///{path}')
+
+        try:
+            results = run(benchmark, arguments.threads, arguments.capacity, arguments.workers, arguments.batch_size,
+                          arguments.max_wait)
+
+        finally:
+            benchmark.session.close()
+            database.configure()
+
+    report = {
+        'meta': {'profile': arguments.profile, 'seed': arguments.seed, 'threads': arguments.threads,
+                 'capacity': arguments.capacity, 'workers': arguments.workers, 'batch_size': arguments.batch_size,
+                 'counts': data.counts()},
+        'rush': results
+    }
+
+    output = json.dumps(report, indent=2)
+
+    if arguments.output:
+        with open(arguments.output, 'w') as file:
+            file.write(output + '\n')
+
+    else:
+        print(output)
+
+    #* any oversubscribed or miscounted section is a failure, whatever the throughput
+    return 0 if not results['check']['oversubscribed'] and not results['check']['miscounted'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
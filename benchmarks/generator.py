@@ -0,0 +1,98 @@
+import random
+
+
+#* sizes of the synthetic university; every section of a (career, course) cohort takes all its subjects
+PROFILES = {
+    'small': {'careers': 3, 'courses': 4, 'subjects_per_course': 5, 'teachers': 40, 'students': 1_000, 'sections': ('A', 'B')},
+    'medium': {'careers': 8, 'courses': 6, 'subjects_per_course': 6, 'teachers': 150, 'students': 10_000, 'sections': ('A', 'B')},
+    'large': {'careers': 15, 'courses': 8, 'subjects_per_course': 7, 'teachers': 400, 'students': 40_000, 'sections': ('A', 'B', 'C')},
+}
+
+DAYS = ('Lunes', 'Martes', 'Miercoles', 'Jueves', 'Viernes', 'Sabado')
+BLOCK_MINUTES = 90 #* two academic hours
+FIRST_BLOCK = 7 * 60
+LAST_BLOCK_END = 19 * 60
+
+CAREERS = ['Informatica', 'Electricidad', 'Electronica', 'Mecanica', 'Administracion', 'Contaduria', 'Turismo',
+           'Quimica', 'Agroalimentacion', 'Construccion Civil', 'Instrumentacion', 'Mantenimiento', 'Telecomunicaciones',
+           'Higiene y Seguridad', 'Procesos Quimicos', 'Sistemas de Calidad', 'Geociencias', 'Materiales']
+
+TOPICS = ['Matematica', 'Fisica', 'Programacion', 'Ingles', 'Estadistica', 'Dibujo Tecnico', 'Etica', 'Proyecto',
+          'Redes', 'Base de Datos', 'Quimica General', 'Economia', 'Metodologia', 'Algoritmica', 'Contabilidad',
+          'Termodinamica', 'Circuitos', 'Gestion']
+
+FIRST_NAMES = ['Maria', 'Jose', 'Luis', 'Ana', 'Carlos', 'Carmen', 'Jesus', 'Rosa', 'Miguel', 'Luisa', 'Pedro',
+               'Andrea', 'Juan', 'Daniela', 'Rafael', 'Gabriela', 'Jorge', 'Valentina', 'Manuel', 'Sofia']
+
+LAST_NAMES = ['Gonzalez', 'Rodriguez', 'Perez', 'Hernandez', 'Garcia', 'Martinez', 'Lopez', 'Ramirez', 'Sanchez',
+              'Diaz', 'Torres', 'Rojas', 'Morales', 'Castillo', 'Mendoza', 'Silva', 'Romero', 'Flores']
+
+ROMAN = ['I', 'II', 'III', 'IV', 'V', 'VI', 'VII', 'VIII', 'IX', 'X']
+
+
+#* Rows ready for the controllers. Ids are positional (row i gets id i + 1), which holds on a fresh
+#* database, so subjects and groups can refer to careers and students without reading them back.
+class UniversityData:
+    def __init__(self, seed: int, profile: str, sections: tuple[str, ...]):
+        self.seed = seed
+        self.profile = profile
+        self.sections = sections
+
+        self.careers: list[str] = []
+        self.teachers: list[dict[str, str]] = []
+        self.schedules: list[dict[str, str]] = []
+        self.subjects: list[dict[str, any]] = []
+        self.students: list[dict[str, str]] = []
+        #* (career_id, course, section) of every student, aligned with students
+        self.groups: list[tuple[int, int, str]] = []
+
+    def counts(self) -> dict[str, int]:
+        return {
+            'careers': len(self.careers),
+            'teachers': len(self.teachers),
+            'schedules': len(self.schedules),
+            'subjects': len(self.subjects),
+            'students': len(self.students),
+            'sections': len(self.subjects) * len(self.sections)
+        }
+
+
+def _clock(minutes: int) -> str:
+    return f'{minutes // 60:02d}:{minutes % 60:02d}:00'
+
+
+def _people(rng: random.Random, amount: int, prefix: str) -> list[dict[str, str]]:
+    numbers = rng.sample(range(5_000_000, 35_000_000), amount)
+
+    return [{'name': f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {rng.choice(LAST_NAMES)}',
+             'identification_number': f'{prefix}-{number}'} for number in numbers]
+
+
+def generate(profile: str = 'small', seed: int = 0, **overrides: any) -> UniversityData:
+    sizes = dict(PROFILES[profile], **overrides)
+    rng = random.Random(seed)
+
+    data = UniversityData(seed=seed, profile=profile, sections=tuple(sizes['sections']))
+
+    for position in range(sizes['careers']):
+        suffix = '' if position < len(CAREERS) else f' {position // len(CAREERS) + 1}'
+
+        data.careers.append(f'{CAREERS[position % len(CAREERS)]}{suffix}')
+
+    data.teachers = _people(rng, sizes['teachers'], 'V')
+
+    for day in DAYS:
+        for start in range(FIRST_BLOCK, LAST_BLOCK_END - BLOCK_MINUTES + 1, BLOCK_MINUTES):
+            data.schedules.append({'day': day, 'start_time': _clock(start), 'end_time': _clock(start + BLOCK_MINUTES)})
+
+    for career_id, career in enumerate(data.careers, start=1):
+        for course in range(1, sizes['courses'] + 1):
+            for topic in rng.sample(TOPICS, sizes['subjects_per_course']):
+                data.subjects.append({'name': f'{topic} {ROMAN[course - 1]} - {career}', 'course': course,
+                                      'career_id': career_id})
+
+    data.students = _people(rng, sizes['students'], 'E')
+    data.groups = [(rng.randint(1, sizes['careers']), rng.randint(1, sizes['courses']), rng.choice(data.sections))
+                   for _ in data.students]
+
+    return data
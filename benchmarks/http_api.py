@@ -0,0 +1,113 @@
+import argparse
+import http.client
+import json
+import os
+import random
+import sys
+import tempfile
+from threading import Thread
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+#* same import roots as the application (models.X / controllers.X and app.models.database)
+for path in (ROOT, os.path.join(ROOT, 'app')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from app.models import database
+
+from controllers.ui.api_controller import ApiController
+from controllers.ui.http_server import ApiServer
+
+from utils.cache import clear_caches, get_cache
+
+from benchmarks.controllers import Benchmark, measure
+from benchmarks.generator import PROFILES, generate
+
+
+SAMPLES = 1_000
+
+
+#* Timetable endpoints of the HTTP API, in process (ApiController.handle) and over a keep-alive
+#* connection to the stdlib server: a cold render from the database, a hit in the response cache and
+#* a conditional GET answered with 304. Fails if a repeated request doesn't get its 304.
+def _scenarios(name: str, call: callable, targets: list[str]) -> dict[str, dict[str, float]]:
+    results = {}
+
+    clear_caches()
+    etags = {}
+
+    def cold(target: str) -> None:
+        etags[target] = call(target, {})[1]
+
+    results[f'{name}.cold'] = measure([lambda target=target: cold(target) for target in dict.fromkeys(targets)])
+    results[f'{name}.cached'] = measure([lambda target=target: call(target, {}) for target in targets])
+
+    statuses = []
+    results[f'{name}.not_modified'] = measure([lambda target=target: statuses.append(call(target, {'If-None-Match': etags[target]})[0])
+                                               for target in targets])
+    results[f'{name}.not_modified']['all_304'] = all(status == 304 for status in statuses)
+
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Time the timetable endpoints of the HTTP API (SQLite)')
+    parser.add_argument('--profile', choices=sorted(PROFILES), default='small')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--samples', type=int, default=SAMPLES)
+    arguments = parser.parse_args()
+
+    data = generate(arguments.profile, arguments.seed)
+    rng = random.Random(arguments.seed)
+
+    with tempfile.TemporaryDirectory() as directory:
+        benchmark = Benchmark(data, f'sqlite:///{os.path.join(directory, "api.db")}')
+
+        try:
+            benchmark._create()
+            benchmark._enroll()
+
+        finally:
+            benchmark.session.close()
+
+        #* a few hundred distinct timetables requested over and over, as at the start of a term
+        targets = ([f'/timetables/students/{rng.randint(1, len(data.students))}' for _ in range(arguments.samples // 2)]
+                   + [f'/timetables/teachers/{rng.randint(1, len(data.teachers))}' for _ in range(arguments.samples // 2)])
+
+        api = ApiController()
+
+        def in_process(target: str, headers: dict[str, str]) -> tuple[int, str]:
+            response = api.handle('GET', target, headers)
+
+            return response.status, response.headers.get('ETag')
+
+        server = ApiServer(('127.0.0.1', 0), api)
+        Thread(target=server.serve_forever, daemon=True).start()
+
+        connection = http.client.HTTPConnection('127.0.0.1', server.server_address[1])
+
+        def over_http(target: str, headers: dict[str, str]) -> tuple[int, str]:
+            connection.request('GET', target, headers=headers)
+            response = connection.getresponse()
+            response.read()
+
+            return response.status, response.getheader('ETag')
+
+        try:
+            results = _scenarios('handle', in_process, targets) | _scenarios('http', over_http, targets)
+
+        finally:
+            connection.close()
+            server.shutdown()
+            server.server_close()
+            database.configure()
+
+    print(json.dumps({'scenarios': results, 'response_cache': get_cache('timetable_response').stats()}, indent=2))
+
+    return 0 if all(result['all_304'] for name, result in results.items() if name.endswith('not_modified')) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,126 @@
+import argparse
+import os
+import subprocess
+import sys
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+#* modules a short-lived command imports; none of them may create an engine or read config
+MODULES = [
+    'controllers.logic.career_controller',
+    'controllers.logic.export_controller',
+    'controllers.logic.schedule_controller',
+    'controllers.logic.student_controller',
+    'controllers.logic.student_subject_controller',
+    'controllers.logic.subject_controller',
+    'controllers.logic.subject_schedule_controller',
+    'controllers.logic.teacher_controller',
+    'controllers.logic.timetable_controller',
+]
+
+#* loaded by the methods that use them (numpy for the term snapshot, the solvers and the min-cost flow, and
+#* the SQLAlchemy dialects the engine doesn't use), never by importing a controller
+DEFERRED = [
+    'numpy',
+    'utils.term_snapshot',
+    'utils.timetable_solver',
+    'utils.timetable_quality',
+    'utils.room_assignment',
+    'utils.sectioning',
+    'utils.min_cost_flow',
+    'sqlalchemy.dialects.mysql',
+    'sqlalchemy.dialects.postgresql',
+]
+
+#* what the application adds on top of SQLAlchemy, which alone takes 400-560 ms on a cold interpreter and
+#* varies too much from run to run to be part of a budget
+BUDGET_MS = 150
+
+
+#* runs `python -X importtime` in a clean interpreter and returns {module: cumulative microseconds}
+def measure(modules: list[str]) -> dict[str, int]:
+    environment = dict(os.environ, PYTHONPATH=os.pathsep.join([ROOT, os.path.join(ROOT, 'app')]))
+    
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {", ".join(modules)}; import sys; '
+                                                   f'assert "config" not in sys.modules, "config imported eagerly"; '
+                                                   f'eager = [name for name in {DEFERRED!r} if name in sys.modules]; '
+                                                   f'assert not eager, f"imported eagerly: {{eager}}"'],
+        env=environment, capture_output=True, text=True
+    )
+    
+    if process.returncode != 0:
+        raise RuntimeError([line for line in process.stderr.splitlines() if not line.startswith('import time:')][-1])
+    
+    timings = {}
+    
+    for line in process.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        
+        _, cumulative, name = line[len('import time:'):].split('|')
+        
+        if cumulative.strip().isdigit():
+            #* keep the indentation: it tells nested imports from top-level ones
+            timings[name[1:].rstrip()] = int(cumulative)
+    
+    return timings
+
+
+#* cumulative time of the outermost imports of a package (and of whatever they import in turn); -X importtime
+#* prints a module after its own imports, so walking the lines backwards meets every parent before its children
+def package_time(timings: dict[str, int], package: str) -> int:
+    total = 0
+    parents = [] #* (indentation, inside the package) of the enclosing imports
+    
+    for name, time in reversed(timings.items()):
+        indentation = len(name) - len(name.lstrip())
+        
+        while parents and parents[-1][0] >= indentation:
+            parents.pop()
+        
+        inside = bool(parents) and parents[-1][1]
+        ours = name.strip() == package or name.strip().startswith(f'{package}.')
+        
+        if ours and not inside:
+            total += time
+        
+        parents.append((indentation, inside or ours))
+    
+    return total
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Check the import time of the controllers against a budget')
+    parser.add_argument('--budget-ms', type=float, default=BUDGET_MS)
+    parser.add_argument('--top', type=int, default=10, help='slowest top-level imports to print')
+    parser.add_argument('--runs', type=int, default=3, help='cold interpreters to measure; the fastest one counts')
+    arguments = parser.parse_args()
+    
+    runs = []
+    
+    for _ in range(arguments.runs):
+        timings = measure(MODULES)
+        
+        #* top-level entries are the ones without leading spaces in -X importtime's output
+        top_level = {name: time for name, time in timings.items() if not name.startswith(' ')}
+        sqlalchemy = package_time(timings, 'sqlalchemy')
+        
+        runs.append((sum(top_level.values()) - sqlalchemy, sqlalchemy, top_level))
+    
+    own, sqlalchemy, top_level = min(runs, key=lambda run: run[0])
+    own_ms = own / 1000
+    slowest = sorted(((time, name) for name, time in top_level.items()), reverse=True)
+    
+    for time, name in slowest[:arguments.top]:
+        print(f'{time / 1000:9.1f} ms  {name}')
+    
+    print(f'controllers: {own_ms + sqlalchemy / 1000:.1f} ms, {sqlalchemy / 1000:.1f} ms of it SQLAlchemy; '
+          f'own {own_ms:.1f} ms (budget {arguments.budget_ms:.0f} ms)')
+    
+    return 0 if own_ms <= arguments.budget_ms else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
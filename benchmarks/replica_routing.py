@@ -0,0 +1,156 @@
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+from collections import Counter
+from time import perf_counter
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+#* same import roots as the application (models.X / controllers.X and app.models.database)
+for path in (ROOT, os.path.join(ROOT, 'app')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from sqlalchemy import event
+
+from app.models import database
+
+from controllers.logic.student_controller import StudentController
+from controllers.logic.student_subject_controller import StudentSubjectController
+from controllers.logic.subject_controller import SubjectController
+
+from utils.cache import clear_caches
+from utils.exceptions import ObjectNotFoundException
+from utils.search_index import clear_search_indexes
+
+from benchmarks.controllers import Benchmark
+from benchmarks.generator import PROFILES, generate
+
+
+REQUESTS = 300
+REPLICAS = 2
+
+
+#* Primary / replica routing against SQLite files: the primary is filled with a synthetic university and
+#* copied into the replicas, plus one replica that can't be opened (a dead host). Files don't replicate,
+#* which makes lag visible: a write is only seen by the session that made it. Checks that reads spread
+#* over the live replicas, writes and reads after them stay on the primary, and the dead one is skipped.
+class RoutingCheck:
+    def __init__(self, directory: str, replicas: int):
+        self.paths = [os.path.join(directory, 'primary.db')] + [os.path.join(directory, f'replica_{position}.db')
+                                                                 for position in range(1, replicas + 1)]
+        self.dead = os.path.join(directory, 'missing', 'replica.db')
+        self.statements = Counter()
+
+    def configure(self) -> None:
+        for path in self.paths[1:]:
+            shutil.copyfile(self.paths[0], path)
+
+        clear_caches()
+        clear_search_indexes()
+
+        database.configure(f'sqlite:///{self.paths[0]}',
+                           replica_database_urls=[f'sqlite:///{path}' for path in self.paths[1:] + [self.dead]])
+
+        for engine in [database.get_engine()] + database.get_replicas().engines:
+            name = os.path.basename(engine.url.database)
+
+            @event.listens_for(engine, 'before_cursor_execute')
+            def count(connection, cursor, statement, parameters, context, executemany, name=name):
+                if statement.lstrip().upper().startswith(('SELECT', 'INSERT', 'UPDATE', 'DELETE')):
+                    self.statements[name] += 1
+
+    def reads(self, student_ids: list[int], subject_names: list[str]) -> dict[str, any]:
+        self.statements.clear()
+        start = perf_counter()
+
+        for student_id, name in zip(student_ids, subject_names):
+            #* one session per request, as get_db hands them out
+            for session in database.get_db():
+                StudentSubjectController(session, student_controller=StudentController(session)).get_by_student(student_id)
+                SubjectController(session).get_by_name(name)
+
+        return {'requests': len(student_ids), 'seconds': round(perf_counter() - start, 4),
+                'statements': dict(self.statements)}
+
+    def read_your_writes(self, student: dict[str, str]) -> dict[str, any]:
+        self.statements.clear()
+
+        for session in database.get_db():
+            students = StudentController(session)
+            students.create(student)
+
+            own = students.get_by_identification_number(student['identification_number']) is not None
+
+        for session in database.get_db():
+            try:
+                StudentController(session).get_by_identification_number(student['identification_number'])
+                other = True
+
+            except ObjectNotFoundException:
+                other = False
+
+        return {'seen_by_writer': own, 'seen_by_next_request': other, 'statements': dict(self.statements)}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Check primary / replica session routing on local SQLite files')
+    parser.add_argument('--profile', choices=sorted(PROFILES), default='small')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--replicas', type=int, default=REPLICAS)
+    parser.add_argument('--requests', type=int, default=REQUESTS)
+    arguments = parser.parse_args()
+
+    data = generate(arguments.profile, arguments.seed)
+    rng = random.Random(arguments.seed)
+
+    with tempfile.TemporaryDirectory() as directory:
+        check = RoutingCheck(directory, arguments.replicas)
+        benchmark = Benchmark(data, f'sqlite:///{check.paths[0]}')
+
+        try:
+            benchmark._create()
+            benchmark._enroll()
+
+        finally:
+            benchmark.session.close()
+
+        try:
+            check.configure()
+
+            student_ids = [rng.randint(1, len(data.students)) for _ in range(arguments.requests)]
+            subject_names = [rng.choice(data.subjects)['name'] for _ in range(arguments.requests)]
+
+            reads = check.reads(student_ids, subject_names)
+            writes = check.read_your_writes({'name': 'Replica Check', 'identification_number': 'V-99999999'})
+
+        finally:
+            database.configure()
+
+    primary = os.path.basename(check.paths[0])
+    live = [os.path.basename(path) for path in check.paths[1:]]
+
+    report = {
+        'reads': reads,
+        'read_your_writes': writes,
+        'checks': {
+            'reads_off_primary': primary not in reads['statements'],
+            'reads_spread': all(reads['statements'].get(name) for name in live),
+            'writer_reads_own_write': writes['seen_by_writer'],
+            #* the replicas are copies taken before the write: only the primary has the row
+            'next_request_reads_replica': not writes['seen_by_next_request']
+        }
+    }
+
+    print(json.dumps(report, indent=2))
+
+    return 0 if all(report['checks'].values()) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,113 @@
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+from time import perf_counter
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+#* same import roots as the application (models.X / controllers.X and app.models.database)
+for path in (ROOT, os.path.join(ROOT, 'app')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from app.models import database
+
+from benchmarks.controllers import Benchmark
+from benchmarks.generator import PROFILES, generate
+
+
+CANDIDATES = 200_000 #* random (section, block) moves evaluated with delta()
+CHECKS = 200 #* moves also applied and compared against a full score()
+TOLERANCE = 1e-6
+
+
+#* Soft-constraint scoring of a generated and enrolled timetable: full score, delta evaluations per
+#* second (what a local search pays per candidate move), a check that move() deltas match full
+#* rescoring, and SubjectScheduleController.improve_timetable with the score before and after.
+def run(benchmark: Benchmark, candidates: int, checks: int, max_passes: int) -> dict[str, any]:
+    benchmark._create()
+    benchmark._enroll()
+    benchmark.session.commit()
+
+    controller = benchmark.subject_schedules
+    rng = random.Random(benchmark.data.seed)
+
+    started = perf_counter()
+    quality = controller._quality(None)
+    load = perf_counter() - started
+
+    started = perf_counter()
+    before = quality.breakdown()
+    full_score = perf_counter() - started
+
+    section_ids = list(quality._section_ids)
+    schedule_ids = list(quality._schedule_ids)
+    moves = [(rng.choice(section_ids), rng.choice(schedule_ids)) for _ in range(candidates)]
+
+    started = perf_counter()
+
+    for subject_schedule_id, schedule_id in moves:
+        quality.delta(subject_schedule_id, schedule_id)
+
+    elapsed = perf_counter() - started
+
+    mismatches = 0
+    score = quality.score()
+
+    for subject_schedule_id, schedule_id in moves[:checks]:
+        current = quality.schedule_id(subject_schedule_id)
+        change = quality.move(subject_schedule_id, schedule_id)
+        mismatches += abs(score + change - quality.score()) > TOLERANCE
+        quality.move(subject_schedule_id, current)
+
+    started = perf_counter()
+    after, applied = controller.improve_timetable(max_passes=max_passes)
+    improve = perf_counter() - started
+
+    #* what was written must score like the engine said
+    stored = controller.score_timetable()
+
+    return {
+        'load_s': load,
+        'full_score_ms': full_score * 1_000,
+        'delta': {'candidates': candidates, 'seconds': elapsed, 'per_second': candidates / elapsed,
+                  'per_minute': candidates / elapsed * 60},
+        'delta_mismatches': mismatches,
+        'improve': {'seconds': improve, 'moves': len(applied), 'before': before, 'after': after},
+        'stored_matches': abs(stored['total'] - after['total']) <= TOLERANCE
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Soft-constraint timetable scoring and local search (SQLite)')
+    parser.add_argument('--profile', choices=sorted(PROFILES), default='small')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--candidates', type=int, default=CANDIDATES)
+    parser.add_argument('--checks', type=int, default=CHECKS)
+    parser.add_argument('--max-passes', type=int, default=10)
+    arguments = parser.parse_args()
+
+    data = generate(arguments.profile, arguments.seed)
+
+    with tempfile.TemporaryDirectory() as directory:
+        benchmark = Benchmark(data, f'sqlite:///{os.path.join(directory, "quality.db")}')
+
+        try:
+            results = run(benchmark, arguments.candidates, arguments.checks, arguments.max_passes)
+
+        finally:
+            benchmark.session.close()
+            database.configure()
+
+    print(json.dumps({'meta': {'profile': arguments.profile, 'seed': arguments.seed, 'counts': data.counts()},
+                      'quality': results}, indent=2))
+
+    return 0 if results['delta_mismatches'] == 0 and results['stored_matches'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -7,3 +7,24 @@ DATABASE_URL = (
     f'mariadb://{DATABASE_USERNAME}:{DATABASE_PASSWORD}'
     f'@{DATABASE_HOST}/{DATABASE_NAME}'
 )
+
+#* connection pool (ignored for SQLite)
+DATABASE_POOL_SIZE = 5
+DATABASE_MAX_OVERFLOW = 10
+DATABASE_POOL_TIMEOUT = 30
+DATABASE_POOL_RECYCLE = 3600 #* seconds, recycle before the server closes idle connections
+DATABASE_POOL_PRE_PING = True
+
+#* read replicas of DATABASE_URL; SELECTs go there round-robin until a session writes (empty: primary only)
+REPLICA_DATABASE_URLS = []
+REPLICA_HEALTH_CHECK_INTERVAL = 5 #* seconds between two SELECT 1 on a replica in use
+REPLICA_RETRY_INTERVAL = 30 #* seconds a replica that failed its check is left out
+
+#* seconds between SQL-per-controller-method summaries in the log (None disables the instrumentation)
+QUERY_INSTRUMENTATION_INTERVAL = None
+
+#* asyncio controllers (app/controllers/async_logic), e.g. 'sqlite+aiosqlite:///local.db' for local tests
+ASYNC_DATABASE_URL = (
+    f'mysql+asyncmy://{DATABASE_USERNAME}:{DATABASE_PASSWORD}'
+    f'@{DATABASE_HOST}/{DATABASE_NAME}'
+)
@@ -0,0 +1,27 @@
+import argparse
+import os
+import sys
+
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+#* same import roots as the application (models.X / controllers.X and app.models.database)
+for path in (ROOT, os.path.join(ROOT, 'app')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from controllers.ui.http_server import HOST, PORT, serve
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Serve the schedule API over HTTP')
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--quiet', action='store_true', help="don't log every request")
+    arguments = parser.parse_args()
+
+    serve(arguments.host, arguments.port, not arguments.quiet)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,21 @@
+-- Unique keys backing the duplicate checks of the controllers (create() inserts with
+-- ON CONFLICT / ON DUPLICATE KEY against them) plus the indexes used by lookups and timetables.
+-- Remove duplicated rows before applying it, otherwise the unique indexes cannot be created.
+
+CREATE UNIQUE INDEX career_name_uq ON career (name);
+
+CREATE UNIQUE INDEX student_identification_number_uq ON student (identification_number);
+
+CREATE UNIQUE INDEX teacher_identification_number_uq ON teacher (identification_number);
+
+CREATE UNIQUE INDEX schedule_block_uq ON schedule (day, start_time, end_time);
+
+CREATE UNIQUE INDEX subject_name_uq ON subject (name);
+CREATE INDEX subject_career_course_idx ON subject (career_id, course);
+
+CREATE UNIQUE INDEX subject_schedule_section_uq ON subject_schedule (subject_id, section);
+CREATE UNIQUE INDEX subject_schedule_teacher_schedule_uq ON subject_schedule (teacher_id, schedule_id);
+CREATE INDEX subject_schedule_schedule_idx ON subject_schedule (schedule_id);
+
+CREATE UNIQUE INDEX student_subject_enrollment_uq ON student_subject (student_id, subject_schedule_id);
+CREATE INDEX student_subject_subject_schedule_idx ON student_subject (subject_schedule_id);
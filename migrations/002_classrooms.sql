@@ -0,0 +1,22 @@
+-- Classrooms and the room of every section (assigned by SubjectScheduleController.assign_classrooms).
+-- A room can't hold two sections in the same block; overlapping blocks are checked by the assignment.
+
+CREATE TABLE IF NOT EXISTS classroom (
+  id INT NOT NULL AUTO_INCREMENT,
+  name VARCHAR(75) NOT NULL,
+  capacity INT NOT NULL,
+  type VARCHAR(30) NOT NULL,
+
+  CONSTRAINT classroom_pk PRIMARY KEY (id)
+);
+
+CREATE UNIQUE INDEX classroom_name_uq ON classroom (name);
+
+ALTER TABLE subject ADD COLUMN classroom_type VARCHAR(30) NULL;
+
+ALTER TABLE subject_schedule ADD COLUMN classroom_id INT NULL;
+
+ALTER TABLE subject_schedule ADD CONSTRAINT subject_schedule_classroom_id_fk FOREIGN KEY (classroom_id)
+  REFERENCES classroom (id);
+
+CREATE UNIQUE INDEX subject_schedule_classroom_uq ON subject_schedule (classroom_id, schedule_id);
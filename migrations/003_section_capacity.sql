@@ -0,0 +1,10 @@
+-- Seats per section. enrolled is the number of student_subject rows of the section, kept up to date by
+-- the enrollment paths so a seat can be reserved with one conditional UPDATE (capacity NULL: no limit).
+
+ALTER TABLE subject_schedule ADD COLUMN capacity INT NULL;
+
+ALTER TABLE subject_schedule ADD COLUMN enrolled INT NOT NULL DEFAULT 0;
+
+UPDATE subject_schedule SET enrolled = (
+  SELECT COUNT(*) FROM student_subject WHERE student_subject.subject_schedule_id = subject_schedule.id
+);
@@ -0,0 +1,6 @@
+-- Teacher availability and preference as SlotGrid bitmasks over the week (5 minute slots, little-endian
+-- bytes, see app/utils/slot_grid.py). NULL availability: available all week; NULL preference: none.
+
+ALTER TABLE teacher ADD COLUMN availability BLOB NULL;
+
+ALTER TABLE teacher ADD COLUMN preference BLOB NULL;
@@ -0,0 +1,9 @@
+-- Versions of the cached timetables (app/utils/versions.py): writers bump them in the transaction of the
+-- write, the API turns them into ETags, so every process sees the same tags. A missing row is version 0.
+
+CREATE TABLE IF NOT EXISTS timetable_version (
+  name VARCHAR(150) NOT NULL,
+  version BIGINT NOT NULL DEFAULT 0,
+
+  CONSTRAINT timetable_version_pk PRIMARY KEY (name)
+);
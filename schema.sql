@@ -1,3 +1,5 @@
+-- Base schema. Apply the versioned migrations in migrations/ on top of it with: python -m app.models.migrations
+
 CREATE TABLE IF NOT EXISTS career (
   id INT NOT NULL AUTO_INCREMENT,
   name VARCHAR(150) NOT NULL,
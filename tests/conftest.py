@@ -0,0 +1,65 @@
+import os
+import sys
+from datetime import time
+
+import pytest
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+#* same import roots as the application (models.X / controllers.X and app.models.database)
+for path in (ROOT, os.path.join(ROOT, 'app')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from app.models import database
+
+from models.career import Career
+from models.teacher import Teacher
+from models.schedule import Schedule
+from models.subject import Subject
+from models.student import Student
+from models.subject_schedule import SubjectSchedule
+from models.student_subject import StudentSubject
+from models.classroom import Classroom
+from models.timetable_version import TimetableVersion
+
+from utils.cache import clear_caches
+from utils.search_index import clear_search_indexes
+
+
+@pytest.fixture
+def session(tmp_path):
+    #* the async controllers reach the same file through aiosqlite
+    database.configure(f'sqlite:///{tmp_path / "test.db"}', async_database_url=f'sqlite+aiosqlite:///{tmp_path / "test.db"}')
+    database.Base.metadata.create_all(database.get_engine())
+
+    clear_caches()
+    clear_search_indexes()
+
+    session = database.Session()
+
+    yield session
+
+    session.close()
+    database.configure()
+
+
+#* one career, course 1, three subjects, three teachers, two students and five blocks; the first two
+#* blocks overlap (08:00-10:00 and 09:00-11:00)
+@pytest.fixture
+def university(session):
+    session.add(Career(id=1, name='Informatica'))
+    session.add_all([Teacher(id=id, name=f'Teacher {id}', identification_number=f'V{id}') for id in (1, 2, 3)])
+    session.add_all([Student(id=id, name=f'Student {id}', identification_number=f'E{id}') for id in (1, 2)])
+    session.add_all([Subject(id=id, name=f'Subject {id}', course=1, career_id=1) for id in (1, 2, 3)])
+    session.add_all([
+        Schedule(id=1, day='Lunes', start_time=time(8, 0), end_time=time(10, 0)),
+        Schedule(id=2, day='Lunes', start_time=time(9, 0), end_time=time(11, 0)),
+        Schedule(id=3, day='Lunes', start_time=time(11, 0), end_time=time(13, 0)),
+        Schedule(id=4, day='Martes', start_time=time(8, 0), end_time=time(10, 0)),
+        Schedule(id=5, day='Miercoles', start_time=time(8, 0), end_time=time(10, 0))
+    ])
+    session.commit()
+
+    return session
@@ -0,0 +1,166 @@
+import asyncio
+
+import pytest
+from sqlalchemy import func, select
+
+from app.models import database
+
+from controllers.async_logic.career_controller import AsyncCareerController
+from controllers.async_logic.subject_controller import AsyncSubjectController
+from controllers.async_logic.schedule_controller import AsyncScheduleController
+from controllers.async_logic.teacher_controller import AsyncTeacherController
+from controllers.async_logic.subject_schedule_controller import AsyncSubjectScheduleController
+from controllers.async_logic.student_subject_controller import AsyncStudentSubjectController
+from controllers.logic.teacher_controller import TeacherController
+
+from models.subject_schedule import SubjectSchedule
+from models.student_subject import StudentSubject
+
+from utils.exceptions import (ObjectAlreadyExistsException, ObjectNotFoundException, ScheduleConflictException,
+                              SectionFullException)
+from utils.versions import VersionCounter
+
+
+@pytest.fixture
+def runner():
+    with asyncio.Runner() as runner:
+        yield runner
+
+
+#* an AsyncSession on the university database; the sync session ends its transaction first, or
+#* its read lock would keep the async writes waiting
+@pytest.fixture
+def async_session(university, runner):
+    university.commit()
+
+    session = database.AsyncSession()
+
+    yield session
+
+    runner.run(session.close())
+    runner.run(database.get_async_engine().dispose())
+
+
+#* a controller whose get_by_id waits for the other lookups: it only returns if they all run at once
+def _waiting(controller, barrier):
+    class Waiting(controller):
+        async def get_by_id(self, id):
+            await barrier.wait()
+
+            return await super().get_by_id(id)
+
+    return Waiting
+
+
+def _seats(session, subject_schedule_id):
+    rows = session.scalar(select(func.count()).select_from(StudentSubject)
+                          .where(StudentSubject.subject_schedule_id == subject_schedule_id))
+    enrolled = session.scalar(select(SubjectSchedule.enrolled).where(SubjectSchedule.id == subject_schedule_id))
+
+    session.commit()
+
+    return rows, enrolled
+
+
+def test_not_found_and_already_exists(university, runner, async_session):
+    with pytest.raises(ObjectAlreadyExistsException):
+        runner.run(AsyncCareerController(async_session).create(' Informatica '))
+
+    with pytest.raises(ObjectNotFoundException):
+        runner.run(AsyncCareerController(async_session).get_by_id(99))
+
+    controller = AsyncSubjectScheduleController(async_session)
+
+    with pytest.raises(ObjectNotFoundException):
+        runner.run(controller.create({'section': 'A', 'subject_id': 1, 'schedule_id': 1, 'teacher_id': 99}))
+
+    runner.run(controller.create({'section': 'A', 'subject_id': 1, 'schedule_id': 1, 'teacher_id': 1}))
+
+    with pytest.raises(ObjectAlreadyExistsException):
+        runner.run(controller.create({'section': 'A', 'subject_id': 1, 'schedule_id': 4, 'teacher_id': 2}))
+
+    enrollments = AsyncStudentSubjectController(async_session)
+    runner.run(enrollments.create({'student_id': 1, 'subject_schedule_id': 1}))
+
+    with pytest.raises(ObjectAlreadyExistsException):
+        runner.run(enrollments.create({'student_id': 1, 'subject_schedule_id': 1}))
+
+    with pytest.raises(ObjectNotFoundException):
+        runner.run(enrollments.create({'student_id': 99, 'subject_schedule_id': 1}))
+
+
+def test_validation_lookups_run_concurrently(university, runner, async_session):
+    barrier = asyncio.Barrier(3)
+    controller = AsyncSubjectScheduleController(async_session, subject_controller=_waiting(AsyncSubjectController, barrier),
+                                                schedule_controller=_waiting(AsyncScheduleController, barrier),
+                                                teacher_controller=_waiting(AsyncTeacherController, barrier))
+
+    data = {'section': 'A', 'subject_id': 1, 'schedule_id': 1, 'teacher_id': 1}
+
+    #* run one after another, the first lookup would wait for the barrier forever
+    runner.run(asyncio.wait_for(controller.create(data), timeout=5))
+
+    assert university.scalar(select(SubjectSchedule.teacher_id).where(SubjectSchedule.subject_id == 1)) == 1
+
+
+def test_overlapping_block_and_unavailable_teacher_are_rejected(university, runner, async_session):
+    TeacherController(university).set_availability(2, [('Martes', '07:00', '12:00')])
+    university.commit()
+
+    controller = AsyncSubjectScheduleController(async_session)
+    runner.run(controller.create({'section': 'A', 'subject_id': 1, 'schedule_id': 1, 'teacher_id': 1}))
+
+    #* block 2 (09:00-11:00) is another row than block 1 (08:00-10:00), but overlaps it
+    with pytest.raises(ObjectAlreadyExistsException):
+        runner.run(controller.create({'section': 'A', 'subject_id': 2, 'schedule_id': 2, 'teacher_id': 1}))
+
+    with pytest.raises(ScheduleConflictException):
+        runner.run(controller.create({'section': 'A', 'subject_id': 2, 'schedule_id': 3, 'teacher_id': 2}))
+
+    runner.run(controller.create({'section': 'A', 'subject_id': 2, 'schedule_id': 4, 'teacher_id': 2}))
+
+
+def test_enrollment_takes_a_seat_and_never_oversubscribes(university, runner, async_session):
+    runner.run(AsyncSubjectScheduleController(async_session).create(
+        {'section': 'A', 'subject_id': 1, 'schedule_id': 1, 'teacher_id': 1, 'capacity': 1}))
+
+    assert university.scalar(select(SubjectSchedule.capacity).where(SubjectSchedule.id == 1)) == 1
+    university.commit()
+
+    controller = AsyncStudentSubjectController(async_session)
+    runner.run(controller.create({'student_id': 1, 'subject_schedule_id': 1}))
+
+    with pytest.raises(SectionFullException):
+        runner.run(controller.create({'student_id': 2, 'subject_schedule_id': 1}))
+
+    #* a rejected duplicate gives its seat back
+    with pytest.raises(ObjectAlreadyExistsException):
+        runner.run(controller.create({'student_id': 1, 'subject_schedule_id': 1}))
+
+    assert _seats(university, 1) == (1, 1)
+
+
+def test_async_writes_bump_the_timetable_versions(university, runner, async_session):
+    versions = VersionCounter('timetable')
+
+    def etags():
+        tags = versions.etag(university, ('student', 1)), versions.etag(university, ('student', 2))
+        university.commit()
+
+        return tags
+
+    before = etags()
+
+    runner.run(AsyncSubjectScheduleController(async_session).create(
+        {'section': 'A', 'subject_id': 1, 'schedule_id': 1, 'teacher_id': 1}))
+
+    created = etags()
+
+    assert created[0] != before[0] and created[1] != before[1]
+
+    runner.run(AsyncStudentSubjectController(async_session).create({'student_id': 1, 'subject_schedule_id': 1}))
+
+    enrolled = etags()
+
+    assert enrolled[0] != created[0]
+    assert enrolled[1] == created[1]
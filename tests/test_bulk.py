@@ -0,0 +1,36 @@
+from models.subject import Subject
+
+from utils.bulk import BulkResult, bulk_insert, chunked
+
+
+def test_chunked_splits_in_order():
+    assert list(chunked(list(range(5)), 2)) == [[0, 1], [2, 3], [4]]
+
+
+def test_row_by_row_retry_tells_missing_references_from_duplicates(university):
+    rows = [
+        (0, {'name': 'Subject 4', 'course': 1, 'career_id': 1}),
+        (1, {'name': 'Subject 1', 'course': 1, 'career_id': 1}),
+        (2, {'name': 'Subject 5', 'course': 1, 'career_id': 99})
+    ]
+    result = BulkResult()
+
+    bulk_insert(university, Subject, rows, result)
+
+    assert [position for position, _ in result.created] == [0]
+    assert {position: reason for position, _, reason in result.rejected} == {
+        1: 'already exists',
+        2: 'references a row that does not exist'
+    }
+
+
+def test_before_commit_sees_the_rows_being_committed(university):
+    seen = []
+    result = BulkResult()
+
+    bulk_insert(university, Subject, [(0, {'name': 'Subject 1', 'course': 1, 'career_id': 1}),
+                                      (1, {'name': 'Subject 4', 'course': 1, 'career_id': 1})],
+                result, before_commit=lambda created: seen.extend(position for position, _ in created))
+
+    assert seen == [1]
+    assert [position for position, _ in result.created] == [1]
@@ -0,0 +1,92 @@
+from controllers.logic.career_controller import CareerController
+
+from models.career import Career
+
+from utils import cache as cache_module
+from utils.cache import MISSING, LRUCache, cached_lookup, get_cache
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = LRUCache(maxsize=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+
+    assert cache.get('a') == 1
+
+    cache.set('c', 3)
+
+    assert cache.get('b') is MISSING
+    assert cache.get('a') == 1 and cache.get('c') == 3
+    assert cache.stats()['evictions'] == 1
+
+
+def test_entries_expire_after_the_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(cache_module, 'monotonic', lambda: now[0])
+
+    cache = LRUCache(ttl=10)
+    cache.set('a', 1)
+
+    now[0] = 109.0
+
+    assert cache.get('a') == 1
+
+    now[0] = 111.0
+
+    assert cache.get('a') is MISSING
+    assert len(cache) == 0
+
+
+def test_stats_count_hits_and_misses():
+    cache = LRUCache()
+    cache.set('a', 1)
+    cache.get('a')
+    cache.get('b')
+
+    assert cache.stats() | {'maxsize': None} == {'hits': 1, 'misses': 1, 'evictions': 0, 'size': 1,
+                                                'maxsize': None, 'hit_rate': 0.5}
+
+
+def test_invalidate_and_clear():
+    cache = LRUCache()
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.invalidate('a', 'missing')
+
+    assert cache.get('a') is MISSING and cache.get('b') == 2
+
+    cache.clear()
+
+    assert len(cache) == 0
+
+
+def test_caches_are_shared_by_name():
+    assert get_cache('test_shared') is get_cache('test_shared')
+    assert get_cache('test_shared') is not get_cache('test_other')
+
+
+def test_cached_lookup_loads_once_and_attaches_to_the_session(university):
+    cache = LRUCache()
+    calls = []
+
+    def loader():
+        calls.append(1)
+
+        return university.get(Career, 1)
+
+    first = cached_lookup(university, cache, ('id', 1), loader)
+    university.expunge_all()
+    second = cached_lookup(university, cache, ('id', 1), loader)
+
+    assert len(calls) == 1
+    assert second is not first and second in university
+    assert (second.id, second.name) == (1, 'Informatica')
+
+
+def test_controller_update_invalidates_its_entries(university):
+    controller = CareerController(university)
+
+    controller.get_by_id(1)
+    controller.update('Informatica', 'Sistemas')
+
+    assert controller.get_by_id(1).name == 'Sistemas'
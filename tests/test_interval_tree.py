@@ -0,0 +1,57 @@
+import random
+from datetime import time
+
+from utils.interval_tree import IntervalTree, ScheduleIndex
+
+
+def test_overlapping_matches_a_linear_scan():
+    rng = random.Random(0)
+    intervals = []
+
+    for value in range(300):
+        start = rng.randrange(0, 1000)
+        intervals.append((start, start + rng.randrange(1, 120), value))
+
+    tree = IntervalTree(intervals)
+
+    for _ in range(200):
+        start = rng.randrange(0, 1100)
+        end = start + rng.randrange(1, 200)
+
+        expected = {value for item_start, item_end, value in intervals if item_start < end and item_end > start}
+
+        assert set(tree.overlapping(start, end)) == expected
+
+
+def test_intervals_are_half_open():
+    tree = IntervalTree([(8, 10, 'a')])
+
+    assert tree.overlapping(10, 12) == []
+    assert tree.overlapping(6, 8) == []
+    assert tree.overlapping(9, 11) == ['a']
+
+
+def test_add_after_a_query_is_seen_by_the_next_one():
+    tree = IntervalTree([(8, 10, 'a')])
+
+    assert tree.overlapping(9, 12) == ['a']
+
+    tree.add(11, 13, 'b')
+
+    assert sorted(tree.overlapping(9, 12)) == ['a', 'b']
+    assert len(tree) == 2
+
+
+def test_empty_tree_overlaps_nothing():
+    assert IntervalTree().overlapping(0, 10) == []
+
+
+def test_schedule_index_keeps_one_tree_per_day():
+    index = ScheduleIndex()
+    index.add('Lunes', time(8, 0), time(10, 0), 1)
+    index.add('Lunes', time(9, 0), time(11, 0), 2)
+    index.add('Martes', time(8, 0), time(10, 0), 3)
+
+    assert sorted(index.overlapping('Lunes', time(9, 30), time(9, 45))) == [1, 2]
+    assert index.overlapping('Martes', time(10, 0), time(11, 0)) == []
+    assert index.overlapping('Miercoles', time(8, 0), time(10, 0)) == []
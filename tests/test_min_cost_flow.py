@@ -0,0 +1,59 @@
+import random
+from itertools import permutations
+
+from utils.min_cost_flow import MinCostFlow
+
+
+def _assignment(costs):
+    #* workers x jobs, one each, from source 0 to sink 1; returns the graph and its (worker, job, edge) triples
+    flow = MinCostFlow(2)
+    workers = [flow.add_node() for _ in costs]
+    jobs = [flow.add_node() for _ in costs[0]]
+    edges = []
+
+    for worker, row in zip(workers, costs):
+        flow.add_edge(0, worker, 1)
+
+        for job, cost in zip(jobs, row):
+            edges.append((worker, job, flow.add_edge(worker, job, 1, cost)))
+
+    for job in jobs:
+        flow.add_edge(job, 1, 1)
+
+    return flow, edges
+
+
+def test_cheapest_assignment_matches_brute_force():
+    rng = random.Random(0)
+
+    for _ in range(30):
+        size = rng.randrange(1, 6)
+        costs = [[rng.randrange(0, 20) for _ in range(size)] for _ in range(size)]
+
+        flow, edges = _assignment(costs)
+
+        assert flow.solve(0, 1) == (size, min(sum(costs[worker][job] for worker, job in enumerate(order))
+                                              for order in permutations(range(size))))
+        assert sum(flow.flow_on(edge) for _, _, edge in edges) == size
+
+
+def test_limit_stops_at_the_cheapest_partial_flow():
+    flow, _ = _assignment([[1, 5], [2, 9]])
+
+    assert flow.solve(0, 1, limit=1) == (1, 1)
+
+
+def test_capacities_bound_the_flow():
+    flow = MinCostFlow(3)
+    first = flow.add_edge(0, 2, 5, 1)
+    second = flow.add_edge(2, 1, 3, 1)
+
+    assert flow.solve(0, 1) == (3, 6)
+    assert (flow.flow_on(first), flow.flow_on(second)) == (3, 3)
+
+
+def test_no_path_means_no_flow():
+    flow = MinCostFlow(3)
+    flow.add_edge(0, 2, 1, 1)
+
+    assert flow.solve(0, 1) == (0, 0)
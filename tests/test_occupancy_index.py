@@ -0,0 +1,75 @@
+import pytest
+
+from utils.exceptions import ObjectNotFoundException
+from utils.occupancy_index import OccupancyIndex
+
+
+def _index():
+    #* blocks 1 and 2 overlap (e.g. 08:00-10:00 and 09:00-11:00), block 3 overlaps nothing
+    index = OccupancyIndex(schedule_ids=[1, 2, 3], teacher_ids=[1, 2], subject_ids=[1, 2])
+    index.add_schedule(2, [1])
+
+    return index
+
+
+def test_overlapping_blocks_share_a_conflict_mask():
+    index = _index()
+
+    assert index.conflict_mask(1) == index.bit(1) | index.bit(2)
+    assert index.conflict_mask(3) == index.bit(3)
+
+
+def test_a_teacher_is_busy_in_every_block_overlapping_a_taught_one():
+    index = _index()
+    index.add({'subject_id': 1, 'section': 'A', 'schedule_id': 1, 'teacher_id': 1})
+
+    assert not index.is_teacher_free(1, 1)
+    assert not index.is_teacher_free(1, 2)
+    assert index.is_teacher_free(1, 3)
+    assert index.is_teacher_free(2, 2)
+
+    assert index.conflicts({'subject_id': 2, 'section': 'A', 'schedule_id': 2, 'teacher_id': 1})
+    assert index.conflicts({'subject_id': 1, 'section': 'A', 'schedule_id': 3, 'teacher_id': 2})
+    assert not index.conflicts({'subject_id': 2, 'section': 'A', 'schedule_id': 3, 'teacher_id': 1})
+
+
+def test_overlap_added_later_blocks_teachers_already_placed():
+    index = OccupancyIndex(schedule_ids=[1, 2], teacher_ids=[1])
+    index.add({'subject_id': 1, 'section': 'A', 'schedule_id': 1, 'teacher_id': 1})
+
+    assert index.is_teacher_free(1, 2)
+
+    index.add_schedule(2, [1])
+
+    assert not index.is_teacher_free(1, 2)
+
+
+def test_remove_frees_the_overlapping_blocks_again():
+    index = _index()
+    row = {'subject_id': 1, 'section': 'A', 'schedule_id': 1, 'teacher_id': 1}
+
+    index.add(row)
+    index.remove(row)
+
+    assert index.is_teacher_free(1, 2)
+    assert not index.section_exists(1, 'A')
+
+
+def test_unavailable_blocks_are_blocked_but_not_taught():
+    index = _index()
+    index.set_teacher_slots(1, unavailable=index.bit(3), preferred=index.bit(1))
+
+    assert not index.is_teacher_available(1, 3)
+    assert not index.is_teacher_free(1, 3)
+    assert index.teacher_mask(1) == 0
+    assert index.teacher_preferred(1) == index.bit(1)
+
+
+def test_unknown_ids_raise_not_found():
+    index = _index()
+
+    with pytest.raises(ObjectNotFoundException):
+        index.position(99)
+
+    with pytest.raises(ObjectNotFoundException):
+        index.teacher_mask(99)
@@ -0,0 +1,75 @@
+import pytest
+
+from models.student import Student
+from models.subject import Subject
+
+from utils.pagination import MAX_PAGE_SIZE, get_page, iter_all
+
+
+@pytest.fixture
+def students(session):
+    session.add_all([Student(id=id, name=f'Student {id}', identification_number=f'E{id}') for id in range(1, 8)])
+    session.commit()
+
+    return session
+
+
+def test_pages_walk_every_row_once_in_id_order(students):
+    ids = []
+    after_id = None
+
+    while True:
+        page = get_page(students, Student, after_id, page_size=3)
+        ids.extend(student.id for student in page)
+
+        if not page.has_more:
+            break
+
+        after_id = page.next_after_id
+
+    assert ids == list(range(1, 8))
+
+
+def test_last_full_page_has_no_next_page(students):
+    page = get_page(students, Student, after_id=4, page_size=3)
+
+    assert [student.id for student in page] == [5, 6, 7]
+    assert page.next_after_id is None
+
+
+def test_rows_inserted_before_the_cursor_do_not_shift_pages(students):
+    first = get_page(students, Student, page_size=3)
+
+    students.add(Student(id=0, name='Student 0', identification_number='E0'))
+    students.commit()
+
+    second = get_page(students, Student, first.next_after_id, page_size=3)
+
+    assert [student.id for student in second] == [4, 5, 6]
+
+
+def test_filters_apply_to_every_page(university):
+    university.add_all([Subject(id=id, name=f'Subject {id}', course=2, career_id=1) for id in (4, 5, 6)])
+    university.commit()
+
+    page = get_page(university, Subject, page_size=2, course=2)
+
+    assert [subject.id for subject in page] == [4, 5]
+    assert [subject.id for subject in get_page(university, Subject, page.next_after_id, page_size=2, course=2)] == [6]
+    assert [subject.id for subject in get_page(university, Subject, id=[1, 5])] == [1, 5]
+
+
+def test_invalid_page_size_and_filter_are_rejected(students):
+    with pytest.raises(ValueError):
+        get_page(students, Student, page_size=0)
+
+    with pytest.raises(ValueError):
+        get_page(students, Student, page_size=MAX_PAGE_SIZE + 1)
+
+    with pytest.raises(ValueError):
+        get_page(students, Student, password='x')
+
+
+def test_iter_all_streams_every_row(students):
+    assert [student.id for student in iter_all(students, Student, batch_size=2)] == list(range(1, 8))
+    assert [student.id for student in iter_all(students, Student, batch_size=2, id=(2, 3))] == [2, 3]
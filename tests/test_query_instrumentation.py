@@ -0,0 +1,86 @@
+import pytest
+from sqlalchemy import select
+
+from app.models import database
+
+from controllers.logic.student_controller import StudentController
+from controllers.logic.timetable_controller import TimetableController
+
+from models.student import Student
+
+from utils import query_instrumentation
+from utils.query_instrumentation import UNATTRIBUTED, instrument, statement_shape
+
+
+#* counts this module as a controller module: the test itself is then the outermost controller
+#* frame, and every statement it runs belongs to one call charged to it
+@pytest.fixture
+def as_controller(monkeypatch):
+    monkeypatch.setattr(query_instrumentation, 'CONTROLLER_MODULES', (*query_instrumentation.CONTROLLER_MODULES, __name__))
+
+
+def _students(session):
+    session.add_all([Student(id=id, name=f'Student {id}', identification_number=f'E{id}') for id in range(3, 9)])
+    session.commit()
+
+    #* opens the next transaction now, or its BEGIN (emitted by the engine on SQLite) would be counted
+    session.connection()
+
+
+def test_in_lists_of_any_length_have_the_same_shape():
+    assert statement_shape('SELECT id FROM student WHERE id IN (?, ?, ?)') == statement_shape(
+        'SELECT id\n  FROM student WHERE id IN (?, ?)')
+
+
+def test_loop_of_lookups_is_reported_as_n_plus_one(university, as_controller):
+    _students(university)
+    controller = StudentController(university)
+
+    with instrument(database.get_engine()) as queries:
+        names = [controller.get_by_id(id).name for id in range(1, 9)]
+
+    assert names == [f'Student {id}' for id in range(1, 9)]
+
+    finding, = queries.n_plus_one()
+
+    assert finding['count'] == 8
+    assert 'FROM student' in finding['statement']
+
+    stats = queries.stats()
+
+    assert finding['method'] == 'test_loop_of_lookups_is_reported_as_n_plus_one'
+    assert stats[finding['method']]['calls'] == 1
+    assert stats[finding['method']]['statements'] == 8
+
+
+def test_single_joined_query_is_not_reported(university, as_controller):
+    _students(university)
+
+    with instrument(database.get_engine()) as queries:
+        names = university.execute(select(Student.name).where(Student.id.in_(range(1, 9))).order_by(Student.id)).scalars().all()
+
+    assert names == [f'Student {id}' for id in range(1, 9)]
+    assert queries.n_plus_one() == []
+    assert queries.statement_count() == 1
+
+
+def test_statements_are_counted_per_controller_method(university):
+    _students(university)
+    controller = StudentController(university)
+
+    with instrument(database.get_engine()) as queries:
+        for id in range(1, 7):
+            controller.get_by_id(id)
+
+        TimetableController(university).get_by_student(1)
+        university.scalar(select(Student.id).limit(1))
+
+    stats = queries.stats()
+
+    #* six calls of one statement each are not an N+1
+    assert stats['StudentController.get_by_id']['calls'] == 6
+    assert stats['StudentController.get_by_id']['statements_per_call'] == 1
+    assert queries.statement_count('TimetableController.get_by_student') == 2
+    assert queries.statement_count(UNATTRIBUTED) == 1
+    assert queries.statement_count() == 9
+    assert queries.n_plus_one() == []
@@ -0,0 +1,86 @@
+import pytest
+from sqlalchemy import select, create_engine
+
+from app.models import database
+from app.models.replicas import ReplicaSet
+
+from models.career import Career
+
+
+#* two SQLite files stand in for the primary and its replica; each holds one career named after it,
+#* so every read shows where it went
+@pytest.fixture
+def primary_and_replica(tmp_path):
+    database.configure(f'sqlite:///{tmp_path / "primary.db"}', replica_database_urls=[f'sqlite:///{tmp_path / "replica.db"}'])
+
+    for engine, name in ((database.get_engine(), 'primary'), (database.get_replicas().engines[0], 'replica')):
+        database.Base.metadata.create_all(engine)
+
+        with engine.begin() as connection:
+            connection.execute(Career.__table__.insert(), {'id': 1, 'name': name})
+
+    yield
+
+    database.configure()
+
+
+def _read(session):
+    return session.scalar(select(Career.name).where(Career.id == 1))
+
+
+def test_reads_go_to_the_replica(primary_and_replica):
+    session = database.Session()
+
+    assert _read(session) == 'replica'
+    assert session.scalars(select(Career.name)).all() == ['replica']
+
+    session.close()
+
+
+def test_reads_stay_on_the_primary_after_a_flush(primary_and_replica):
+    session = database.Session()
+
+    assert _read(session) == 'replica'
+
+    session.add(Career(id=2, name='Electronica'))
+    session.flush()
+
+    assert _read(session) == 'primary'
+    assert session.scalar(select(Career.name).where(Career.id == 2)) == 'Electronica'
+
+    session.close()
+
+
+def test_reads_stay_on_the_primary_after_a_commit(primary_and_replica):
+    session = database.Session()
+
+    session.add(Career(id=2, name='Electronica'))
+    session.commit()
+
+    assert session.scalar(select(Career.name).where(Career.id == 2)) == 'Electronica'
+    assert _read(session) == 'primary'
+
+    #* a new request (session) starts on the replica again
+    session.close()
+
+    assert _read(session) == 'replica'
+
+    session.close()
+
+
+def test_locking_reads_go_to_the_primary(primary_and_replica):
+    session = database.Session()
+
+    assert session.scalar(select(Career.name).where(Career.id == 1).with_for_update()) == 'primary'
+
+    session.close()
+
+
+def test_reads_fall_back_to_the_primary_when_every_replica_is_down(primary_and_replica, tmp_path):
+    broken = create_engine(f'sqlite:///{tmp_path / "missing" / "replica.db"}')
+    session = database.Session(replicas=ReplicaSet([broken]))
+
+    assert _read(session) == 'primary'
+
+    session.close()
+    broken.dispose()
@@ -0,0 +1,44 @@
+from datetime import time
+
+from utils.room_assignment import RoomAssigner
+
+
+ROOMS = [(1, 30, 'Aula'), (2, 60, 'Aula'), (3, 30, 'Laboratorio')]
+
+
+def test_sections_get_the_rooms_that_waste_the_fewest_seats():
+    assigner = RoomAssigner(ROOMS)
+
+    assignment = assigner.assign_block('Lunes', time(8, 0), time(10, 0), 1, [(10, 50, None), (11, 25, 'Aula')])
+
+    assert assignment == {10: 2, 11: 1}
+
+
+def test_required_type_and_size_are_respected():
+    assigner = RoomAssigner(ROOMS)
+
+    assignment = assigner.assign_block('Lunes', time(8, 0), time(10, 0), 1,
+                                       [(10, 20, 'Laboratorio'), (11, 70, None)])
+
+    assert assignment == {10: 3}
+
+
+def test_overlapping_blocks_never_share_a_room():
+    assigner = RoomAssigner([(1, 30, 'Aula')])
+
+    blocks = [(1, 'Lunes', time(8, 0), time(10, 0)), (2, 'Lunes', time(9, 0), time(11, 0)),
+              (3, 'Lunes', time(10, 0), time(12, 0))]
+    sections = {1: [(10, 20, None)], 2: [(11, 20, None)], 3: [(12, 20, None)]}
+
+    assignment, unassigned = assigner.assign(blocks, sections)
+
+    #* 08:00-10:00 and 10:00-12:00 only touch, 09:00-11:00 overlaps both
+    assert assignment == {10: 1, 12: 1}
+    assert unassigned == [11]
+
+
+def test_rooms_taken_beforehand_are_skipped():
+    assigner = RoomAssigner(ROOMS)
+    assigner.occupy('Lunes', time(8, 0), time(10, 0), 1, 1)
+
+    assert assigner.assign_block('Lunes', time(9, 0), time(10, 0), 2, [(10, 20, 'Aula')]) == {10: 2}
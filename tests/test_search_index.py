@@ -0,0 +1,67 @@
+from utils.normalization import fold, normalize_identification_number
+from utils.search_index import IDENTIFICATION_NUMBER_SCORE, SearchIndex, get_search_index
+
+
+def _index():
+    index = SearchIndex()
+    index.load([
+        (1, 'José García Pérez', 'V-12345678'),
+        (2, 'Maria Gonzalez', 'V-87654321'),
+        (3, 'Mariana Garcés'),
+        (4, 'Pedro Martinez')
+    ])
+
+    return index
+
+
+def _ids(results):
+    return [id for id, _ in results]
+
+
+def test_fold_and_normalize():
+    assert fold('  García-Pérez ') == 'garcia perez'
+    assert normalize_identification_number(' v-12345678 ') == 'V12345678'
+
+
+def test_search_ignores_accents_and_case():
+    assert _ids(_index().search('JOSE GARCIA')) == [1]
+
+
+def test_prefixes_match_and_exact_tokens_rank_first():
+    results = _index().search('maria')
+
+    assert _ids(results)[:2] == [2, 3]
+    assert results[0][1] > results[1][1]
+
+
+def test_misspelled_tokens_match_by_trigrams():
+    assert _ids(_index().search('gonzales'))[0] == 2
+    assert _ids(_index().search('martines'))[0] == 4
+
+
+def test_every_query_token_has_to_match_when_some_name_matches_them_all():
+    assert _ids(_index().search('garcia jose')) == [1]
+
+
+def test_identification_number_beats_any_name():
+    results = _index().search('v87654321')
+
+    assert results[0] == (2, IDENTIFICATION_NUMBER_SCORE)
+
+
+def test_add_replaces_and_remove_drops():
+    index = _index()
+    index.add(4, 'Pedro Ramirez')
+
+    assert 4 not in _ids(index.search('martinez'))
+    assert _ids(index.search('ramirez')) == [4]
+
+    index.remove(4)
+
+    assert index.search('ramirez') == []
+    assert len(index) == 3
+
+
+def test_limit_and_shared_indexes():
+    assert len(_index().search('ma', limit=1)) == 1
+    assert get_search_index('test_people') is get_search_index('test_people')
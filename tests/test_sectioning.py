@@ -0,0 +1,56 @@
+from utils.sectioning import CHUNKS_PER_SECTION, Section, SectioningEngine
+
+
+#* blocks 0 and 1 overlap, block 2 overlaps nothing
+BITS = [1 << 0, 1 << 1, 1 << 2]
+CONFLICTS = [BITS[0] | BITS[1], BITS[0] | BITS[1], BITS[2]]
+
+
+def _section(subject_schedule_id, block, capacity=None, enrolled=0):
+    return Section(subject_schedule_id, BITS[block], CONFLICTS[block], capacity, enrolled)
+
+
+def test_sections_come_out_balanced():
+    sections = {1: [_section(10, 0), _section(11, 2)]}
+
+    assigned, unassigned = SectioningEngine(sections).solve({student_id: [1] for student_id in range(100)})
+
+    sizes = [sum(1 for _, id in assigned if id == subject_schedule_id) for subject_schedule_id in (10, 11)]
+
+    #* the load costs go up one chunk at a time, so the sizes can't drift further apart than a chunk
+    assert unassigned == []
+    assert abs(sizes[0] - sizes[1]) <= -(-100 // (2 * CHUNKS_PER_SECTION))
+
+
+def test_capacity_is_never_exceeded():
+    sections = {1: [_section(10, 0, capacity=3, enrolled=1), _section(11, 2, capacity=2)]}
+
+    assigned, unassigned = SectioningEngine(sections).solve({student_id: [1] for student_id in range(6)})
+
+    assert sum(1 for _, id in assigned if id == 10) == 2
+    assert sum(1 for _, id in assigned if id == 11) == 2
+    assert len(unassigned) == 2
+    assert sections[1][0].enrolled == 3
+
+
+def test_students_never_get_overlapping_sections():
+    #* subject 1 only meets in block 0; subject 2 in block 1 (overlaps 0) or block 2
+    sections = {1: [_section(10, 0)], 2: [_section(20, 1), _section(21, 2)]}
+
+    assigned, unassigned = SectioningEngine(sections).solve({student_id: [1, 2] for student_id in range(5)})
+
+    assert unassigned == []
+    assert sorted(id for _, id in assigned) == [10] * 5 + [21] * 5
+
+
+def test_blocks_already_attended_are_avoided():
+    sections = {1: [_section(10, 0), _section(11, 2)]}
+
+    assigned, unassigned = SectioningEngine(sections, busy={1: BITS[1], 2: BITS[2] | BITS[0]}).solve({1: [1], 2: [1]})
+
+    assert assigned == [(1, 11)]
+    assert unassigned == [(2, 1)]
+
+
+def test_subject_without_sections_is_left_unassigned():
+    assert SectioningEngine({}).solve({1: [5]}) == ([], [(1, 5)])
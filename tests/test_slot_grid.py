@@ -0,0 +1,63 @@
+from datetime import time
+
+import pytest
+
+from utils.exceptions import ObjectNotFoundException
+from utils.slot_grid import SlotGrid
+
+
+def test_overlapping_blocks_share_a_slot_and_touching_ones_do_not():
+    grid = SlotGrid()
+
+    assert grid.window('Lunes', '08:00', '10:00') & grid.window('Lunes', '09:55', '11:00')
+    assert not grid.window('Lunes', '08:00', '10:00') & grid.window('Lunes', '10:00', '11:00')
+    assert not grid.window('Lunes', '08:00', '10:00') & grid.window('Martes', '08:00', '10:00')
+
+
+def test_unaligned_times_round_outwards():
+    grid = SlotGrid(resolution=30)
+
+    #* 08:10-08:40 touches the 08:00 and 08:30 slots
+    assert grid.window('Lunes', '08:10', '08:40') == grid.window('Lunes', '08:00', '09:00')
+    assert grid.window('Lunes', '08:00', '08:00').bit_count() == 1
+
+
+def test_windows_turn_a_mask_back_into_runs():
+    grid = SlotGrid()
+    mask = grid.mask([('Lunes', '08:00', '10:00'), ('Lunes', '10:00', '11:00'), ('Viernes', '22:00', '23:59')])
+
+    assert grid.windows(mask) == [('Lunes', time(8, 0), time(11, 0)), ('Viernes', time(22, 0), time(23, 59))]
+
+
+def test_blocks_fit_outside_the_unavailable_slots():
+    grid = SlotGrid(blocks=[(1, 'Lunes', time(8, 0), time(10, 0)), (2, 'Martes', time(8, 0), time(10, 0))])
+    unavailable = grid.unavailable(grid.mask([('Martes', '07:00', '12:00')]))
+
+    assert not grid.fits(1, unavailable)
+    assert grid.fits(2, unavailable)
+    assert grid.fits(1, grid.unavailable(None))
+
+    assert grid.blocks_touching([1, 2, 3], unavailable) == 0b01
+    assert grid.blocks_within([1, 2, 3], grid.mask([('Martes', '07:00', '12:00')])) == 0b10
+
+    with pytest.raises(ObjectNotFoundException):
+        grid.block(3)
+
+
+def test_masks_round_trip_through_fixed_length_bytes():
+    grid = SlotGrid()
+    mask = grid.mask([('Lunes', '08:00', '10:00'), ('Domingo', '23:00', '23:59')])
+    data = grid.to_bytes(mask)
+
+    assert len(data) == (grid.size + 7) // 8
+    assert grid.from_bytes(data) == mask
+    assert grid.to_bytes(None) is None and grid.from_bytes(None) is None
+    assert grid.slot_masks(None, None) == (0, 0)
+
+    with pytest.raises(ValueError):
+        SlotGrid(resolution=30).from_bytes(data)
+
+
+def test_resolution_must_divide_a_day():
+    with pytest.raises(ValueError):
+        SlotGrid(resolution=7)
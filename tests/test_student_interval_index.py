@@ -0,0 +1,47 @@
+from datetime import time
+
+from utils.student_interval_index import StudentIntervalIndex
+
+
+def _index():
+    index = StudentIntervalIndex()
+    index.add(1, 'Lunes', time(8, 0), time(10, 0), 10)
+    index.add(1, 'Lunes', time(11, 0), time(13, 0), 11)
+
+    return index
+
+
+def test_find_clash_checks_both_neighbours():
+    index = _index()
+
+    #* starts inside the earlier block / ends inside the later one
+    assert index.find_clash(1, 'Lunes', time(9, 0), time(10, 30)) == 10
+    assert index.find_clash(1, 'Lunes', time(10, 30), time(11, 30)) == 11
+
+    #* covers a whole block
+    assert index.find_clash(1, 'Lunes', time(10, 30), time(14, 0)) == 11
+
+
+def test_touching_blocks_do_not_clash():
+    index = _index()
+
+    assert index.find_clash(1, 'Lunes', time(10, 0), time(11, 0)) is None
+    assert index.find_clash(1, 'Lunes', time(13, 0), time(14, 0)) is None
+
+
+def test_days_and_students_are_independent():
+    index = _index()
+
+    assert index.find_clash(1, 'Martes', time(8, 0), time(10, 0)) is None
+    assert index.find_clash(2, 'Lunes', time(8, 0), time(10, 0)) is None
+
+
+def test_load_student_marks_a_student_without_enrollments():
+    index = StudentIntervalIndex()
+
+    assert not index.has_student(1)
+
+    index.load_student(1)
+
+    assert index.has_student(1)
+    assert index.find_clash(1, 'Lunes', time(8, 0), time(10, 0)) is None
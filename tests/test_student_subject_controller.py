@@ -0,0 +1,132 @@
+from datetime import time
+
+from sqlalchemy import func, insert, select
+
+from controllers.logic.student_subject_controller import StudentSubjectController
+from controllers.logic.student_controller import StudentController
+from controllers.logic.subject_schedule_controller import SubjectScheduleController
+
+from models.schedule import Schedule
+from models.student import Student
+from models.subject_schedule import SubjectSchedule
+from models.student_subject import StudentSubject
+
+from utils.exceptions import ScheduleConflictException, SectionFullException
+
+
+def _controller(session):
+    return StudentSubjectController(session, student_controller=StudentController(session),
+                                    subject_schedule_controller=SubjectScheduleController(session))
+
+
+def _sections(session, capacity=None):
+    #* section 1 in block 1 (Lunes 08:00-10:00), 2 in block 2 (overlaps 1), 3 in block 4 (Martes)
+    session.add_all([Student(id=id, name=f'Student {id}', identification_number=f'E{id}') for id in (3, 4)])
+    session.add_all([
+        SubjectSchedule(id=1, section='A', subject_id=1, schedule_id=1, teacher_id=1, capacity=capacity),
+        SubjectSchedule(id=2, section='A', subject_id=2, schedule_id=2, teacher_id=2),
+        SubjectSchedule(id=3, section='A', subject_id=3, schedule_id=4, teacher_id=3)
+    ])
+    session.commit()
+
+
+def _seats(session, subject_schedule_id):
+    rows = session.scalar(select(func.count()).select_from(StudentSubject)
+                          .where(StudentSubject.subject_schedule_id == subject_schedule_id))
+
+    return rows, session.scalar(select(SubjectSchedule.enrolled).where(SubjectSchedule.id == subject_schedule_id))
+
+
+def test_create_many_retry_takes_seats_again(university, monkeypatch):
+    _sections(university, capacity=2)
+
+    class Racing(StudentSubjectController):
+        def _reserve_batch(self, rows, result):
+            super()._reserve_batch(rows, result)
+
+            #* a concurrent writer inserted one of the rows: the batch insert fails and rolls back
+            self._session.execute(insert(StudentSubject).values(student_id=1, subject_schedule_id=3))
+
+    rollback = university.rollback
+
+    def rollback_then_fill():
+        rollback()
+
+        #* ... and another one fills section 1 while the seats are released
+        university.execute(insert(StudentSubject), [{'student_id': 3, 'subject_schedule_id': 1},
+                                                    {'student_id': 4, 'subject_schedule_id': 1}])
+        university.execute(SubjectSchedule.__table__.update().where(SubjectSchedule.id == 1).values(enrolled=2))
+        university.commit()
+
+        monkeypatch.setattr(university, 'rollback', rollback)
+
+    monkeypatch.setattr(university, 'rollback', rollback_then_fill)
+
+    controller = Racing(university, student_controller=StudentController(university),
+                        subject_schedule_controller=SubjectScheduleController(university))
+    result = controller.create_many([{'student_id': 2, 'subject_schedule_id': 1},
+                                     {'student_id': 1, 'subject_schedule_id': 3}])
+
+    assert [position for position, _ in result.created] == [1]
+    assert [reason for _, _, reason in result.rejected] == ['Subject_schedule with id 1 has no seats left']
+    assert _seats(university, 1) == (2, 2)
+
+
+def test_enroll_batch_rejects_clashes_and_full_sections(university):
+    _sections(university, capacity=1)
+
+    outcomes = _controller(university).enroll_batch([
+        {'student_id': 1, 'subject_schedule_id': 1},
+        {'student_id': 1, 'subject_schedule_id': 2},
+        {'student_id': 2, 'subject_schedule_id': 1},
+        {'student_id': 2, 'subject_schedule_id': 3}
+    ])
+
+    assert outcomes[0] is None and outcomes[3] is None
+    assert isinstance(outcomes[1], ScheduleConflictException)
+    assert isinstance(outcomes[2], SectionFullException)
+    assert _seats(university, 1) == (1, 1)
+
+
+def test_assign_sections_reserves_seats(university):
+    _sections(university, capacity=1)
+
+    rows, unassigned = _controller(university).assign_sections({1: [1, 3], 2: [1, 3]})
+
+    assert len(rows) == 3
+    assert [subject_id for _, subject_id in unassigned] == [1]
+    assert _seats(university, 1) == (1, 1)
+    assert _seats(university, 3) == (2, 2)
+
+
+def test_find_clashes_reports_every_overlapping_pair(university):
+    #* A [08:00, 10:00), B [09:00, 12:00), C [09:30, 10:30): C overlaps A too, although B ends after A
+    university.add_all([
+        Schedule(id=6, day='Lunes', start_time=time(9, 0), end_time=time(12, 0)),
+        Schedule(id=7, day='Lunes', start_time=time(9, 30), end_time=time(10, 30))
+    ])
+    university.add_all([
+        SubjectSchedule(id=1, section='A', subject_id=1, schedule_id=1, teacher_id=1),
+        SubjectSchedule(id=2, section='A', subject_id=2, schedule_id=6, teacher_id=2),
+        SubjectSchedule(id=3, section='A', subject_id=3, schedule_id=7, teacher_id=3),
+        SubjectSchedule(id=4, section='B', subject_id=1, schedule_id=3, teacher_id=2)
+    ])
+    university.flush()
+    university.execute(insert(StudentSubject), [{'student_id': 1, 'subject_schedule_id': id} for id in (1, 2, 3)]
+                       + [{'student_id': 2, 'subject_schedule_id': id} for id in (1, 4)])
+    university.commit()
+
+    clashes = _controller(university).find_clashes()
+
+    assert {clash['student_id'] for clash in clashes} == {1}
+    assert sorted(clash['subject_schedule_ids'] for clash in clashes) == [(1, 2), (1, 3), (2, 3)]
+
+
+def test_default_controllers_create_and_read(university):
+    _sections(university)
+
+    controller = StudentSubjectController(university)
+    controller.create({'student_id': 1, 'subject_schedule_id': 1})
+
+    assert [row.subject_schedule_id for row in controller.get_by_student(1)] == [1]
+    assert _seats(university, 1) == (1, 1)
@@ -0,0 +1,156 @@
+import pytest
+from sqlalchemy import select
+
+from controllers.logic.subject_schedule_controller import SubjectScheduleController
+from controllers.logic.teacher_controller import TeacherController
+from controllers.logic.subject_controller import SubjectController
+from controllers.logic.schedule_controller import ScheduleController
+
+from models.classroom import Classroom
+from models.subject_schedule import SubjectSchedule
+
+from utils.change_set import ChangeSet
+from utils.exceptions import ObjectAlreadyExistsException, ScheduleConflictException
+
+
+def _controller(session):
+    return SubjectScheduleController(session, subject_controller=SubjectController(session),
+                                     schedule_controller=ScheduleController(session),
+                                     teacher_controller=TeacherController(session))
+
+
+def test_default_controllers_load_the_index_and_generate(university):
+    TeacherController(university).set_availability(1, [('Martes', '07:00', '12:00')])
+
+    controller = SubjectScheduleController(university)
+    index = controller.load_occupancy_index()
+
+    assert not index.is_teacher_available(1, 1)
+    assert index.is_teacher_available(1, 4)
+
+    rows = controller.generate(career_id=1, course=1)
+
+    assert len(rows) == 3
+    assert all(row['schedule_id'] == 4 for row in rows if row['teacher_id'] == 1)
+
+
+def test_default_controllers_create_many_checks_availability(university):
+    TeacherController(university).set_availability(1, [('Martes', '07:00', '12:00')])
+
+    result = SubjectScheduleController(university).create_many([
+        {'section': 'A', 'subject_id': 1, 'schedule_id': 1, 'teacher_id': 1},
+        {'section': 'A', 'subject_id': 2, 'schedule_id': 4, 'teacher_id': 1}
+    ])
+
+    assert [position for position, _ in result.created] == [1]
+    assert [position for position, _, _ in result.rejected] == [0]
+
+
+def test_default_controllers_score_and_improve(university):
+    controller = SubjectScheduleController(university)
+    controller.generate(career_id=1, course=1)
+
+    assert controller.score_timetable()['total'] >= 0
+
+    after, _ = controller.improve_timetable()
+
+    assert after['total'] <= controller.score_timetable()['total'] + 1e-9
+
+
+def test_default_controllers_create_and_read(university):
+    controller = SubjectScheduleController(university)
+    controller.create({'section': 'A', 'subject_id': 1, 'schedule_id': 1, 'teacher_id': 1})
+
+    with pytest.raises(ObjectAlreadyExistsException):
+        controller.create({'section': 'A', 'subject_id': 2, 'schedule_id': 2, 'teacher_id': 1})
+
+    assert [row.schedule_id for row in controller.get_by_subject(1)] == [1]
+    assert controller.get_by_subject_schedule(1, 1).teacher_id == 1
+
+
+def test_unavailable_teacher_is_rejected_by_both_paths(university):
+    TeacherController(university).set_availability(2, [('Martes', '07:00', '12:00')])
+
+    data = {'section': 'A', 'subject_id': 1, 'schedule_id': 3, 'teacher_id': 2}
+    controller = _controller(university)
+
+    with pytest.raises(ScheduleConflictException):
+        controller.create(data)
+
+    controller.load_occupancy_index()
+
+    with pytest.raises(ScheduleConflictException):
+        controller.create(data)
+
+
+def test_overlapping_block_of_the_same_teacher_is_rejected_by_both_paths(university):
+    #* blocks 1 (08:00-10:00) and 2 (09:00-11:00) are different rows that overlap
+    controller = _controller(university)
+    controller.create({'section': 'A', 'subject_id': 1, 'schedule_id': 1, 'teacher_id': 1})
+
+    data = {'section': 'A', 'subject_id': 2, 'schedule_id': 2, 'teacher_id': 1}
+
+    with pytest.raises(ObjectAlreadyExistsException):
+        controller.create(data)
+
+    controller.load_occupancy_index()
+
+    with pytest.raises(ObjectAlreadyExistsException):
+        controller.create(data)
+
+
+@pytest.mark.parametrize('indexed', [False, True])
+def test_create_many_rejects_overlapping_blocks_of_the_same_teacher(university, indexed):
+    controller = _controller(university)
+    controller.create({'section': 'A', 'subject_id': 1, 'schedule_id': 1, 'teacher_id': 1})
+
+    if indexed:
+        controller.load_occupancy_index()
+
+    result = controller.create_many([
+        {'section': 'A', 'subject_id': 2, 'schedule_id': 2, 'teacher_id': 1},
+        {'section': 'A', 'subject_id': 2, 'schedule_id': 2, 'teacher_id': 2},
+        {'section': 'A', 'subject_id': 3, 'schedule_id': 1, 'teacher_id': 2},
+        {'section': 'A', 'subject_id': 3, 'schedule_id': 3, 'teacher_id': 1}
+    ])
+
+    #* 0 overlaps the stored section of teacher 1, 2 overlaps row 1 of the same batch
+    assert [position for position, _ in result.created] == [1, 3]
+    assert [position for position, _, _ in result.rejected] == [0, 2]
+
+
+def _placed_with_rooms(session):
+    #* subject 1 section A in block 4 and subject 2 section B in block 5, both in room 1
+    session.add(Classroom(id=1, name='A-1', capacity=40, type='Aula'))
+    session.add_all([
+        SubjectSchedule(id=1, section='A', subject_id=1, schedule_id=4, teacher_id=1, classroom_id=1),
+        SubjectSchedule(id=2, section='B', subject_id=2, schedule_id=5, teacher_id=2, classroom_id=1)
+    ])
+    session.commit()
+
+
+def test_repair_frees_the_room_of_moved_sections(university):
+    _placed_with_rooms(university)
+
+    controller = SubjectScheduleController(university)
+    changed = controller.repair(ChangeSet(withdrawn_schedules={1, 2, 3, 4}))
+
+    assert [(row['id'], row['schedule_id'], row['classroom_id']) for row in changed] == [(1, 5, None)]
+    assert university.scalar(select(SubjectSchedule.classroom_id).where(SubjectSchedule.id == 2)) == 1
+
+
+def test_failed_repair_restores_the_shared_index(university):
+    _placed_with_rooms(university)
+
+    controller = SubjectScheduleController(university)
+    index = controller.load_occupancy_index()
+
+    #* written behind the index's back: teacher 1 now holds block 5, where the repair will move section 1
+    university.add(SubjectSchedule(id=3, section='C', subject_id=3, schedule_id=5, teacher_id=1))
+    university.commit()
+
+    with pytest.raises(ObjectAlreadyExistsException):
+        controller.repair(ChangeSet(withdrawn_schedules={1, 2, 3, 4}))
+
+    assert controller._occupancy_index is index
+    assert index.teacher_mask(1) == index.bit(4)
@@ -0,0 +1,91 @@
+import pytest
+from sqlalchemy import insert, select
+
+from controllers.logic.export_controller import ExportController
+from controllers.logic.timetable_controller import TimetableController
+
+from models.schedule import Schedule
+from models.subject_schedule import SubjectSchedule
+from models.student_subject import StudentSubject
+
+from utils.exceptions import ObjectNotFoundException
+from utils.interval_tree import ScheduleIndex
+from utils.term_snapshot import TermSnapshot
+
+
+#* teacher 1 teaches blocks 1 and 3, teacher 2 block 4 and teacher 3 nothing; student 1 attends
+#* all three sections and student 2 only the one in block 4
+def _term(session):
+    session.add_all([
+        SubjectSchedule(id=1, section='A', subject_id=1, schedule_id=1, teacher_id=1),
+        SubjectSchedule(id=2, section='A', subject_id=2, schedule_id=4, teacher_id=2),
+        SubjectSchedule(id=3, section='B', subject_id=3, schedule_id=3, teacher_id=1)
+    ])
+    session.flush()
+    session.execute(insert(StudentSubject), [{'student_id': 1, 'subject_schedule_id': id} for id in (3, 1, 2)]
+                    + [{'student_id': 2, 'subject_schedule_id': 2}])
+    session.commit()
+
+
+def _busy(blocks, schedule_ids):
+    #* the blocks that overlap any of schedule_ids, answered from the DB rows
+    index = ScheduleIndex()
+
+    for row in blocks:
+        index.add(row.day, row.start_time, row.end_time, row.id)
+
+    return {other for row in blocks if row.id in schedule_ids
+            for other in index.overlapping(row.day, row.start_time, row.end_time)}
+
+
+def test_snapshot_round_trip_matches_the_database(university, tmp_path):
+    _term(university)
+
+    path = str(tmp_path / 'term.snapshot')
+    ExportController(university).write_term_snapshot(path)
+
+    snapshot = TermSnapshot(path)
+    timetables = TimetableController(university)
+    blocks = university.execute(select(Schedule.id, Schedule.day, Schedule.start_time, Schedule.end_time)).all()
+
+    for student_id in (1, 2):
+        rows = timetables.get_by_student(student_id)
+
+        assert [tuple(entry) for entry in snapshot.student_timetable(student_id)] == [
+            (row.subject_schedule_id, row.subject, row.section, row.day, row.start_time, row.end_time, row.teacher)
+            for row in rows
+        ]
+
+        busy = _busy(blocks, {row.schedule_id for row in rows})
+
+        assert [block.id for block in blocks if not snapshot.is_student_free(student_id, block.id)] == sorted(busy)
+
+    assert [entry.subject_schedule_id for entry in snapshot.student_timetable(1, 'Martes')] == [2]
+
+    for teacher_id in (1, 2, 3):
+        schedule_ids = [row.schedule_id for row in timetables.get_by_teacher(teacher_id)]
+
+        assert snapshot.teacher_schedule_ids(teacher_id) == sorted(schedule_ids)
+
+        busy = _busy(blocks, set(schedule_ids))
+
+        assert [block.id for block in blocks if not snapshot.is_teacher_free(teacher_id, block.id)] == sorted(busy)
+
+
+def test_snapshot_rejects_unknown_ids_and_other_files(university, tmp_path):
+    _term(university)
+
+    path = str(tmp_path / 'term.snapshot')
+    snapshot = ExportController(university).write_term_snapshot(path)
+
+    with pytest.raises(ObjectNotFoundException):
+        snapshot.student_timetable(99)
+
+    with pytest.raises(ObjectNotFoundException):
+        snapshot.is_teacher_free(1, 99)
+
+    other = tmp_path / 'other.snapshot'
+    other.write_bytes(b'NOTASNAP' + bytes(64))
+
+    with pytest.raises(ValueError):
+        TermSnapshot(str(other))
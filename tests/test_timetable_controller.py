@@ -0,0 +1,79 @@
+from datetime import time
+
+import pytest
+from sqlalchemy import insert
+
+from app.models import database
+
+from controllers.logic.timetable_controller import TimetableController
+from controllers.logic.student_subject_controller import StudentSubjectController
+
+from models.subject_schedule import SubjectSchedule
+from models.student_subject import StudentSubject
+
+from utils.exceptions import ObjectNotFoundException
+from utils.query_instrumentation import instrument
+
+
+#* student 1 attends three sections, entered out of day/time order; student 2 only the last one
+def _timetable(session):
+    session.add_all([
+        SubjectSchedule(id=1, section='A', subject_id=1, schedule_id=3, teacher_id=1),
+        SubjectSchedule(id=2, section='A', subject_id=2, schedule_id=1, teacher_id=2),
+        SubjectSchedule(id=3, section='B', subject_id=3, schedule_id=4, teacher_id=3)
+    ])
+    session.flush()
+    session.execute(insert(StudentSubject), [{'student_id': 1, 'subject_schedule_id': id} for id in (3, 1, 2)]
+                    + [{'student_id': 2, 'subject_schedule_id': 3}])
+    session.commit()
+
+    #* opens the next transaction now, or its BEGIN (emitted by the engine on SQLite) would be counted
+    session.connection()
+
+
+def test_student_timetable_is_one_ordered_select(university):
+    _timetable(university)
+
+    with instrument(database.get_engine()) as queries:
+        rows = TimetableController(university).get_by_student(1)
+
+    assert [(row.subject, row.section, row.day, row.start_time, row.end_time, row.teacher) for row in rows] == [
+        ('Subject 2', 'A', 'Lunes', time(8, 0), time(10, 0), 'Teacher 2'),
+        ('Subject 1', 'A', 'Lunes', time(11, 0), time(13, 0), 'Teacher 1'),
+        ('Subject 3', 'B', 'Martes', time(8, 0), time(10, 0), 'Teacher 3')
+    ]
+    assert queries.statement_count() == 1
+
+
+def test_teacher_and_section_timetables(university):
+    _timetable(university)
+    controller = TimetableController(university)
+
+    assert [row.subject_schedule_id for row in controller.get_by_teacher(1)] == [1]
+    assert [row.subject_schedule_id for row in controller.get_by_career_course(1, 1)] == [2, 1, 3]
+    assert [row.subject_schedule_id for row in controller.get_by_section(1, 1, 'A')] == [2, 1]
+
+    #* an owner without classes has an empty timetable; a missing one is an error
+    assert controller.get_by_section(1, 1, 'C') == []
+
+    with pytest.raises(ObjectNotFoundException):
+        controller.get_by_student(99)
+
+
+def test_enrollments_come_with_their_relationships_loaded(university):
+    _timetable(university)
+    controller = StudentSubjectController(university)
+
+    with instrument(database.get_engine()) as queries:
+        enrollments = controller.get_by_student(1)
+        loaded = queries.statement_count()
+
+        names = sorted((enrollment.subject_schedule.subject.name, enrollment.subject_schedule.schedule.day,
+                        enrollment.subject_schedule.teacher.name) for enrollment in enrollments)
+
+    assert names == [('Subject 1', 'Lunes', 'Teacher 1'), ('Subject 2', 'Lunes', 'Teacher 2'),
+                     ('Subject 3', 'Martes', 'Teacher 3')]
+
+    #* the student lookup and one joined statement; reading the relationships runs none
+    assert loaded == 2
+    assert queries.statement_count() == 2
@@ -0,0 +1,142 @@
+import csv
+import io
+import os
+from datetime import date, time
+
+import pytest
+from sqlalchemy import insert
+
+from controllers.logic.export_controller import ExportController
+
+from models.subject_schedule import SubjectSchedule
+from models.student_subject import StudentSubject
+
+from utils.day_of_week import DayOfWeek
+from utils.timetable_export import CSV_HEADER, TimetableEntry, write
+
+
+TERM_START = date(2026, 3, 3) #* a Tuesday
+TERM_END = date(2026, 6, 30)
+
+ENTRIES = [
+    TimetableEntry(2, 'Fisica <I>', 1, 1, 'A', 'Miercoles', time(8, 0), time(10, 0), 'Ana & Bob'),
+    TimetableEntry(1, 'Calculo, I; II', 1, 1, 'B', 'Lunes', time(11, 0), time(13, 0), 'Carla')
+]
+
+
+def _render(format, entries=ENTRIES, title='Horario <1>'):
+    stream = io.StringIO()
+    write(format, entries, stream, title, TERM_START, TERM_END, 'students-1')
+
+    return stream.getvalue()
+
+
+#* the VEVENTs of a calendar as {property: value}, with folded lines joined back
+def _events(calendar):
+    events = []
+    event = None
+
+    for line in calendar.replace('\r\n ', '').split('\r\n'):
+        if line == 'BEGIN:VEVENT':
+            event = {}
+
+        elif line == 'END:VEVENT':
+            events.append(event)
+            event = None
+
+        elif event is not None:
+            name, value = line.split(':', 1)
+            event[name] = value
+
+    return events
+
+
+def test_csv_rows_are_sorted_by_day_and_time():
+    rows = list(csv.reader(io.StringIO(_render('csv'))))
+
+    assert rows == [
+        CSV_HEADER,
+        ['Lunes', '11:00', '13:00', 'Calculo, I; II', '1', 'B', 'Carla'],
+        ['Miercoles', '08:00', '10:00', 'Fisica <I>', '1', 'A', 'Ana & Bob']
+    ]
+
+
+def test_ics_events_start_on_the_first_occurrence_and_repeat_weekly():
+    events = _events(_render('ics'))
+
+    assert [event['DTSTART'] for event in events] == ['20260309T110000', '20260304T080000']
+    assert [event['DTEND'] for event in events] == ['20260309T130000', '20260304T100000']
+    assert [event['RRULE'] for event in events] == ['FREQ=WEEKLY;BYDAY=MO;UNTIL=20260630T235959',
+                                                    'FREQ=WEEKLY;BYDAY=WE;UNTIL=20260630T235959']
+    assert events[0]['SUMMARY'] == 'Calculo\\, I\\; II (B)'
+    assert events[0]['UID'] == 'students-1-1@intensive-iut-schedule'
+
+
+@pytest.mark.parametrize('position, day', list(enumerate(DayOfWeek)))
+def test_ics_rrule_follows_every_day_of_week(position, day):
+    entry = TimetableEntry(1, 'Subject', 1, 1, 'A', day.value, time(8, 0), time(10, 0), 'Teacher')
+
+    event, = _events(_render('ics', [entry]))
+
+    assert date(int(event['DTSTART'][:4]), int(event['DTSTART'][4:6]), int(event['DTSTART'][6:8])).weekday() == position
+    assert event['RRULE'].split(';')[1] == f'BYDAY={["MO", "TU", "WE", "TH", "FR", "SA", "SU"][position]}'
+
+
+def test_ics_skips_sections_that_never_happen_in_the_term():
+    stream = io.StringIO()
+    write('ics', ENTRIES, stream, 'Horario', TERM_START, date(2026, 3, 5))
+
+    assert [event['DTSTART'] for event in _events(stream.getvalue())] == ['20260304T080000']
+
+
+def test_html_escapes_every_value():
+    page = _render('html')
+
+    assert '<title>Horario &lt;1&gt;</title>' in page
+    assert 'Fisica &lt;I&gt; (A)' in page and 'Ana &amp; Bob' in page
+    assert '<I>' not in page and 'Ana & Bob' not in page
+    assert page.index('<th>Lunes</th>') < page.index('<th>Miercoles</th>')
+
+
+def test_unknown_format_is_rejected():
+    with pytest.raises(ValueError):
+        _render('pdf')
+
+
+def _files(directory):
+    #* every exported file, without the DTSTAMP lines (the time of the export)
+    files = {}
+
+    for kind in sorted(os.listdir(directory)):
+        for name in sorted(os.listdir(os.path.join(directory, kind))):
+            with open(os.path.join(directory, kind, name), encoding='utf-8', newline='') as stream:
+                files[f'{kind}/{name}'] = [line for line in stream if not line.startswith('DTSTAMP:')]
+
+    return files
+
+
+def test_process_pool_export_matches_the_in_process_one(university, tmp_path):
+    university.add_all([
+        SubjectSchedule(id=1, section='A', subject_id=1, schedule_id=1, teacher_id=1),
+        SubjectSchedule(id=2, section='A', subject_id=2, schedule_id=4, teacher_id=2)
+    ])
+    university.flush()
+    university.execute(insert(StudentSubject), [{'student_id': 1, 'subject_schedule_id': 1},
+                                                {'student_id': 1, 'subject_schedule_id': 2},
+                                                {'student_id': 2, 'subject_schedule_id': 2}])
+    university.commit()
+
+    controller = ExportController(university)
+
+    written = controller.export_all(str(tmp_path / 'serial'), workers=0, term_start=TERM_START, term_end=TERM_END)
+    pooled = controller.export_all(str(tmp_path / 'pool'), workers=2, term_start=TERM_START, term_end=TERM_END)
+
+    #* two students, two teachers and one career/course/section group, in three formats each
+    assert written == pooled == {'students': 6, 'teachers': 6, 'sections': 3}
+
+    files = _files(tmp_path / 'pool')
+
+    assert files == _files(tmp_path / 'serial')
+    assert sorted(files)[:3] == ['sections/1-1-A.csv', 'sections/1-1-A.html', 'sections/1-1-A.ics']
+    assert files['students/E1.csv'][1:] == ['Lunes,08:00,10:00,Subject 1,1,A,Teacher 1\r\n',
+                                            'Martes,08:00,10:00,Subject 2,1,A,Teacher 2\r\n']
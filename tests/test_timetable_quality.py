@@ -0,0 +1,91 @@
+import random
+from datetime import time
+
+import pytest
+
+from utils.timetable_quality import QualityWeights, TimetableQuality
+
+
+BLOCKS = {
+    1: ('Lunes', time(8, 0), time(10, 0)),
+    2: ('Lunes', time(9, 0), time(11, 0)),
+    3: ('Lunes', time(12, 0), time(14, 0)),
+    4: ('Martes', time(8, 0), time(10, 0)),
+    5: ('Martes', time(16, 0), time(18, 0))
+}
+
+
+def test_breakdown_of_a_small_timetable():
+    #* student 1: Lunes 08-10 and 12-14 (two idle hours); teachers 1 and 2 both teach on Lunes and Martes;
+    #* student 2 has subject 3 twice on Martes, the second one ending at 18:00 (late)
+    sections = [(10, 1, 1, 1), (11, 3, 2, 2), (12, 4, 1, 3), (13, 5, 2, 3)]
+    enrollments = [(1, 10), (1, 11), (2, 12), (2, 13)]
+
+    breakdown = TimetableQuality(BLOCKS, sections, enrollments).breakdown()
+
+    assert breakdown == pytest.approx({
+        'idle_gaps': 2.0 + 6.0, #* student 2 waits from 10:00 to 16:00
+        'teacher_days': 2.0 * 2,
+        'subject_repeats': 4.0,
+        'late_blocks': 0.5 * 2,
+        'total': 8.0 + 4.0 + 4.0 + 1.0
+    })
+
+
+def test_students_with_the_same_sections_weigh_as_many():
+    one = TimetableQuality(BLOCKS, [(10, 1, 1, 1), (11, 3, 2, 2)], [(1, 10), (1, 11)])
+    three = TimetableQuality(BLOCKS, [(10, 1, 1, 1), (11, 3, 2, 2)],
+                             [(student_id, id) for student_id in (1, 2, 3) for id in (10, 11)])
+
+    assert three.breakdown()['idle_gaps'] == pytest.approx(3 * one.breakdown()['idle_gaps'])
+
+
+def test_delta_matches_full_rescoring():
+    rng = random.Random(0)
+    sections = [(10 + position, rng.choice(list(BLOCKS)), rng.randrange(1, 4), rng.randrange(1, 4))
+                for position in range(8)]
+    enrollments = {(rng.randrange(1, 6), rng.randrange(10, 18)) for _ in range(20)}
+
+    quality = TimetableQuality(BLOCKS, sections, enrollments,
+                               weights=QualityWeights(late_after=time(15, 0)))
+
+    for _ in range(200):
+        subject_schedule_id, schedule_id = rng.randrange(10, 18), rng.choice(list(BLOCKS))
+        before = quality.score()
+        predicted = quality.delta(subject_schedule_id, schedule_id)
+
+        assert quality.move(subject_schedule_id, schedule_id) == pytest.approx(predicted)
+        assert quality.score() == pytest.approx(before + predicted)
+
+
+def test_is_free_checks_teachers_students_groups_and_availability():
+    sections = [(10, 1, 1, 1), (11, 4, 1, 2), (12, 3, 2, 3), (13, 5, 3, 1)]
+    quality = TimetableQuality(BLOCKS, sections, [(1, 10), (1, 12)], groups=[[10, 13]], unavailable={2: [4]})
+
+    assert not quality.is_free(11, 2) #* teacher 1 teaches 10 in block 1, which overlaps 2
+    assert not quality.is_free(12, 2) #* student 1 attends 10
+    assert not quality.is_free(13, 1) #* 13 is in the group of 10
+    assert not quality.is_free(12, 4) #* teacher 2 is unavailable there
+    assert quality.is_free(12, 5)
+    assert quality.is_free(10, 2) #* a section never blocks itself
+
+
+def test_improve_lowers_the_score_and_keeps_hard_constraints():
+    sections = [(10, 1, 1, 1), (11, 5, 2, 2), (12, 3, 1, 3)]
+    enrollments = [(1, 10), (1, 11), (1, 12), (2, 11)]
+    quality = TimetableQuality(BLOCKS, sections, enrollments)
+    before = quality.score()
+
+    moves = quality.improve()
+
+    assert moves and quality.score() < before
+
+    replay = TimetableQuality(BLOCKS, sections, enrollments)
+
+    for subject_schedule_id, from_id, to_id in moves:
+        assert replay.schedule_id(subject_schedule_id) == from_id
+        assert replay.is_free(subject_schedule_id, to_id)
+
+        replay.move(subject_schedule_id, to_id)
+
+    assert replay.score() == pytest.approx(quality.score())
@@ -0,0 +1,64 @@
+import pytest
+
+from utils.exceptions import UnsolvableScheduleException
+from utils.occupancy_index import OccupancyIndex
+from utils.timetable_solver import TimetableSolver
+
+
+def _index(teacher_ids=(1, 2)):
+    #* blocks 1 and 2 overlap, 3 and 4 overlap nothing
+    index = OccupancyIndex(schedule_ids=[1, 2, 3, 4], teacher_ids=teacher_ids, subject_ids=[1, 2, 3, 4])
+    index.add_schedule(1, [2])
+
+    return index
+
+
+def _overlap(index, row, other):
+    return bool(index.conflict_mask(row['schedule_id']) & index.bit(other['schedule_id']))
+
+
+def test_solve_places_every_section_without_overlaps():
+    index = _index()
+
+    rows = TimetableSolver(index, [1, 2]).solve([(subject_id, 'A', 'group') for subject_id in (1, 2, 3)])
+
+    assert sorted(row['subject_id'] for row in rows) == [1, 2, 3]
+
+    #* one group: no two of its sections overlap, whoever teaches them
+    assert not any(_overlap(index, row, other) for position, row in enumerate(rows) for other in rows[position + 1:])
+
+    #* the placements were written to the index
+    assert all(index.section_exists(row['subject_id'], 'A') for row in rows)
+
+
+def test_solve_keeps_to_qualified_and_available_teachers():
+    index = _index()
+    index.set_teacher_slots(2, unavailable=index.bit(3) | index.bit(4))
+
+    rows = TimetableSolver(index, [1, 2], qualified={1: [2], 2: [1]}).solve([(1, 'A', 'g1'), (2, 'A', 'g2')])
+    placed = {row['subject_id']: row for row in rows}
+
+    assert placed[1]['teacher_id'] == 2 and placed[1]['schedule_id'] in (1, 2)
+    assert placed[2]['teacher_id'] == 1
+
+
+def test_solve_moves_a_placed_section_out_of_the_way():
+    #* one teacher; subject 1 takes the earliest block (3), but group g2 already has block 4 taken, so subject 2
+    #* only fits in 3 and subject 1 has to move to 4
+    index = OccupancyIndex(schedule_ids=[3, 4], teacher_ids=[1], subject_ids=[1, 2])
+    solver = TimetableSolver(index, [1])
+    solver.occupy('g2', 4)
+
+    rows = solver.solve([(1, 'A', 'g1'), (2, 'A', 'g2')])
+
+    assert {row['subject_id']: row['schedule_id'] for row in rows} == {1: 4, 2: 3}
+
+
+def test_unsolvable_sections_raise_and_leave_the_index_alone():
+    index = OccupancyIndex(schedule_ids=[1], teacher_ids=[1], subject_ids=[1, 2])
+
+    with pytest.raises(UnsolvableScheduleException):
+        TimetableSolver(index, [1]).solve([(1, 'A', 'g'), (2, 'A', 'g')])
+
+    assert index.teacher_mask(1) == 0
+    assert not index.section_exists(1, 'A') and not index.section_exists(2, 'A')
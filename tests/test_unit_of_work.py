@@ -0,0 +1,78 @@
+import pytest
+from sqlalchemy import select
+
+from app.models import database
+
+from controllers.logic.career_controller import CareerController
+from controllers.logic.student_subject_controller import StudentSubjectController
+
+from models.career import Career
+from models.subject_schedule import SubjectSchedule
+from models.student_subject import StudentSubject
+
+from utils.exceptions import ObjectAlreadyExistsException
+from utils.student_interval_index import StudentIntervalIndex
+
+
+def _careers(session):
+    names = session.scalars(select(Career.name).order_by(Career.id)).all()
+    session.commit()
+
+    return names
+
+
+def test_failed_call_rolls_back_only_its_savepoint(university):
+    with database.unit_of_work() as session:
+        controller = CareerController(session)
+        controller.create('Electronica')
+
+        with pytest.raises(ObjectAlreadyExistsException):
+            controller.create('Informatica')
+
+        controller.create('Mecanica')
+
+    assert _careers(university) == ['Informatica', 'Electronica', 'Mecanica']
+
+
+def test_failed_enrollment_gives_its_seat_back_inside_the_unit_of_work(university):
+    university.add(SubjectSchedule(id=1, section='A', subject_id=1, schedule_id=1, teacher_id=1, capacity=5))
+    university.commit()
+
+    with database.unit_of_work() as session:
+        controller = StudentSubjectController(session)
+        controller.create({'student_id': 1, 'subject_schedule_id': 1})
+
+        #* an index that never saw the enrollment: the seat is taken and then the UNIQUE key rejects
+        #* the row, so the savepoint rollback has to return the seat
+        stale = StudentIntervalIndex()
+        stale.load_student(1)
+
+        with pytest.raises(ObjectAlreadyExistsException):
+            StudentSubjectController(session, interval_index=stale).create({'student_id': 1, 'subject_schedule_id': 1})
+
+        controller.create({'student_id': 2, 'subject_schedule_id': 1})
+
+    assert university.scalars(select(StudentSubject.student_id).order_by(StudentSubject.student_id)).all() == [1, 2]
+    assert university.scalar(select(SubjectSchedule.enrolled).where(SubjectSchedule.id == 1)) == 2
+
+
+def test_failure_outside_the_calls_rolls_back_everything(university):
+    with pytest.raises(RuntimeError):
+        with database.unit_of_work() as session:
+            controller = CareerController(session)
+            controller.create('Electronica')
+            controller.create('Mecanica')
+
+            raise RuntimeError('the batch failed half way')
+
+    assert _careers(university) == ['Informatica']
+
+
+def test_uncaught_controller_error_rolls_back_everything(university):
+    with pytest.raises(ObjectAlreadyExistsException):
+        with database.unit_of_work() as session:
+            controller = CareerController(session)
+            controller.create('Electronica')
+            controller.create('Informatica')
+
+    assert _careers(university) == ['Informatica']
@@ -0,0 +1,77 @@
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import mysql, postgresql
+from sqlalchemy.exc import IntegrityError
+
+from models.career import Career
+from models.subject import Subject
+from models.timetable_version import TimetableVersion
+
+from utils.upsert import (insert_ignore, insert_ignore_statement, inserted_id, insert_or_increment,
+                          insert_or_increment_statement)
+
+
+def _sql(statement, dialect):
+    return str(statement.compile(dialect=dialect.dialect()))
+
+
+def test_insert_ignore_returns_the_new_id(university):
+    id = insert_ignore(university, Career, {'name': 'Electronica'})
+    university.commit()
+
+    assert university.scalar(select(Career.name).where(Career.id == id)) == 'Electronica'
+
+
+def test_insert_ignore_leaves_the_duplicate_alone(university):
+    assert insert_ignore(university, Subject, {'name': 'Subject 1', 'course': 3, 'career_id': 1}) is None
+    university.commit()
+
+    assert university.execute(select(Subject.id, Subject.course).where(Subject.name == 'Subject 1')).all() == [(1, 1)]
+
+
+def test_insert_ignore_still_raises_on_foreign_keys(university):
+    with pytest.raises(IntegrityError):
+        insert_ignore(university, Subject, {'name': 'Subject 9', 'course': 1, 'career_id': 99})
+
+
+def test_insert_or_increment_inserts_then_adds(university):
+    insert_or_increment(university, TimetableVersion, 'version', [{'name': 'a'}, {'name': 'b'}])
+    insert_or_increment(university, TimetableVersion, 'version', [{'name': 'a'}], amount=3)
+    university.commit()
+
+    assert university.execute(select(TimetableVersion.name, TimetableVersion.version)
+                              .order_by(TimetableVersion.name)).all() == [('a', 4), ('b', 1)]
+
+
+def test_postgresql_statements():
+    assert _sql(insert_ignore_statement('postgresql', Career, {'name': 'X'}), postgresql).endswith(
+        'ON CONFLICT DO NOTHING RETURNING career.id')
+
+    assert _sql(insert_or_increment_statement('postgresql', TimetableVersion, 'version', {'name': 'a'}), postgresql).endswith(
+        'ON CONFLICT (name) DO UPDATE SET version = (timetable_version.version + %(version_1)s::INTEGER)')
+
+
+@pytest.mark.parametrize('dialect', ['mysql', 'mariadb'])
+def test_mysql_statements(dialect):
+    #* the no-op update keeps the stored row; the duplicate generates no id
+    assert _sql(insert_ignore_statement(dialect, Career, {'name': 'X'}), mysql) == (
+        'INSERT INTO career (name) VALUES (%s) ON DUPLICATE KEY UPDATE id = career.id')
+
+    assert _sql(insert_or_increment_statement(dialect, TimetableVersion, 'version', {'name': 'a'}), mysql) == (
+        'INSERT INTO timetable_version (name, version) VALUES (%s, %s) '
+        'ON DUPLICATE KEY UPDATE version = (timetable_version.version + %s)')
+
+
+def test_mysql_duplicate_has_no_id():
+    assert inserted_id('mysql', SimpleNamespace(lastrowid=0)) is None
+    assert inserted_id('mariadb', SimpleNamespace(lastrowid=7)) == 7
+
+
+def test_other_dialects_are_not_supported():
+    with pytest.raises(NotImplementedError):
+        insert_ignore_statement('oracle', Career, {'name': 'X'})
+
+    with pytest.raises(NotImplementedError):
+        insert_or_increment_statement('mssql', TimetableVersion, 'version', {'name': 'a'})
@@ -0,0 +1,53 @@
+from app.models import database
+
+from controllers.logic.student_subject_controller import StudentSubjectController
+from controllers.logic.student_controller import StudentController
+from controllers.logic.subject_schedule_controller import SubjectScheduleController
+from controllers.ui.api_controller import ApiController
+
+from models.subject_schedule import SubjectSchedule
+
+from utils.cache import LRUCache
+from utils.versions import VersionCounter
+
+
+def test_bump_is_part_of_the_write_transaction(session):
+    versions = VersionCounter('timetable')
+
+    versions.bump(session, ('student', 1))
+    session.rollback()
+
+    assert versions.version(session, ('student', 1)) == (0, 0)
+
+    versions.bump(session, ('student', 1), ('student', 2))
+    versions.bump_all(session)
+    session.commit()
+
+    assert versions.version(session, ('student', 1)) == (1, 1)
+    assert versions.version(session, ('student', 3)) == (1, 0)
+    assert VersionCounter('other').version(session, ('student', 1)) == (0, 0)
+
+
+def test_etag_follows_writes_made_by_other_processes(university):
+    university.add(SubjectSchedule(id=1, section='A', subject_id=1, schedule_id=1, teacher_id=1))
+    university.commit()
+
+    #* nothing shared between the three "processes" but the database
+    first = ApiController(database.Session, LRUCache(), VersionCounter('timetable'))
+    second = ApiController(database.Session, LRUCache(), VersionCounter('timetable'))
+
+    etag = first.handle('GET', '/timetables/students/1').headers['ETag']
+
+    assert second.handle('GET', '/timetables/students/1', {'If-None-Match': etag}).status == 304
+
+    writer = StudentSubjectController(university, student_controller=StudentController(university),
+                                      subject_schedule_controller=SubjectScheduleController(university),
+                                      versions=VersionCounter('timetable'))
+    writer.create({'student_id': 1, 'subject_schedule_id': 1})
+
+    for api in (first, second):
+        response = api.handle('GET', '/timetables/students/1', {'If-None-Match': etag})
+
+        assert response.status == 200
+        assert response.headers['ETag'] != etag
+        assert b'"section":"A"' in response.body